@@ -0,0 +1,6 @@
+"""基准测试包
+
+包含物理吞吐量、能量漂移精度与渲染耗时等基准测试，以及结果对比工具。
+
+运行方式：python -m benchmarks run / python -m benchmarks compare
+"""
@@ -0,0 +1,120 @@
+import argparse
+import sys
+
+from benchmarks.report import save_results, load_results, compare_results
+
+# 默认的基线结果路径
+DEFAULT_BASELINE = 'benchmarks/baseline.json'
+SUITES = ('throughput', 'allocations', 'precision', 'threads', 'advance', 'drift', 'render', 'startup')
+# 默认的启动导入耗时预算(ms)
+DEFAULT_STARTUP_BUDGET_MS = 300.0
+
+
+def run(args):
+    """运行基准测试并保存结果"""
+    from benchmarks.physics import (DEFAULT_SIZES, bench_throughput, bench_allocations, bench_precision,
+                                    bench_threads, bench_advance, bench_energy_drift)
+    from benchmarks.render import (bench_render, bench_point_cloud, bench_density, bench_aggregate,
+                                   bench_render_scale)
+    from benchmarks.startup import bench_startup
+
+    suites = args.only.split(',') if args.only else SUITES
+    results = {}
+    if 'throughput' in suites:
+        print("Physics throughput:")
+        sizes = [n for n in DEFAULT_SIZES if n <= args.max_n]
+        results.update(bench_throughput(sizes, repeats=args.repeats, time_budget=args.time_budget))
+    if 'allocations' in suites:
+        print("Allocations per step:")
+        results.update(bench_allocations())
+    if 'precision' in suites:
+        print("Precision (float32 vs float64):")
+        results.update(bench_precision(repeats=args.repeats))
+    if 'threads' in suites:
+        print("Force evaluation threads:")
+        results.update(bench_threads(repeats=args.repeats))
+    if 'advance' in suites:
+        print("Fused multi-step advance:")
+        results.update(bench_advance(repeats=args.repeats))
+    if 'drift' in suites:
+        print("Energy drift:")
+        results.update(bench_energy_drift(orbits=args.orbits))
+    if 'render' in suites:
+        print("Render:")
+        results.update(bench_render(frames=args.frames))
+        results.update(bench_point_cloud(frames=args.frames))
+        results.update(bench_density(frames=args.frames))
+        results.update(bench_aggregate(frames=args.frames))
+        results.update(bench_render_scale(frames=args.frames))
+    within_budget = True
+    if 'startup' in suites:
+        print("Startup:")
+        startup_results, within_budget = bench_startup(budget_ms=args.startup_budget)
+        results.update(startup_results)
+
+    path = save_results(args.output, results)
+    print(f"Results written to {path}")
+    return 0 if within_budget else 1
+
+
+def startup(args):
+    """检查启动导入耗时预算，超出时返回非零退出码"""
+    from benchmarks.startup import bench_startup
+
+    _, within_budget = bench_startup(module=args.module, runs=args.runs, budget_ms=args.budget)
+    return 0 if within_budget else 1
+
+
+def compare(args):
+    """对比基线与当前结果，出现显著回退时返回非零退出码"""
+    rows = compare_results(load_results(args.baseline), load_results(args.current),
+                           alpha=args.alpha, threshold=args.threshold)
+    regressions = 0
+    print(f"{'benchmark':<42}{'baseline':>14}{'current':>14}{'change':>10}{'p':>10}  status")
+    for name, base_mean, mean, change, p, status in rows:
+        print(f"{name:<42}{base_mean:>14.4g}{mean:>14.4g}{change:>+10.1%}{p:>10.2g}  {status}")
+        if status == 'regression':
+            regressions += 1
+
+    if regressions:
+        print(f"{regressions} significant regression(s)")
+        return 1
+    print("No significant regressions")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Physics and render benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run benchmarks and write JSON results')
+    run_parser.add_argument('--output', default='benchmarks/results/latest.json')
+    run_parser.add_argument('--only', help=f"comma separated suites: {','.join(SUITES)}")
+    run_parser.add_argument('--max-n', type=int, default=10000, help='largest N for the throughput suite')
+    run_parser.add_argument('--repeats', type=int, default=5, help='samples per throughput size')
+    run_parser.add_argument('--time-budget', type=float, default=30.0, help='seconds allowed per throughput size')
+    run_parser.add_argument('--orbits', type=int, default=5, help='orbits simulated per integrator')
+    run_parser.add_argument('--frames', type=int, default=60, help='frames sampled per render case')
+    run_parser.add_argument('--startup-budget', type=float, default=DEFAULT_STARTUP_BUDGET_MS,
+                            help='import time budget for the startup suite (ms)')
+    run_parser.set_defaults(func=run)
+
+    startup_parser = subparsers.add_parser('startup', help='enforce the -X importtime startup budget')
+    startup_parser.add_argument('--module', default='main')
+    startup_parser.add_argument('--runs', type=int, default=5)
+    startup_parser.add_argument('--budget', type=float, default=DEFAULT_STARTUP_BUDGET_MS, help='budget in ms')
+    startup_parser.set_defaults(func=startup)
+
+    compare_parser = subparsers.add_parser('compare', help='flag significant regressions against a baseline')
+    compare_parser.add_argument('current', help='results JSON to check')
+    compare_parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    compare_parser.add_argument('--alpha', type=float, default=0.01, help='significance level')
+    compare_parser.add_argument('--threshold', type=float, default=0.05, help='minimum relative change')
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,284 @@
+import math
+import os
+import time
+
+import numpy as np
+
+from config.config import CONFIG, FIXED_PHYSICS_DT, BLUE
+from core.physics_engine import PhysicsEngine
+from core.scenarios import InitialConditions, mass_to_radius, uniform_cluster
+from benchmarks.report import make_result
+
+# 吞吐量测试的默认规模（3 到 10^4）
+DEFAULT_SIZES = (3, 10, 30, 100, 300, 1000, 3000, 10000)
+
+
+def build_random_engine(n, seed=0):
+    """
+    创建包含n个质点的均匀星团物理引擎
+
+    Args:
+        n: 质点数量
+        seed: 随机种子
+
+    Returns:
+        PhysicsEngine: 重新初始化后的引擎
+    """
+    engine = PhysicsEngine()
+    engine.load_initial_conditions(uniform_cluster(n, seed=seed))
+    return engine
+
+
+def bench_throughput(sizes=DEFAULT_SIZES, repeats=5, batch_time=0.2, time_budget=30.0, dt=FIXED_PHYSICS_DT):
+    """
+    测量PhysicsEngine.update在不同规模下的每秒步数
+
+    每个规模先做一次校准步，按N²外推耗时；超出time_budget的规模会被跳过。
+
+    Args:
+        sizes: 质点数量列表
+        repeats: 每个规模的采样批次数
+        batch_time: 每批次的目标耗时（秒）
+        time_budget: 单个规模允许的最长总耗时（秒）
+        dt: 物理步长
+
+    Returns:
+        dict: 基准名 -> 结果
+    """
+    results = {}
+    step_time = None
+    previous_n = None
+    for n in sizes:
+        # 根据上一个规模的单步耗时估算，避免大规模测试无限运行
+        if step_time is not None and step_time * (n / previous_n) ** 2 * repeats > time_budget:
+            print(f"  throughput N={n}: skipped (estimated over {time_budget:.0f}s budget)")
+            continue
+
+        engine = build_random_engine(n)
+        start = time.perf_counter()
+        engine.update(dt)
+        step_time = time.perf_counter() - start
+        previous_n = n
+
+        steps_per_batch = max(1, int(batch_time / max(step_time, 1e-9)))
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(steps_per_batch):
+                engine.update(dt)
+            elapsed = time.perf_counter() - start
+            samples.append(steps_per_batch / elapsed)
+        step_time = 1.0 / max(samples)
+
+        result = make_result(samples, 'steps/s', True, n=n, dt=dt, steps_per_batch=steps_per_batch)
+        results[f"physics.throughput.n{n}"] = result
+        print(f"  throughput N={n}: {result['mean']:.1f} steps/s")
+    return results
+
+
+def bench_allocations(sizes=(3, 10, 100), steps=50, dt=FIXED_PHYSICS_DT):
+    """
+    测量每个物理步的临时分配量
+
+    Args:
+        sizes: 质点数量列表
+        steps: 每个规模测量的步数
+        dt: 物理步长
+
+    Returns:
+        dict: 基准名 -> 结果，采样为每步的tracemalloc峰值字节数
+    """
+    results = {}
+    for n in sizes:
+        engine = build_random_engine(n)
+        engine.enable_allocation_tracking(True)
+        try:
+            for _ in range(steps):
+                engine.update(dt)
+            samples = [record[2] for record in engine.allocation_tracker.records]
+            stats = engine.get_allocation_stats()
+        finally:
+            engine.enable_allocation_tracking(False)
+
+        result = make_result(samples, 'bytes/step', False, n=n, dt=dt, net_blocks=stats.net_blocks,
+                             by_type=stats.by_type, step_time_ms=stats.step_time)
+        results[f"physics.allocations.n{n}"] = result
+        print(f"  allocations N={n}: {stats}")
+    return results
+
+
+def bench_precision(sizes=(1000, 3000), repeats=5, steps=5, dt=FIXED_PHYSICS_DT):
+    """
+    对比float32与float64状态精度的吞吐量和内存占用
+
+    Args:
+        sizes: 质点数量列表
+        repeats: 每种精度的采样批次数
+        steps: 每批次的步数
+        dt: 物理步长
+
+    Returns:
+        dict: 基准名 -> 结果，采样为每秒步数；参数中记录状态数组字节数与每步分配峰值
+    """
+    results = {}
+    for n in sizes:
+        means = {}
+        for precision in PhysicsEngine.PRECISIONS:
+            engine = build_random_engine(n)
+            engine.set_precision(precision)
+            engine.update(dt)  # 创建积分状态，不计入采样
+
+            samples = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                for _ in range(steps):
+                    engine.update(dt)
+                samples.append(steps / (time.perf_counter() - start))
+            stats = engine.measure_allocations(1, dt)
+
+            result = make_result(samples, 'steps/s', True, n=n, dt=dt, precision=precision,
+                                 state_bytes=engine.bodies.nbytes(), step_peak_bytes=stats.peak_bytes)
+            results[f"physics.precision.{precision}.n{n}"] = result
+            means[precision] = result['mean']
+            print(f"  precision {precision} N={n}: {result['mean']:.1f} steps/s, "
+                  f"state {engine.bodies.nbytes() / 1024:.0f} KiB, step peak {stats.peak_bytes / 1024:.0f} KiB")
+        print(f"  precision N={n}: float32 speedup x{means['float32'] / means['float64']:.2f}")
+    return results
+
+
+def bench_threads(sizes=(1000, 10000), workers=None, repeats=3, dt=FIXED_PHYSICS_DT):
+    """
+    测量引力计算在不同线程数下的吞吐量与加速比
+
+    Args:
+        sizes: 质点数量列表
+        workers: 线程数列表，默认为1、2、4...直到CPU核心数
+        repeats: 每种组合的采样次数
+        dt: 物理步长
+
+    Returns:
+        dict: 基准名 -> 结果，采样为每秒步数
+    """
+    if workers is None:
+        cpus = os.cpu_count() or 1
+        workers = sorted({1, cpus} | {2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus})
+
+    results = {}
+    for n in sizes:
+        engine = build_random_engine(n)
+        engine.update(dt)  # 创建积分状态，不计入采样
+        single = None
+        for count in workers:
+            engine.set_workers(count)
+            samples = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                engine.update(dt)
+                samples.append(1.0 / (time.perf_counter() - start))
+
+            result = make_result(samples, 'steps/s', True, n=n, dt=dt, workers=count)
+            results[f"physics.threads.w{count}.n{n}"] = result
+            single = single or result['mean']
+            print(f"  threads={count} N={n}: {result['mean']:.2f} steps/s (x{result['mean'] / single:.2f})")
+        engine.shutdown()
+    return results
+
+
+def bench_advance(sizes=(3, 30, 100), steps=100, repeats=5, dt=FIXED_PHYSICS_DT):
+    """
+    对比逐步调用update与一次advance多步的吞吐量（小规模时解释器开销占主导）
+
+    Args:
+        sizes: 质点数量列表
+        steps: 每个采样推进的步数（相当于高速模拟时一帧的步数）
+        repeats: 采样次数
+        dt: 物理步长
+
+    Returns:
+        dict: 基准名 -> 结果，采样为每秒步数
+    """
+    results = {}
+    for n in sizes:
+        engine = build_random_engine(n)
+        engine.update(dt)  # 创建积分状态，不计入采样
+        loop, fused = [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(steps):
+                engine.update(dt)
+            loop.append(steps / (time.perf_counter() - start))
+
+            start = time.perf_counter()
+            engine.advance(steps, dt)
+            fused.append(steps / (time.perf_counter() - start))
+
+        for name, samples in (('update', loop), ('advance', fused)):
+            results[f"physics.advance.{name}.n{n}"] = make_result(samples, 'steps/s', True, n=n, dt=dt,
+                                                                  steps=steps)
+        speedup = np.mean(fused) / np.mean(loop)
+        print(f"  N={n}: update {np.mean(loop):.0f} steps/s, advance {np.mean(fused):.0f} steps/s (x{speedup:.2f})")
+    return results
+
+
+def build_binary_engine(integration_method):
+    """
+    创建质心静止的二体圆轨道系统
+
+    Returns:
+        tuple: (引擎, 轨道周期)
+    """
+    engine = PhysicsEngine()
+    engine.integration_method = integration_method
+    mass1, mass2 = float(CONFIG['mass1']), float(CONFIG['mass2'])
+    separation = float(CONFIG['separation'])
+    total_mass = mass1 + mass2
+
+    # 圆轨道相对速度 v = sqrt(G(m1+m2)/d)，按质量反比分配给两个质点
+    relative_speed = math.sqrt(engine.G * total_mass / separation)
+    r1 = separation * mass2 / total_mass
+    r2 = separation * mass1 / total_mass
+    v1 = relative_speed * mass2 / total_mass
+    v2 = relative_speed * mass1 / total_mass
+    masses = np.array([mass1, mass2])
+    engine.load_initial_conditions(InitialConditions(
+        positions=np.array([[-r1, 0.0], [r2, 0.0]]),
+        velocities=np.array([[0.0, -v1], [0.0, v2]]),
+        masses=masses,
+        radii=mass_to_radius(masses),
+        colors=np.array([BLUE, BLUE], dtype=np.uint8)))
+
+    period = 2 * math.pi * math.sqrt(separation ** 3 / (engine.G * total_mass))
+    return engine, period
+
+
+def bench_energy_drift(orbits=5, dt=FIXED_PHYSICS_DT):
+    """
+    测量每种积分方法每个轨道周期的相对能量漂移
+
+    Args:
+        orbits: 模拟的轨道周期数
+        dt: 物理步长
+
+    Returns:
+        dict: 基准名 -> 结果，采样为每个周期内的相对能量漂移
+    """
+    results = {}
+    for method in PhysicsEngine.INTEGRATION_METHODS:
+        engine, period = build_binary_engine(method)
+        steps_per_orbit = max(1, int(round(period / dt)))
+        previous_energy = engine.calculate_total_energy()
+        initial_energy = previous_energy
+
+        samples = []
+        for _ in range(orbits):
+            for _ in range(steps_per_orbit):
+                engine.update(dt)
+            energy = engine.calculate_total_energy()
+            samples.append(abs(energy - previous_energy) / abs(initial_energy))
+            previous_energy = energy
+
+        result = make_result(samples, 'relative energy drift per orbit', False,
+                             integrator=method, dt=dt, steps_per_orbit=steps_per_orbit)
+        results[f"physics.energy_drift.{method}"] = result
+        print(f"  energy drift {method}: {result['mean']:.3e} per orbit")
+    return results
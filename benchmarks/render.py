@@ -0,0 +1,268 @@
+import os
+import time
+
+from config.config import CONFIG, FIXED_PHYSICS_DT, auto_params
+from benchmarks.report import make_result
+
+
+def bench_render(frames=60, warmup=5):
+    """
+    在SDL dummy视频驱动下测量完整Game.draw的帧耗时
+
+    轨迹长度取自auto_params的基础长度与最大存储长度，缩放级别取自CONFIG的最小、初始与最大缩放。
+
+    Args:
+        frames: 每种组合的采样帧数
+        warmup: 预热帧数（不计入采样）
+
+    Returns:
+        dict: 基准名 -> 结果，采样为每帧耗时（毫秒）
+    """
+    # 必须在pygame初始化显示之前设置
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from main import Game
+
+    game = Game()
+    game.init()
+    engine = game.engine
+
+    # 预先模拟足够步数，填满轨迹
+    max_trail = max(ball.max_trail for ball in engine.balls)
+    for _ in range(max_trail):
+        engine.update(FIXED_PHYSICS_DT)
+    full_trails = [list(ball.trail) for ball in engine.balls]
+
+    results = {}
+    trail_lengths = (auto_params['trail_length'], max_trail)
+    zoom_levels = (CONFIG['zoom_min'], CONFIG['zoom_initial'], CONFIG['zoom_max'])
+    for trail_length in trail_lengths:
+        for ball, trail in zip(engine.balls, full_trails):
+            ball.trail = trail[-trail_length:]
+
+        for zoom in zoom_levels:
+            game.ui_manager.zoom_slider.val = zoom
+            for _ in range(warmup):
+                game.draw()
+
+            samples = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                game.draw()
+                samples.append((time.perf_counter() - start) * 1000.0)
+
+            result = make_result(samples, 'ms/frame', False, trail_length=trail_length, zoom=zoom,
+                                 bodies=len(engine.balls))
+            results[f"render.draw.trail{trail_length}.zoom{zoom}"] = result
+            print(f"  render trail={trail_length} zoom={zoom}: {result['mean']:.2f} ms/frame")
+    return results
+
+
+def bench_point_cloud(sizes=(10000, 100000), frames=30, warmup=3):
+    """
+    测量批量质点渲染（engine.draw，不含网格与UI）在大规模均匀星团下的帧耗时
+
+    Args:
+        sizes: 质点数量列表
+        frames: 每个规模的采样帧数
+        warmup: 预热帧数（不计入采样）
+
+    Returns:
+        dict: 基准名 -> 结果，采样为每帧耗时（毫秒）
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from main import Game
+    from config.config import HEIGHT
+    from core.scenarios import uniform_cluster
+    from graphics.body_renderer import BodyRenderer
+
+    game = Game()
+    game.init()
+    engine = game.engine
+    renderer = BodyRenderer.get_instance()
+    game.ui_manager.zoom_slider.val = CONFIG['zoom_initial']
+    # 固定为逐点绘制，避免规模达到密度图阈值时自动切换
+    mode = renderer.mode
+    renderer.mode = 'points'
+
+    results = {}
+    for n in sizes:
+        # 星团以原点为中心、半径取屏幕高度的一半，摄像头复位后质点都在视野内
+        engine.load_initial_conditions(uniform_cluster(n, seed=0, radius=HEIGHT / 2))
+        game.camera_manager.reset_camera()
+        game.coord_system.set_zoom(CONFIG['zoom_initial'])
+        for _ in range(warmup):
+            engine.draw(False)
+
+        samples = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            engine.draw(False)
+            samples.append((time.perf_counter() - start) * 1000.0)
+
+        result = make_result(samples, 'ms/frame', False, bodies=n, points=renderer.points_drawn,
+                             circles=renderer.circles_drawn)
+        results[f"render.point_cloud.n{n}"] = result
+        print(f"  point cloud N={n}: {result['mean']:.2f} ms/frame "
+              f"({renderer.points_drawn} points, {renderer.circles_drawn} circles)")
+    renderer.mode = mode
+    return results
+
+
+def bench_density(sizes=(100000, 1000000), frames=20, warmup=3):
+    """
+    测量密度图模式（engine.draw，不含网格与UI）在Plummer星团下的帧耗时，分别统计计数与质量加权
+
+    Args:
+        sizes: 质点数量列表
+        frames: 每种组合的采样帧数
+        warmup: 预热帧数（不计入采样）
+
+    Returns:
+        dict: 基准名 -> 结果，采样为每帧耗时（毫秒）
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from main import Game
+    from core.scenarios import create_scenario
+    from graphics.body_renderer import BodyRenderer
+
+    game = Game()
+    game.init()
+    engine = game.engine
+    renderer = BodyRenderer.get_instance()
+    mode, weighted = renderer.mode, CONFIG['density_mass_weighted']
+    renderer.mode = 'density'
+
+    results = {}
+    for n in sizes:
+        engine.load_initial_conditions(create_scenario('plummer', n, seed=0))
+        # 最小缩放下整个星团都在视野内
+        game.camera_manager.reset_camera()
+        game.coord_system.set_zoom(CONFIG['zoom_min'])
+        for mass_weighted in (False, True):
+            CONFIG['density_mass_weighted'] = mass_weighted
+            for _ in range(warmup):
+                engine.draw(False)
+
+            samples = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                engine.draw(False)
+                samples.append((time.perf_counter() - start) * 1000.0)
+
+            kind = 'mass' if mass_weighted else 'count'
+            result = make_result(samples, 'ms/frame', False, bodies=n, binned=renderer.points_drawn, weighting=kind)
+            results[f"render.density.{kind}.n{n}"] = result
+            print(f"  density {kind} N={n}: {result['mean']:.2f} ms/frame ({renderer.points_drawn} bodies binned)")
+
+    renderer.mode = mode
+    CONFIG['density_mass_weighted'] = weighted
+    return results
+
+
+def bench_aggregate(sizes=(100000, 1000000), frames=20, warmup=3):
+    """
+    测量四叉树聚合模式（engine.draw，不含网格与UI）在Plummer星团下的帧耗时，
+    分别统计索引可复用（暂停）与每帧重建索引（模拟运行）两种情况
+
+    Args:
+        sizes: 质点数量列表
+        frames: 每种组合的采样帧数
+        warmup: 预热帧数（不计入采样）
+
+    Returns:
+        dict: 基准名 -> 结果，采样为每帧耗时（毫秒）
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from main import Game
+    from core.scenarios import create_scenario
+    from graphics.body_renderer import BodyRenderer
+
+    game = Game()
+    game.init()
+    engine = game.engine
+    renderer = BodyRenderer.get_instance()
+    mode = renderer.mode
+    renderer.mode = 'aggregate'
+
+    results = {}
+    for n in sizes:
+        engine.load_initial_conditions(create_scenario('plummer', n, seed=0))
+        # 最小缩放下整个星团都在视野内
+        game.camera_manager.reset_camera()
+        game.coord_system.set_zoom(CONFIG['zoom_min'])
+        for rebuild in (False, True):
+            for _ in range(warmup):
+                engine.draw(False)
+
+            samples = []
+            for _ in range(frames):
+                if rebuild:
+                    engine.bodies.mark_changed()
+                start = time.perf_counter()
+                engine.draw(False)
+                samples.append((time.perf_counter() - start) * 1000.0)
+
+            kind = 'rebuild' if rebuild else 'cached'
+            result = make_result(samples, 'ms/frame', False, bodies=n, cells=renderer.points_drawn,
+                                 depth=renderer.aggregate_depth)
+            results[f"render.aggregate.{kind}.n{n}"] = result
+            print(f"  aggregate {kind} N={n}: {result['mean']:.2f} ms/frame "
+                  f"({renderer.points_drawn} cells at depth {renderer.aggregate_depth})")
+
+    renderer.mode = mode
+    return results
+
+
+def bench_render_scale(scales=(1.0, 0.75, 0.5), n=20000, frames=30, warmup=3):
+    """
+    测量不同场景渲染比例下场景绘制（清屏、网格、质点与轨迹，加上放大到窗口，不含UI）的帧耗时
+
+    Args:
+        scales: 渲染比例列表
+        n: Plummer星团的质点数量
+        frames: 每种比例的采样帧数
+        warmup: 预热帧数（不计入采样）
+
+    Returns:
+        dict: 基准名 -> 结果，采样为每帧耗时（毫秒）
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from main import Game
+    from core.scenarios import create_scenario
+    from graphics.render_target import RenderTarget
+
+    game = Game()
+    game.init()
+    engine = game.engine
+    render_target = RenderTarget.get_instance()
+    user_scale = render_target.user_scale
+
+    engine.load_initial_conditions(create_scenario('plummer', n, seed=0))
+    game.camera_manager.reset_camera()
+    game.coord_system.set_zoom(CONFIG['zoom_initial'])
+
+    def draw_scene():
+        with render_target.scene():
+            game.screen_manager.fill((0, 0, 0))
+            game.coord_system.draw_grid()
+            engine.draw(False)
+        render_target.present()
+
+    results = {}
+    for scale in scales:
+        render_target.set_scale(scale)
+        for _ in range(warmup):
+            draw_scene()
+
+        samples = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            draw_scene()
+            samples.append((time.perf_counter() - start) * 1000.0)
+
+        result = make_result(samples, 'ms/frame', False, bodies=n, scale=render_target.last_scale)
+        results[f"render.scale{scale}.n{n}"] = result
+        print(f"  render scale={scale:.0%} N={n}: {result['mean']:.2f} ms/frame")
+
+    render_target.set_scale(user_scale)
+    return results
@@ -0,0 +1,193 @@
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+
+def machine_metadata():
+    """
+    收集运行环境信息
+
+    Returns:
+        dict: 机器、解释器与依赖库版本等元数据
+    """
+    metadata = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+    }
+
+    try:
+        import numpy
+        metadata['numpy'] = numpy.__version__
+    except ImportError:
+        metadata['numpy'] = None
+    try:
+        import pygame
+        metadata['pygame'] = pygame.version.ver
+    except ImportError:
+        metadata['pygame'] = None
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=5)
+        metadata['git_commit'] = commit.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        metadata['git_commit'] = None
+
+    return metadata
+
+
+def make_result(samples, unit, higher_is_better, **params):
+    """
+    构造单项基准结果
+
+    Args:
+        samples: 采样值列表
+        unit: 单位描述
+        higher_is_better: 数值越大是否越好
+        **params: 该项测试的参数（N、缩放等）
+
+    Returns:
+        dict: 包含采样与汇总统计的结果
+    """
+    samples = [float(sample) for sample in samples]
+    return {
+        'unit': unit,
+        'higher_is_better': higher_is_better,
+        'params': params,
+        'samples': samples,
+        'mean': statistics.fmean(samples) if samples else None,
+        'median': statistics.median(samples) if samples else None,
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def save_results(path, results):
+    """保存基准结果为JSON"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    document = {'metadata': machine_metadata(), 'benchmarks': results}
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    return path
+
+
+def load_results(path):
+    """读取基准结果JSON"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def _beta_continued_fraction(a, b, x):
+    """不完全Beta函数的连分式展开（Lentz算法）"""
+    tiny = 1e-300
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    if abs(d) < tiny:
+        d = tiny
+    d = 1.0 / d
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = tiny if abs(d) < tiny else d
+        c = 1.0 + aa / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = tiny if abs(d) < tiny else d
+        c = 1.0 + aa / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 3e-14:
+            break
+    return h
+
+
+def _regularized_beta(a, b, x):
+    """正则化不完全Beta函数 I_x(a, b)"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - front * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+
+def welch_t_test(samples_a, samples_b):
+    """
+    Welch双样本t检验（不假设方差相等）
+
+    Args:
+        samples_a: 基线采样
+        samples_b: 当前采样
+
+    Returns:
+        tuple: (t统计量, 双侧p值)
+    """
+    n_a, n_b = len(samples_a), len(samples_b)
+    if n_a < 2 or n_b < 2:
+        return 0.0, 1.0
+
+    mean_a, mean_b = statistics.fmean(samples_a), statistics.fmean(samples_b)
+    var_a, var_b = statistics.variance(samples_a), statistics.variance(samples_b)
+    se_squared = var_a / n_a + var_b / n_b
+    if se_squared == 0:
+        return (0.0, 1.0) if mean_a == mean_b else (math.copysign(math.inf, mean_b - mean_a), 0.0)
+
+    t = (mean_b - mean_a) / math.sqrt(se_squared)
+    df = se_squared ** 2 / ((var_a / n_a) ** 2 / (n_a - 1) + (var_b / n_b) ** 2 / (n_b - 1))
+    p = _regularized_beta(df / 2.0, 0.5, df / (df + t * t))
+    return t, p
+
+
+def compare_results(baseline, current, alpha=0.01, threshold=0.05):
+    """
+    对比两份基准结果
+
+    只有当差异在统计上显著（p < alpha）且相对变化超过threshold时，才判定为回退或提升。
+
+    Args:
+        baseline: 基线结果文档
+        current: 当前结果文档
+        alpha: 显著性水平
+        threshold: 最小相对变化
+
+    Returns:
+        list: 每项为 (名称, 基线均值, 当前均值, 相对变化, p值, 状态)
+    """
+    rows = []
+    base_benchmarks = baseline['benchmarks']
+    for name, result in current['benchmarks'].items():
+        base = base_benchmarks.get(name)
+        if base is None or not base['samples'] or not result['samples']:
+            continue
+
+        t, p = welch_t_test(base['samples'], result['samples'])
+        base_mean, mean = base['mean'], result['mean']
+        change = (mean - base_mean) / abs(base_mean) if base_mean else 0.0
+        worse = change < 0 if result['higher_is_better'] else change > 0
+
+        status = 'unchanged'
+        if p < alpha and abs(change) > threshold:
+            status = 'regression' if worse else 'improvement'
+        rows.append((name, base_mean, mean, change, p, status))
+    return rows
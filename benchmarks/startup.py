@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.report import make_result
+
+# 仓库根目录（startup测量需要在此目录下导入main）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(output):
+    """
+    解析 -X importtime 的输出
+
+    Args:
+        output: 解释器的stderr文本
+
+    Returns:
+        dict: 模块名 -> (自身耗时us, 累计耗时us)，只保留每个模块第一次出现的记录
+    """
+    timings = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return timings
+
+
+def measure_import_time(module='main', runs=5):
+    """
+    在全新的解释器中用 -X importtime 测量模块的冷启动导入耗时
+
+    Args:
+        module: 被测模块
+        runs: 重复次数
+
+    Returns:
+        tuple: (每次的累计耗时列表(ms), 最后一次的逐模块耗时)
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    samples = []
+    timings = {}
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                                   cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True)
+        timings = parse_importtime(completed.stderr)
+        samples.append(timings[module][1] / 1000.0)
+    return samples, timings
+
+
+def bench_startup(module='main', runs=5, budget_ms=None, top=10):
+    """
+    测量启动导入耗时，并检查是否超出预算
+
+    Args:
+        module: 被测模块
+        runs: 重复次数
+        budget_ms: 导入耗时预算（取中位数比较），None表示不检查
+        top: 打印累计耗时最高的模块数
+
+    Returns:
+        tuple: (基准名 -> 结果, 是否在预算内)
+    """
+    samples, timings = measure_import_time(module, runs)
+    result = make_result(samples, 'ms', False, module=module, budget_ms=budget_ms)
+    print(f"  import {module}: median {result['median']:.1f} ms over {runs} runs")
+
+    heaviest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in heaviest[1:top + 1]:
+        print(f"    {cumulative_us / 1000.0:8.1f} ms  {name}")
+
+    within_budget = budget_ms is None or result['median'] <= budget_ms
+    if not within_budget:
+        print(f"  import {module} exceeds startup budget of {budget_ms:.0f} ms")
+    return {f"startup.import.{module}": result}, within_budget
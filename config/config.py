@@ -18,12 +18,30 @@ CONFIG = {
 
     # 物理引擎参数
     'physics_frequency': 60.0,  # 物理更新频率 (Hz)
+    'physics_budget_ms': 10.0,  # 每帧物理计算的时间预算(ms)，超出后剩余步数结转到下一帧
+    'physics_max_carry_steps': 4,  # 最多结转的物理步数，超出部分的模拟时间被丢弃
+    'physics_fallback_coarse_dt': False,  # 持续超出预算时是否自动加倍物理步长（牺牲精度换取速度）
+    'physics_max_dt_scale': 4,  # 自动加倍步长的最大倍数
+    'physics_fallback_frames': 30,  # 连续落后多少帧后加倍步长（恢复需要4倍帧数的余量）
+    'simulation_precision': 'float64',  # 位置与速度的存储精度：float64或float32（大规模纯可视化时可用float32）
+    'force_tile_size': 1 << 15,  # 引力分块计算时每块成对临时数组的元素数（float64约256KB，使一块的临时数组留在L2缓存中）
+    'physics_workers': 1,  # 引力计算线程数，None表示使用CPU核心数
+    'physics_parallel_min_tiles': 16,  # 引力分块数达到该值时才使用多线程（块少时线程调度开销大于并行收益）
+    'physics_tasks_per_worker': 4,  # 每个线程分到的任务数（多于1以平衡各线程负载）
+    'physics_process_energy_interval': 0.2,  # 物理子进程计算并发布总能量的间隔(秒)
+    'physics_process_max_lag': 0.25,  # 物理子进程允许积压的最长模拟时间(秒)，超出部分丢弃
+    'physics_process_poll_interval': 0.05,  # 物理子进程暂停时等待命令的超时(秒)
+    'trail_body_limit': 32,  # 记录轨迹的质点数（只记录前若干个质点）
+    'trail_sample_steps': 1,  # 多步推进时每隔多少步记录一个轨迹点（轨迹长度按记录点数计）
+    'trail_fade': 'gradient',  # 轨迹渐隐方式：gradient与黑色背景预先混合颜色，alpha在SRCALPHA图层上混合（更准确但更慢），off不渐隐
+    'trail_fade_buckets': 8,  # 每条轨迹的渐隐分段数（每段一次绘制调用）
+    'trail_fade_min_alpha': 0.2,  # 最旧一段轨迹的不透明度下限
 
     # 能量图表参数
     'energy_graph_width': 300,
     'energy_graph_height': 150,
     'energy_graph_x': 10,
-    'energy_graph_y': 300,
+    'energy_graph_y': 340,
     'energy_graph_color': (0, 200, 0),
     'energy_graph_bg_color': (20, 20, 20),
     'energy_graph_border_color': (100, 100, 100),
@@ -51,9 +69,66 @@ CONFIG = {
     'handle_y_offset': 5,
     'handle_border_size': 10,
 
+    # 质点渲染参数
+    'point_render_max_radius': 2,  # 屏幕半径不超过该值(像素)的质点直接写入像素，更大的才绘制圆
+    'sprite_cache_size': 512,  # 缓存的质点圆精灵数（按颜色与屏幕半径区分，超出时淘汰最久未使用的）
+    'sprite_max_radius': 128,  # 屏幕半径超过该值(像素)的质点直接绘制圆，不缓存精灵
+    'render_mode': 'auto',  # 质点渲染模式：points逐点绘制，aggregate四叉树聚合，density密度图，auto按数量在points与density间选择（H键切换）
+    'density_auto_threshold': 100000,  # auto模式下质点数达到该值时使用密度图
+    'density_mass_weighted': False,  # 密度图是否按质量加权
+    'aggregate_cell_px': 4,  # 聚合模式下每个四叉树单元在屏幕上的边长(像素)，越小越接近逐点绘制
+    'render_scale': 1.0,  # 场景内部渲染比例（0.5-1.0），小于1时按较低分辨率绘制场景再放大到窗口，UI保持原生分辨率（V键切换）
+    'render_scale_min': 0.5,  # 渲染比例下限（用户设置与渲染质量调节器都不低于该值）
+    'render_scale_smooth': False,  # 放大场景时是否使用平滑缩放（更柔和但更慢）
+    'idle_render_suppression': True,  # 暂停且画面没有变化时停止重绘，阻塞等待输入
+    'idle_wait_ms': 250,  # 空闲时每次等待输入的最长时间(毫秒)
+
+    # 轨迹录制参数
+    'recording_output_dir': 'recordings',  # 轨迹文件输出目录
+    'recording_decimation': 1,  # 记录之间的最小物理步数（每个渲染帧最多记录一次，一帧执行更多步时间隔随之增大）
+    'recording_keyframe_interval': 256,  # 关键帧索引的间隔（帧）
+    'recording_chunk_bytes': 16 * 1024 * 1024,  # 轨迹文件每次扩展并映射的字节数
+    'recording_queue_bytes': 256 * 1024 * 1024,  # 写入队列的字节上限（超出时丢弃帧，物理循环不等待磁盘）
+
+    # 回退缓冲区参数
+    'rewind_enabled': True,  # 是否在内存中保存快照历史（BACKSPACE回退，R重置到初始状态）
+    'rewind_interval': 0.5,  # 模拟运行时保存快照的间隔（秒，墙钟时间）
+    'rewind_memory_bytes': 64 * 1024 * 1024,  # 快照历史的字节上限（超出时丢弃最旧的快照）
+    'rewind_keyframe_interval': 16,  # 每隔多少个快照保存一个完整关键帧（其余保存相对关键帧的压缩差分）
+    'rewind_delta_max_ratio': 0.9,  # 差分大小超过关键帧的该比例时改存关键帧（混沌运动的浮点状态无损压缩率有限）
+    'rewind_compress_level': 1,  # 差分的zlib压缩级别
+    'rewind_raw_plane_ratio': 0.5,  # 差分中非零字节超过该比例的字节位面不压缩直接保存（接近随机噪声）
+    'rewind_delta_max_bodies': 10000,  # 质点数超过该值时快照直接复制为关键帧（编码差分的耗时会造成掉帧）
+
+    # 轨迹回放参数
+    'replay_jump_fraction': 0.1,  # PageUp/PageDown每次跳转的时间轴比例
+    'replay_centroid_budget': 2_000_000,  # 跳转后重建质心轨迹时最多读取的位置数（帧数×质点数）
+    'timeline_height': 10,  # 回放时间轴高度（像素）
+
     # 质心显示参数
     'center_radius': 4,
     'center_circle_radius': 20,
+    'show_centroid_trail': False,  # 是否绘制质心轨迹（渲染质量降低时自动关闭）
+
+    # 渲染质量调节参数
+    'quality_governor': True,  # 是否根据帧耗时自动调节渲染质量
+    'quality_window': 30,  # 计算平均帧耗时的窗口（帧数），每次调整后重新统计
+    'quality_downgrade_ratio': 1.0,  # 平均帧耗时超过帧预算的该比例时降低一级质量
+    'quality_upgrade_ratio': 0.6,  # 平均帧耗时低于帧预算的该比例时才考虑恢复（与降级阈值之间为滞回区间）
+    'quality_upgrade_frames': 120,  # 持续低于恢复阈值多少帧后恢复一级质量
+
+    # 性能分析参数
+    'profiler_window': 300,  # 滚动统计窗口（帧数）
+    'profiler_output_dir': 'profiles',  # 性能数据导出目录
+    'profiler_histogram_bins': 25,  # 帧耗时直方图分桶数
+    'profiler_histogram_max_ms': 50.0,  # 帧耗时直方图的统计上限(ms)
+    'profiler_overlay_x_offset': 310,  # 性能面板距离右边缘的距离
+    'profiler_overlay_y': 130,
+    'profiler_font_size': 18,
+    'profile_capture_frames': 300,  # cProfile/tracemalloc每次采集的帧数
+    'profile_summary_lines': 5,  # 屏幕摘要显示的条目数
+    'profile_summary_seconds': 15.0,  # 采集结果摘要的显示时长(秒)
+    'tracemalloc_frames': 1,  # tracemalloc记录的调用栈深度
 
     # 字体参数
     'font_size': 24,
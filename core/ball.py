@@ -1,148 +1,216 @@
+import numpy as np
 import pygame
 
-from config.config import auto_params, WHITE
+from config.config import WHITE
 from core.vector2d import Vector2D
+from graphics.body_renderer import BodyRenderer
 from graphics.coordinate_system import CoordinateSystem
+from graphics.quality_governor import QualityGovernor
+from graphics.trail_renderer import TrailRenderer
 from managers.camera_manager import CameraManager
 from managers.screen_manager import ScreenManager
 
 
 class Ball:
-    """质点类，包含位置、速度、质量等物理属性"""
-
-    def __init__(self, x, y, vx, vy, mass, radius, color):
-        self.position = Vector2D(x, y)  # 位置向量（物理坐标）
-        self.velocity = Vector2D(vx, vy)  # 速度向量
-        self.mass = float(mass)  # 质量
-        self.radius = radius  # 显示半径（物理半径）
-        self.color = color  # 颜色
-        self.trail = []  # 轨迹点列表（物理坐标）
-        self.base_trail_length = auto_params['trail_length']  # 基础轨迹长度
-        self.max_trail = self.base_trail_length * 10  # 最大存储长度
-
-        # 为Verlet积分法添加前一帧的位置
-        dt = 1.0 / 60.0
-        self.prev_position = self.position - self.velocity * dt
-        self.acceleration = Vector2D(0, 0)
-        
-        # 为了兼容性，保留x, y, vx, vy属性
-        self._update_legacy_attributes()
-
-    def _update_legacy_attributes(self):
-        """更新兼容性属性"""
-        self.x = self.position.x
-        self.y = self.position.y
-        self.vx = self.velocity.x
-        self.vy = self.velocity.y
-        self.ax = self.acceleration.x
-        self.ay = self.acceleration.y
-
-    def apply_force_verlet(self, fx, fy, dt):
-        """使用Verlet积分法更新位置和速度"""
-        # 创建力向量
-        force = Vector2D(fx, fy)
-        
-        # 计算加速度
-        self.acceleration = force / self.mass
-
-        # Verlet积分：x(t+dt) = 2*x(t) - x(t-dt) + a*dt²
-        dt_squared = dt * dt
-        new_position = self.position * 2 - self.prev_position + self.acceleration * dt_squared
-
-        # 计算速度：v = (x(t+dt) - x(t-dt)) / (2*dt)
-        if dt > 0:
-            two_dt = 2 * dt
-            self.velocity = (new_position - self.prev_position) / two_dt
-
-        # 更新位置
-        self.prev_position = self.position.copy()
-        self.position = new_position
-        
-        # 更新兼容性属性
-        self._update_legacy_attributes()
-
-        # 添加轨迹点（转换为整数用于显示）
-        self.trail.append((int(self.position.x), int(self.position.y)))
-        if len(self.trail) > self.max_trail:
-            self.trail.pop(0)
-
-    # def reset_verlet_state(self, x, y, vx, vy, dt=1 / 60):
-    #     """重置Verlet积分状态（用于重置功能）"""
-    #     # 使用高精度类型
-    #     self.x = np.float64(x)
-    #     self.y = np.float64(y)
-    #     self.vx = np.float64(vx)
-    #     self.vy = np.float64(vy)
-    #     dt = np.float64(dt)
-    #
-    #     # 重新计算前一帧位置
-    #     self.prev_x = self.x - self.vx * dt
-    #     self.prev_y = self.y - self.vy * dt
-    #     self.ax = 0.0
-    #     self.ay = 0.0
-    #     self.trail.clear()
-    #     """施加力并更新速度和位置（原始欧拉方法，保留作为备用）"""
-    #     # 计算加速度 a = F/m
-    #     ax = fx / self.mass
-    #     ay = fy / self.mass
-    #
-    #     # 更新速度 v = v0 + a*t
-    #     self.vx += ax * dt
-    #     self.vy += ay * dt
-    #
-    #     # 更新位置 x = x0 + v*t
-    #     self.x += self.vx * dt
-    #     self.y += self.vy * dt
-    #
-    #     # 添加轨迹点
-    #     self.trail.append((int(self.x), int(self.y)))
-    #     if len(self.trail) > self.max_trail:
-    #         self.trail.pop(0)
+    """质点视图类，按槽位序号读写BodyStore中的数组（不持有自己的状态）"""
+
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        """
+        Args:
+            store: 持有质点数组的BodyStore
+            index: 质点槽位序号
+        """
+        self.store = store
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, Ball) and self.store is other.store and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+
+    @property
+    def position(self):
+        """位置向量（物理坐标）"""
+        x, y = self.store.positions[self.index].tolist()
+        return Vector2D(x, y)
+
+    @position.setter
+    def position(self, value):
+        self.store.positions[self.index] = (value.x, value.y)
+        self.store.mark_changed()
+
+    @property
+    def velocity(self):
+        """速度向量"""
+        vx, vy = self.store.velocities[self.index].tolist()
+        return Vector2D(vx, vy)
+
+    @velocity.setter
+    def velocity(self, value):
+        self.store.velocities[self.index] = (value.x, value.y)
+        self.store.mark_changed()
+
+    @property
+    def render_position(self):
+        """渲染用的插值位置向量（物理坐标）"""
+        x, y = self.store.get_render_position(self.index)
+        return Vector2D(x, y)
+
+    @property
+    def acceleration(self):
+        """最近一步的加速度向量（尚未积分时为零）"""
+        accelerations = self.store.accelerations
+        if accelerations is None:
+            return Vector2D(0.0, 0.0)
+        ax, ay = accelerations[self.index].tolist()
+        return Vector2D(ax, ay)
+
+    @property
+    def mass(self):
+        """质量"""
+        return float(self.store.masses[self.index])
+
+    @property
+    def radius(self):
+        """显示半径（物理半径）"""
+        return float(self.store.radii[self.index])
+
+    @property
+    def color(self):
+        """颜色"""
+        return self.store.get_color(self.index)
+
+    # 为了兼容性，保留x, y, vx, vy, ax, ay属性
+    @property
+    def x(self):
+        return float(self.store.positions[self.index, 0])
+
+    @property
+    def y(self):
+        return float(self.store.positions[self.index, 1])
+
+    @property
+    def vx(self):
+        return float(self.store.velocities[self.index, 0])
+
+    @property
+    def vy(self):
+        return float(self.store.velocities[self.index, 1])
+
+    @property
+    def ax(self):
+        return self.acceleration.x
+
+    @property
+    def ay(self):
+        return self.acceleration.y
+
+    @property
+    def trail(self):
+        """轨迹点列表（物理坐标）；只有前trail_body_limit个质点记录轨迹"""
+        return [tuple(point) for point in self.store.get_trail(self.index).tolist()]
+
+    @trail.setter
+    def trail(self, value):
+        self.store.set_trail(self.index, value)
+
+    @property
+    def base_trail_length(self):
+        """基础轨迹长度"""
+        return self.store.base_trail_length
+
+    @property
+    def max_trail(self):
+        """最大存储长度"""
+        return self.store.max_trail
 
     def draw(self):
-        """绘制质点（使用坐标转换）"""
-        # 通过单例获取坐标系统和屏幕对象
+        """绘制质点及其轨迹（使用坐标转换）"""
+        self.draw_trail()
+        self.draw_body()
+
+    def draw_body(self):
+        """绘制质点圆（批量渲染时由BodyRenderer代替）"""
         coord_system = CoordinateSystem.get_instance()
         screen = ScreenManager.get_instance().screen
-        # 转换物理坐标到屏幕坐标
-        screen_x, screen_y = coord_system.physics_to_screen(self.position.x, self.position.y)
+        x, y = self.store.get_render_position(self.index)
+        screen_x, screen_y = coord_system.physics_to_screen(x, y)
         scaled_radius = coord_system.scale_radius(self.radius)
 
+        # 绘制质点（只在屏幕范围内绘制）
+        if (-scaled_radius <= screen_x <= coord_system.screen_width + scaled_radius and
+                -scaled_radius <= screen_y <= coord_system.screen_height + scaled_radius):
+            pygame.draw.circle(screen, self.color, (screen_x, screen_y), scaled_radius)
+            pygame.draw.circle(screen, WHITE, (screen_x, screen_y), scaled_radius, 1)
+
+    def draw_trail(self):
+        """绘制质点轨迹"""
+        # 通过单例获取坐标系统和屏幕对象
+        coord_system = CoordinateSystem.get_instance()
+        screen = ScreenManager.get_instance().screen
+        # 轨迹头部使用两个物理步之间的插值位置
+        x, y = self.store.get_render_position(self.index)
+        color = self.color
+        trail_length = int(self.store.trail_lengths[self.index]) if self.index < len(self.store.trail_lengths) else 0
+
         # 根据缩放比例动态调整轨迹显示长度（反向关系）
         camera_manager = CameraManager.get_instance()
-        zoom_factor = camera_manager.get_zoom()
+        # 按降低的渲染比例绘制时zoom已乘以该比例，这里还原为用户看到的缩放，轨迹长度与抽稀不随渲染比例变化
+        zoom_factor = camera_manager.get_zoom() / camera_manager.camera.render_scale
+        # 渲染质量降低时按比例缩短轨迹并加大抽稀
+        quality = QualityGovernor.get_instance()
         # 缩放越小，轨迹越长：使用反比关系
-        dynamic_trail_length = int(self.base_trail_length / zoom_factor)
-        # 限制在合理范围内：最少50个点，最多不超过存储的轨迹点数
-        dynamic_trail_length = max(50, min(dynamic_trail_length, len(self.trail)))
+        dynamic_trail_length = int(self.base_trail_length / zoom_factor * quality.trail_scale)
+        # 限制在合理范围内：最少50个点（按质量缩放），最多不超过存储的轨迹点数
+        dynamic_trail_length = max(int(50 * quality.trail_scale), min(dynamic_trail_length, trail_length))
 
         # 绘制轨迹（只显示最近的dynamic_trail_length个点）
-        if len(self.trail) > 1:
-            # 获取要显示的轨迹点
-            display_trail = self.trail[-dynamic_trail_length:] if len(self.trail) > dynamic_trail_length else self.trail
+        if trail_length > 1:
+            # 从环形缓冲区获取要显示的轨迹点
+            display_trail = self.store.get_trail(self.index, dynamic_trail_length)
 
             # 根据缩放比例计算轨迹点稀疏程度
             # 缩放越小，跳过的点越多，实现稀疏绘制
-            skip_factor = max(1, int(1 / zoom_factor))  # zoom=0.1时skip_factor=500
-            sparse_trail = display_trail[::skip_factor]  # 每skip_factor个点取一个
+            skip_factor = max(1, int(1 / zoom_factor)) * quality.trail_skip  # zoom=0.1时skip_factor=500
+            # 每skip_factor个点取一个，轨迹头部使用插值位置，避免轨迹超出质点
+            sparse_trail = np.vstack((display_trail[:-1][::skip_factor], ((x, y),)))
 
-            screen_trail = []
-            for trail_x, trail_y in sparse_trail:
-                trail_screen_x, trail_screen_y = coord_system.physics_to_screen(trail_x, trail_y)
-                # 只添加在屏幕范围内的点
-                if (-50 <= trail_screen_x <= coord_system.screen_width + 50 and
-                        -50 <= trail_screen_y <= coord_system.screen_height + 50):
-                    screen_trail.append((trail_screen_x, trail_screen_y))
+            # 批量转换为屏幕坐标，只保留在屏幕范围内的点
+            screen_x, screen_y = BodyRenderer.get_instance().to_screen(sparse_trail)
+            visible = (screen_x >= -50) & (screen_x <= coord_system.screen_width + 50)
+            visible &= (screen_y >= -50) & (screen_y <= coord_system.screen_height + 50)
+            screen_trail = list(zip(screen_x[visible].tolist(), screen_y[visible].tolist()))
 
             if len(screen_trail) > 1:
                 try:
-                    # 轨迹线条粗细保持为1，避免缩小时线条过粗
-                    pygame.draw.lines(screen, self.color, False, screen_trail, 1)
+                    # 按时间渐隐，线条粗细保持为1，避免缩小时线条过粗
+                    TrailRenderer.get_instance().draw(screen, screen_trail, color)
                 except:
                     pass
 
-        # 绘制质点（只在屏幕范围内绘制）
-        if (-scaled_radius <= screen_x <= coord_system.screen_width + scaled_radius and
-                -scaled_radius <= screen_y <= coord_system.screen_height + scaled_radius):
-            pygame.draw.circle(screen, self.color, (screen_x, screen_y), scaled_radius)
-            pygame.draw.circle(screen, WHITE, (screen_x, screen_y), scaled_radius, 1)
+
+class BallSequence:
+    """按需创建存活质点视图的只读序列，避免为每个质点常驻一个Python对象"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return self.store.count
+
+    def __getitem__(self, item):
+        indices = self.store.live_indices()
+        if isinstance(item, slice):
+            return [Ball(self.store, index) for index in indices[item]]
+        return Ball(self.store, indices[item])
+
+    def __iter__(self):
+        for index in self.store.live_indices():
+            yield Ball(self.store, index)
+
+    def copy(self):
+        """返回全部质点视图的列表"""
+        return list(self)
@@ -0,0 +1,481 @@
+import numpy as np
+
+from config.config import CONFIG, auto_params
+from core.scenarios import PALETTE
+
+
+class BodyStore:
+    """质点存储类，所有质点状态保存在连续的类型化数组中
+
+    数组按容量分配，添加质点时按倍数扩容（均摊O(1)）；删除的槽位记入空闲列表供之后复用，
+    因此已有质点的序号保持不变。空闲槽位的质量和半径为0，不参与引力和能量计算。
+    """
+
+    def __init__(self, dtype=np.float64):
+        """
+        Args:
+            dtype: 位置与速度的存储精度（np.float64或np.float32）
+        """
+        self.dtype = np.dtype(dtype)
+        self.size = 0  # 已使用的槽位数（包括空闲槽位）
+        self.capacity = 0
+        self.free_slots = []  # 空闲槽位列表
+        self._positions = np.empty((0, 2), dtype=self.dtype)
+        self._velocities = np.empty((0, 2), dtype=self.dtype)
+        self._masses = np.empty(0)
+        self._radii = np.empty(0)
+        self._colors = None  # None表示按调色板循环
+        self._alive = None  # None表示没有空闲槽位（全部存活）
+        # Verlet积分状态在首次更新时创建
+        self._prev_positions = None
+        self._accelerations = None
+        # 渲染用的插值位置（None表示直接使用当前位置）
+        self.render_positions = None
+        # 状态（位置与速度）变化计数，空间索引、能量等缓存据此判断是否需要重新计算
+        self.version = 0
+        # 结构（质点增删、质量、半径与颜色）变化计数，回退缓冲区据此判断快照之间的质点集合是否相同
+        self.structure_version = 0
+
+        # 轨迹环形缓冲区：只记录前trail_body_limit个槽位，所有轨迹共用写入位置
+        self.base_trail_length = auto_params['trail_length']  # 基础轨迹长度
+        self.max_trail = self.base_trail_length * 10  # 最大存储长度
+        self.trail_points = np.zeros((0, self.max_trail, 2), dtype=np.int32)
+        self.trail_lengths = np.zeros(0, dtype=np.int64)
+        self.trail_head = 0
+
+    # ==================== 数组视图 ====================
+
+    @property
+    def positions(self):
+        """(size, 2) 位置数组"""
+        return self._positions[:self.size]
+
+    @property
+    def velocities(self):
+        """(size, 2) 速度数组"""
+        return self._velocities[:self.size]
+
+    @property
+    def masses(self):
+        """(size,) 质量数组"""
+        return self._masses[:self.size]
+
+    @property
+    def radii(self):
+        """(size,) 显示半径数组"""
+        return self._radii[:self.size]
+
+    @property
+    def colors(self):
+        """(size, 3) 颜色数组，未提供颜色时为None"""
+        if self._colors is None:
+            return None
+        return self._colors[:self.size]
+
+    @property
+    def alive(self):
+        """(size,) 存活标记数组，没有删除过质点时为None（全部存活）"""
+        if self._alive is None:
+            return None
+        return self._alive[:self.size]
+
+    @property
+    def prev_positions(self):
+        """(size, 2) 前一步位置数组，尚未积分时为None"""
+        if self._prev_positions is None:
+            return None
+        return self._prev_positions[:self.size]
+
+    @property
+    def accelerations(self):
+        """(size, 2) 最近一步的加速度数组，尚未积分时为None"""
+        if self._accelerations is None:
+            return None
+        return self._accelerations[:self.size]
+
+    @property
+    def count(self):
+        """存活质点数量"""
+        return self.size - len(self.free_slots)
+
+    # ==================== 加载与容量管理 ====================
+
+    def load(self, positions, velocities, masses, radii, colors=None):
+        """
+        直接引用给定数组作为全部质点状态（替换现有质点），不做复制
+
+        只读或内存映射（mmap_mode='c'）的数组在首次写入时才会复制对应页面；之后添加质点导致扩容时才会整体复制。
+        位置与速度的类型和存储精度不一致时会转换（此时会复制）。
+
+        Args:
+            positions: (N, 2) 位置数组
+            velocities: (N, 2) 速度数组
+            masses: (N,) 质量数组
+            radii: (N,) 显示半径数组
+            colors: (N, 3) uint8颜色数组，None表示按调色板循环
+        """
+        self.size = self.capacity = len(masses)
+        self.free_slots = []
+        self._positions = positions.astype(self.dtype, copy=False)
+        self._velocities = velocities.astype(self.dtype, copy=False)
+        self._masses = masses
+        self._radii = radii
+        self._colors = colors
+        self._alive = None
+        self._prev_positions = None
+        self._accelerations = None
+        self.render_positions = None
+        self.version += 1
+        self.structure_version += 1
+        self.trail_points = np.zeros((min(self.size, CONFIG['trail_body_limit']), self.max_trail, 2), dtype=np.int32)
+        self.trail_lengths = np.zeros(len(self.trail_points), dtype=np.int64)
+        self.trail_head = 0
+
+    def _grow(self, capacity):
+        """按给定容量重新分配所有数组并复制已使用的部分"""
+        def grown(array, fill=0):
+            if array is None:
+                return None
+            new_array = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            new_array[:self.size] = array[:self.size]
+            return new_array
+
+        self._positions = grown(self._positions)
+        self._velocities = grown(self._velocities)
+        self._masses = grown(self._masses)
+        self._radii = grown(self._radii)
+        self._colors = grown(self._colors)
+        self._alive = grown(self._alive, True)
+        self._prev_positions = grown(self._prev_positions)
+        self._accelerations = grown(self._accelerations)
+        self.capacity = capacity
+
+        # 新增的槽位如果在轨迹记录范围内，也为其分配轨迹缓冲区
+        trail_bodies = min(capacity, CONFIG['trail_body_limit'])
+        if trail_bodies > len(self.trail_points):
+            points = np.zeros((trail_bodies, self.max_trail, 2), dtype=np.int32)
+            points[:len(self.trail_points)] = self.trail_points
+            lengths = np.zeros(trail_bodies, dtype=np.int64)
+            lengths[:len(self.trail_lengths)] = self.trail_lengths
+            self.trail_points, self.trail_lengths = points, lengths
+
+    def set_dtype(self, dtype):
+        """
+        切换位置与速度（以及前一步位置）的存储精度，类型不同时复制转换
+
+        Args:
+            dtype: np.float64或np.float32
+        """
+        self.dtype = np.dtype(dtype)
+        self._positions = self._positions.astype(self.dtype, copy=False)
+        self._velocities = self._velocities.astype(self.dtype, copy=False)
+        if self._prev_positions is not None:
+            self._prev_positions = self._prev_positions.astype(self.dtype, copy=False)
+
+    def nbytes(self):
+        """状态数组（含预留容量与轨迹缓冲区）占用的字节数"""
+        arrays = (self._positions, self._velocities, self._masses, self._radii, self._colors, self._alive,
+                  self._prev_positions, self._accelerations, self.trail_points, self.trail_lengths)
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def ensure_integrator_state(self, dt=1.0 / 60.0):
+        """创建Verlet积分所需的前一步位置和加速度数组"""
+        if self._prev_positions is None:
+            # 与位置使用相同的类型，交换缓冲区后位置精度保持不变
+            self._prev_positions = np.empty((self.capacity, 2), dtype=self._positions.dtype)
+            np.multiply(self.velocities, -dt, out=self._prev_positions[:self.size])
+            self._prev_positions[:self.size] += self.positions
+            self._accelerations = np.zeros((self.capacity, 2), dtype=np.float64)
+
+    def rescale_previous(self, ratio):
+        """
+        步长变化时缩放前一步位置：x_prev = x - (x - x_prev) * ratio，使隐含的速度保持不变
+
+        Args:
+            ratio: 新步长 / 旧步长
+        """
+        prev_positions = self.prev_positions
+        if prev_positions is None:
+            return
+        prev_positions -= self.positions
+        prev_positions *= ratio
+        prev_positions += self.positions
+
+    def swap_position_buffers(self):
+        """交换当前位置与前一步位置的缓冲区（Verlet积分把新位置写入前一步位置后调用）"""
+        self._positions, self._prev_positions = self._prev_positions, self._positions
+        self.version += 1
+
+    def restore(self, positions, velocities, prev_positions=None):
+        """
+        把状态恢复为给定数组的内容（复制，质点数不变），用于回退与重置
+
+        Args:
+            positions, velocities: (size, 2) 状态
+            prev_positions: (size, 2) Verlet积分的前一步位置，None表示尚未积分
+        """
+        np.copyto(self.positions, positions, casting='unsafe')
+        np.copyto(self.velocities, velocities, casting='unsafe')
+        if prev_positions is None:
+            self._prev_positions = None
+            self._accelerations = None
+        else:
+            self.ensure_integrator_state()
+            np.copyto(self.prev_positions, prev_positions, casting='unsafe')
+        self.render_positions = None
+        self.version += 1
+
+    def mark_changed(self):
+        """位置或速度数组被就地修改后调用，使依赖状态的缓存失效"""
+        self.version += 1
+
+    def capture_structure(self):
+        """
+        复制当前的质点结构（用于回退与重置，状态数组另行保存）
+
+        Returns:
+            BodyStructure
+        """
+        return BodyStructure(self)
+
+    def restore_structure(self, structure):
+        """
+        恢复capture_structure保存的质点结构，之后再用restore恢复对应的状态数组
+
+        Args:
+            structure: BodyStructure
+        """
+        size = structure.size
+        if size > self.capacity:
+            self._grow(size)
+        self.size = size
+        self._masses[:size] = structure.masses
+        self._radii[:size] = structure.radii
+        if structure.colors is None:
+            self._colors = None
+        else:
+            if self._colors is None:
+                self._colors = PALETTE[np.arange(self.capacity) % len(PALETTE)]
+            self._colors[:size] = structure.colors
+        if structure.alive is None:
+            self._alive = None
+        else:
+            if self._alive is None:
+                self._alive = np.ones(self.capacity, dtype=bool)
+            self._alive[:size] = structure.alive
+        self.free_slots = list(structure.free_slots)
+        self.render_positions = None
+        self.version += 1
+        self.structure_version += 1
+
+    # ==================== 添加与删除 ====================
+
+    def add(self, x, y, vx, vy, mass, radius, color=None, dt=1.0 / 60.0):
+        """
+        添加一个质点，优先复用空闲槽位
+
+        Args:
+            dt: 当前积分步长，已开始积分时按此设置前一步位置，使隐含速度等于(vx, vy)
+
+        Returns:
+            int: 质点的槽位序号
+        """
+        if self.free_slots:
+            index = self.free_slots.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(max(16, self.capacity * 2))
+            index = self.size
+            self.size += 1
+
+        self._positions[index] = (x, y)
+        self._velocities[index] = (vx, vy)
+        self._masses[index] = mass
+        self._radii[index] = radius
+        if color is not None and self._colors is None:
+            # 首次指定颜色时才生成颜色数组（其余质点沿用调色板颜色）
+            self._colors = PALETTE[np.arange(self.capacity) % len(PALETTE)]
+        if self._colors is not None:
+            self._colors[index] = color if color is not None else PALETTE[index % len(PALETTE)]
+        if self._alive is not None:
+            self._alive[index] = True
+        if self._prev_positions is not None:
+            self._prev_positions[index] = (x - vx * dt, y - vy * dt)
+            self._accelerations[index] = 0.0
+        if index < len(self.trail_lengths):
+            self.trail_lengths[index] = 0
+        self.version += 1
+        self.structure_version += 1
+        return index
+
+    def remove(self, index):
+        """
+        删除一个质点，槽位记入空闲列表（质量和半径清零，不再参与计算）
+
+        Raises:
+            IndexError: 槽位不存在或已删除
+        """
+        if not self.is_alive(index):
+            raise IndexError(f"body {index} does not exist")
+        if self._alive is None:
+            self._alive = np.ones(self.capacity, dtype=bool)
+        self._alive[index] = False
+        self._masses[index] = 0.0
+        self._radii[index] = 0.0
+        if index < len(self.trail_lengths):
+            self.trail_lengths[index] = 0
+        self.free_slots.append(index)
+        self.version += 1
+        self.structure_version += 1
+
+    def is_alive(self, index):
+        """槽位是否存放着存活的质点"""
+        if not 0 <= index < self.size:
+            return False
+        return self._alive is None or bool(self._alive[index])
+
+    def live_indices(self):
+        """存活质点的槽位序号"""
+        if self._alive is None:
+            return range(self.size)
+        return np.flatnonzero(self._alive[:self.size]).tolist()
+
+    def interpolate(self, alpha):
+        """
+        计算渲染用的插值位置：上一步位置 + (当前位置 - 上一步位置) * alpha
+
+        尚未积分（没有上一步位置）或alpha >= 1时直接使用当前位置。
+        """
+        prev_positions = self.prev_positions
+        if prev_positions is None or alpha >= 1.0:
+            self.render_positions = None
+            return
+        render_positions = np.subtract(self.positions, prev_positions, dtype=np.float64)
+        render_positions *= alpha
+        render_positions += prev_positions
+        self.render_positions = render_positions
+
+    def get_render_position(self, index):
+        """获取质点渲染用的插值位置 (x, y)"""
+        if self.render_positions is None:
+            return self.positions[index].tolist()
+        return self.render_positions[index].tolist()
+
+    def get_color(self, index):
+        """获取质点颜色，未提供颜色数组时按调色板循环"""
+        if self._colors is None:
+            return tuple(PALETTE[index % len(PALETTE)].tolist())
+        return tuple(self._colors[index].tolist())
+
+    def get_colors(self, indices):
+        """
+        批量获取质点颜色
+
+        Args:
+            indices: 槽位序号数组
+
+        Returns:
+            ndarray: (n, 3) uint8 颜色数组
+        """
+        if self._colors is None:
+            return PALETTE[indices % len(PALETTE)]
+        return self._colors[indices]
+
+    def live_arrays(self):
+        """
+        返回只含存活质点的数组（没有空闲槽位时直接返回视图）
+
+        Returns:
+            tuple: (positions, velocities, masses, radii, colors)
+        """
+        if not self.free_slots:
+            return self.positions, self.velocities, self.masses, self.radii, self.colors
+        alive = self._alive[:self.size]
+        colors = self.colors
+        return (self.positions[alive], self.velocities[alive], self.masses[alive], self.radii[alive],
+                None if colors is None else colors[alive])
+
+    # ==================== 轨迹 ====================
+
+    def record_trails(self):
+        """向环形缓冲区写入当前位置（转换为整数用于显示）"""
+        bodies = len(self.trail_lengths)
+        if bodies == 0:
+            return
+        np.copyto(self.trail_points[:, self.trail_head], self._positions[:bodies], casting='unsafe')
+        self.trail_head = (self.trail_head + 1) % self.max_trail
+        np.minimum(self.trail_lengths + 1, self.max_trail, out=self.trail_lengths)
+        # 未使用或已删除的槽位不记录轨迹
+        self.trail_lengths[self.size:] = 0
+        if self._alive is not None:
+            self.trail_lengths[~self._alive[:bodies]] = 0
+
+    def get_trail(self, index, count=None):
+        """
+        获取质点最近的轨迹点
+
+        Args:
+            index: 槽位序号
+            count: 最多返回的点数，默认全部
+
+        Returns:
+            ndarray: (n, 2) int32 轨迹点，按时间从旧到新
+        """
+        if index >= len(self.trail_lengths):
+            return self.trail_points[:0, 0]
+        length = int(self.trail_lengths[index])
+        if count is not None:
+            length = min(length, count)
+        start = self.trail_head - length
+        if start >= 0:
+            return self.trail_points[index, start:self.trail_head]
+        return np.concatenate((self.trail_points[index, start:], self.trail_points[index, :self.trail_head]))
+
+    def set_trail(self, index, points):
+        """用给定的点序列替换质点轨迹（超出最大存储长度时只保留最新的点）"""
+        if index >= len(self.trail_lengths):
+            return
+        points = np.asarray(points, dtype=np.int32).reshape(-1, 2)[-self.max_trail:]
+        length = len(points)
+        positions = (self.trail_head - length + np.arange(length)) % self.max_trail
+        self.trail_points[index, positions] = points
+        self.trail_lengths[index] = length
+
+    def load_trails(self, points):
+        """
+        用一段连续的历史位置整体替换所有轨迹（回放跳转时从轨迹文件的窗口切片重建）
+
+        Args:
+            points: (T, B, 2) 从旧到新的位置，B为前B个槽位（超出记录范围的槽位忽略，超出最大存储长度时只保留最新的点）
+        """
+        bodies = min(points.shape[1], len(self.trail_lengths))
+        points = points[-self.max_trail:, :bodies]
+        length = len(points)
+        self.trail_lengths[:] = 0
+        self.trail_head = length % self.max_trail
+        if bodies == 0 or length == 0:
+            return
+        np.copyto(self.trail_points[:bodies, :length], points.transpose(1, 0, 2), casting='unsafe')
+        self.trail_lengths[:bodies] = length
+        # 未使用或已删除的槽位不显示轨迹
+        self.trail_lengths[self.size:] = 0
+        if self._alive is not None:
+            self.trail_lengths[~self._alive[:len(self.trail_lengths)]] = 0
+
+
+class BodyStructure:
+    """质点结构的副本：槽位数、质量、半径、颜色、存活标记与空闲槽位（见BodyStore.capture_structure）"""
+
+    def __init__(self, store):
+        """
+        Args:
+            store: 被复制的BodyStore
+        """
+        self.size = store.size
+        self.masses = store.masses.copy()
+        self.radii = store.radii.copy()
+        self.colors = None if store.colors is None else store.colors.copy()
+        self.alive = None if store.alive is None else store.alive.copy()
+        self.free_slots = list(store.free_slots)
+        self.nbytes = sum(array.nbytes for array in (self.masses, self.radii, self.colors, self.alive)
+                          if array is not None)
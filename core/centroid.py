@@ -1,8 +1,11 @@
+import numpy as np
 import pygame
 
 from config.config import CONFIG, GREEN
 from core.vector2d import Vector2D
+from graphics.body_renderer import BodyRenderer
 from graphics.coordinate_system import CoordinateSystem
+from graphics.trail_renderer import TrailRenderer
 from managers.screen_manager import ScreenManager
 
 
@@ -16,6 +19,8 @@ class Centroid:
         self.trail_length = 200
         self.trail = []  # 质心轨迹点列表（物理坐标）
         self.position = Vector2D(0.0, 0.0)  # 质心位置向量
+        self.prev_position = Vector2D(0.0, 0.0)  # 上一物理步的质心位置
+        self.render_position = Vector2D(0.0, 0.0)  # 渲染用的插值位置
         self.velocity = Vector2D(0.0, 0.0)  # 质心速度向量
         self.total_mass = 0.0  # 系统总质量
         self.is_show = True
@@ -30,77 +35,67 @@ class Centroid:
         self.vx = self.velocity.x
         self.vy = self.velocity.y
 
-    def calculate_position(self, balls):
+    def calculate_position(self, positions, masses):
         """
         计算质心的物理坐标
-        
+
         Args:
-            balls: 球对象列表
-            
+            positions: (N, 2) 位置数组
+            masses: (N,) 质量数组
+
         Returns:
             tuple: (center_x, center_y) 质心的物理坐标
         """
-        if not balls:
-            self.position = Vector2D(0.0, 0.0)
-            self.total_mass = 0.0
-            self._update_legacy_attributes()
-            return 0.0, 0.0
-
-        total_mass = 0.0
-        weighted_position = Vector2D(0.0, 0.0)
-
-        for ball in balls:
-            total_mass += ball.mass
-            weighted_position = weighted_position + ball.position * ball.mass
-
+        total_mass = float(masses.sum()) if len(masses) else 0.0
         if total_mass > 0:
-            self.position = weighted_position / total_mass
+            # 矩阵乘法直接得到质量加权和，不创建(N, 2)临时数组
+            x, y = (masses @ positions / total_mass).tolist()
+            self.position = Vector2D(x, y)
             self.total_mass = total_mass
-            self._update_legacy_attributes()
-            return self.position.x, self.position.y
         else:
             self.position = Vector2D(0.0, 0.0)
             self.total_mass = 0.0
-            self._update_legacy_attributes()
-            return 0.0, 0.0
+        self._update_legacy_attributes()
+        return self.position.x, self.position.y
 
-    def calculate_velocity(self, balls):
+    def calculate_velocity(self, velocities, masses):
         """
-        计算质心的速度
-        
+        计算质心的速度（需先调用calculate_position得到总质量）
+
         Args:
-            balls: 球对象列表
-            
+            velocities: (N, 2) 速度数组
+            masses: (N,) 质量数组
+
         Returns:
             tuple: (velocity_x, velocity_y) 质心的速度
         """
-        if not balls or self.total_mass <= 0:
+        if self.total_mass <= 0:
             self.velocity = Vector2D(0.0, 0.0)
-            self._update_legacy_attributes()
-            return 0.0, 0.0
-
-        weighted_velocity = Vector2D(0.0, 0.0)
-
-        for ball in balls:
-            weighted_velocity = weighted_velocity + ball.velocity * ball.mass
-
-        self.velocity = weighted_velocity / self.total_mass
+        else:
+            vx, vy = (masses @ velocities / self.total_mass).tolist()
+            self.velocity = Vector2D(vx, vy)
         self._update_legacy_attributes()
-
         return self.velocity.x, self.velocity.y
 
-    def update(self, balls):
+    def update(self, positions, velocities, masses, prev_positions=None):
         """
         更新质心状态（位置、速度、轨迹）
-        
+
         Args:
-            balls: 球对象列表
+            positions: (N, 2) 位置数组
+            velocities: (N, 2) 速度数组
+            masses: (N,) 质量数组
+            prev_positions: 上一物理步的位置数组，一次推进多步时用于计算上一步的质心，默认沿用当前质心
         """
         if not self.is_show:
             return
-        # 计算质心位置和速度
-        self.calculate_position(balls)
-        self.calculate_velocity(balls)
+        if prev_positions is not None:
+            self.calculate_position(prev_positions, masses)
+        # 计算质心位置和速度（保留上一步的位置用于渲染插值）
+        previous = self.position
+        self.calculate_position(positions, masses)
+        self.calculate_velocity(velocities, masses)
+        self.prev_position = previous
 
         # 添加到轨迹
         self.add_to_trail(self.x, self.y)
@@ -119,6 +114,15 @@ class Centroid:
         if len(self.trail) > self.trail_length:
             self.trail.pop(0)
 
+    def interpolate(self, alpha):
+        """
+        计算渲染用的插值位置
+
+        Args:
+            alpha: 插值系数，0为上一物理步，1为当前物理步
+        """
+        self.render_position = self.prev_position + (self.position - self.prev_position) * alpha
+
     def get_screen_position(self):
         """
         获取质心的屏幕坐标
@@ -127,7 +131,7 @@ class Centroid:
             tuple: (screen_x, screen_y) 质心的屏幕坐标
         """
         coord_system = CoordinateSystem.get_instance()
-        return coord_system.physics_to_screen(self.position.x, self.position.y)
+        return coord_system.physics_to_screen(self.render_position.x, self.render_position.y)
 
     def draw(self, show_trail=False):
         """
@@ -169,26 +173,16 @@ class Centroid:
         if len(self.trail) < 2:
             return
 
-        coord_system = CoordinateSystem.get_instance()
         screen = ScreenManager.get_instance().screen
-        # 转换轨迹点到屏幕坐标
-        screen_points = []
-        for x, y in self.trail:
-            screen_x, screen_y = coord_system.physics_to_screen(x, y)
-            screen_points.append((int(screen_x), int(screen_y)))
-
-        # 绘制轨迹线
-        if len(screen_points) >= 2:
-            # 使用渐变透明度绘制轨迹
-            for i in range(len(screen_points) - 1):
-                alpha = int(255 * (i + 1) / len(screen_points))  # 渐变透明度
-                color = (*GREEN[:3], alpha) if len(GREEN) == 4 else GREEN
-
-                try:
-                    pygame.draw.line(screen, color, screen_points[i], screen_points[i + 1], 1)
-                except (ValueError, TypeError):
-                    # 如果颜色格式不支持透明度，使用普通颜色
-                    pygame.draw.line(screen, GREEN, screen_points[i], screen_points[i + 1], 1)
+        # 批量转换轨迹点到屏幕坐标（轨迹头部使用插值位置，与质心点保持一致）
+        points = np.array(self.trail[:-1] + [(self.render_position.x, self.render_position.y)], dtype=np.float64)
+        screen_x, screen_y = BodyRenderer.get_instance().to_screen(points)
+        screen_points = list(zip(screen_x.tolist(), screen_y.tolist()))
+
+        # 按时间渐隐绘制轨迹线（分段批量绘制）
+        trail_renderer = TrailRenderer.get_instance()
+        trail_renderer.draw(screen, screen_points, GREEN)
+        trail_renderer.flush(screen)
 
     def __str__(self):
         """
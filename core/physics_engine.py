@@ -1,11 +1,27 @@
-from config.config import G
+import os
+
+import numpy as np
+
+from config.config import CONFIG, G, FIXED_PHYSICS_DT
+from core.ball import Ball, BallSequence
+from core.body_store import BodyStore
 from core.centroid import Centroid
+from core.scenarios import InitialConditions
 from core.vector2d import Vector2D
+from graphics.body_renderer import BodyRenderer
+from graphics.quality_governor import QualityGovernor
+from graphics.trail_renderer import TrailRenderer
+from managers.screen_manager import ScreenManager
 
 
 class PhysicsEngine:
     """物理引擎类"""
 
+    # 支持的积分方法
+    INTEGRATION_METHODS = ('verlet',)
+    # 支持的状态精度（位置与速度的存储类型；力和能量求和始终以float64累加）
+    PRECISIONS = {'float64': np.float64, 'float32': np.float32}
+
     _instance = None
 
     def __new__(cls):
@@ -20,91 +36,542 @@ class PhysicsEngine:
         return cls._instance
 
     def __init__(self):
-        self.balls = []
         self.integration_method = 'verlet'
         self.initial_energy = None
+        self._energy_cache = None  # (BodyStore.version, 总能量)
+        self.published_energy = None  # 物理子进程发布的总能量（由PhysicsProcess写入）
         self.G = G
         # 物理模拟固定时间步长
         self.physics_accumulator = 0.0
+        self.last_dt = FIXED_PHYSICS_DT  # 最近一步的步长，用于计算插值系数
+        # 加载初始条件以来的累计步数与模拟时间（轨迹录制等按此定位）
+        self.step_count = 0
+        self.sim_time = 0.0
         # 质心对象
         self.centroid = Centroid()
+        # 分配跟踪器（仅在开启分配跟踪时存在）
+        self.allocation_tracker = None
+        # 引力计算线程池（多线程时在首次计算时创建）
+        self._executor = None
+        self.workers = 1
+        self.set_workers(CONFIG['physics_workers'])
+        self.precision = CONFIG['simulation_precision']
+        # 质点状态存储与视图序列（按需创建Ball对象）
+        self.bodies = BodyStore(self.PRECISIONS[self.precision])
+        self.balls = BallSequence(self.bodies)
+        self._centroid_stale = True
+        self._trail_phase = 0  # 多步推进时距上次记录轨迹的步数
+
+    @property
+    def count(self):
+        """质点数量"""
+        return self.bodies.count
+
+    def set_precision(self, precision):
+        """
+        切换状态数组精度
+
+        Args:
+            precision: 'float64'或'float32'
+
+        Raises:
+            ValueError: 不支持的精度
+        """
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"unsupported precision '{precision}', expected one of: {', '.join(self.PRECISIONS)}")
+        self.precision = precision
+        self.bodies.set_dtype(self.PRECISIONS[precision])
+
+    def _row_chunks(self, size):
+        """把所有行按分块对齐切分为线程任务，任务数为线程数的若干倍以平衡负载"""
+        rows = self._tile_rows()
+        tiles = -(-size // rows)
+        tasks = min(tiles, self.workers * CONFIG['physics_tasks_per_worker'])
+        # 分块较少时每块的计算量不足以抵消线程调度的开销，不拆分任务
+        if tasks <= 1 or tiles < CONFIG['physics_parallel_min_tiles']:
+            return [(0, size)]
+        tiles_per_task = -(-tiles // tasks)
+        step = tiles_per_task * rows
+        return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+    def _get_executor(self):
+        """获取引力计算线程池（单线程时返回None）"""
+        if self.workers <= 1:
+            return None
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='physics')
+        return self._executor
+
+    def set_workers(self, workers):
+        """
+        设置引力计算的线程数
 
-    def calculate_gravity_force(self, ball1, ball2):
-        """计算两个质点之间的引力"""
-        # 计算距离向量
-        distance_vector = ball2.position - ball1.position
-        distance_squared = distance_vector.magnitude_squared()
-
-        # 避免除零错误和数值不稳定（添加最小距离）
-        min_distance = ball1.radius + ball2.radius
-        min_distance_squared = min_distance * min_distance
-        if distance_squared <= min_distance_squared:
-            distance_squared = min_distance_squared
-
-        # 万有引力公式 F = G * m1 * m2 / r²
-        force_magnitude = self.G * ball1.mass * ball2.mass / distance_squared
-
-        # 计算力的方向（单位向量）
-        distance_magnitude = distance_vector.magnitude()
-        if distance_magnitude > 0:
-            unit_direction = distance_vector.normalize()
-            force_vector = unit_direction * force_magnitude
+        Args:
+            workers: 线程数，None或0表示使用CPU核心数（分块数不足physics_parallel_min_tiles时仍在当前线程计算）
+        """
+        self.shutdown()
+        self.workers = max(1, workers or os.cpu_count() or 1)
+
+    def shutdown(self):
+        """关闭引力计算线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _tile_rows(self):
+        """每个分块处理的行数，使分块内的成对临时数组约为force_tile_size个元素"""
+        return max(1, CONFIG['force_tile_size'] // max(1, self.bodies.size))
+
+    def calculate_accelerations(self, out=None):
+        """
+        分块向量化计算所有质点的引力加速度
+
+        成对计算使用状态数组的精度（float32模式下带宽减半），按行求和统一以float64累加。
+
+        Args:
+            out: (N, 2) float64输出数组，默认新建
+
+        Returns:
+            ndarray: 每个质点的加速度
+        """
+        bodies = self.bodies
+        dtype = bodies.dtype
+        positions = bodies.positions
+        radii = bodies.radii.astype(dtype, copy=False)
+        if out is None:
+            out = np.empty(positions.shape, dtype=np.float64)
+
+        # 分量分开存放为连续数组，成对计算都在二维(rows, N)数组上进行
+        x = np.ascontiguousarray(positions[:, 0])
+        y = np.ascontiguousarray(positions[:, 1])
+        gm = (self.G * bodies.masses).astype(dtype, copy=False)
+
+        chunks = self._row_chunks(bodies.size)
+        executor = self._get_executor() if len(chunks) > 1 else None
+        if executor is None:
+            for start, stop in chunks:
+                self._accelerate_rows(start, stop, x, y, gm, radii, out)
         else:
-            # 处理零向量情况
-            force_vector = Vector2D(0.0, 0.0)
+            # 各任务写入互不重叠的输出切片，无需加锁；NumPy在大数组运算中会释放GIL
+            futures = [executor.submit(self._accelerate_rows, start, stop, x, y, gm, radii, out)
+                       for start, stop in chunks]
+            for future in futures:
+                future.result()
+        return out
+
+    def _accelerate_rows(self, row_start, row_stop, x, y, gm, radii, out):
+        """计算[row_start, row_stop)行质点的加速度，按缓存友好的分块大小逐块处理"""
+        rows = self._tile_rows()
+        for start in range(row_start, row_stop, rows):
+            stop = min(start + rows, row_stop)
+            # 距离向量 (rows, N)
+            dx = x[None, :] - x[start:stop, None]
+            dy = y[None, :] - y[start:stop, None]
+            distance_squared = dx * dx
+            distance_squared += dy * dy
+            distance = np.sqrt(distance_squared)
+
+            # 避免除零错误和数值不稳定（添加最小距离）
+            softened = radii[start:stop, None] + radii[None, :]
+            softened *= softened
+            np.maximum(softened, distance_squared, out=softened)
 
-        return force_vector.x, force_vector.y
+            # a = G * m_j / r² 沿单位方向，即 G * m_j * d / (r² * |d|)
+            # 距离为零（包括自身）的位置不做除法，保留distance_squared中的0
+            softened *= distance
+            factor = np.divide(gm, softened, out=distance_squared, where=distance > 0)
+            out[start:stop, 0] = np.einsum('ij,ij->i', factor, dx, dtype=np.float64)
+            out[start:stop, 1] = np.einsum('ij,ij->i', factor, dy, dtype=np.float64)
 
     def calculate_total_energy(self):
-        """计算系统总能量"""
-        kinetic_energy = 0.0
-        potential_energy = 0.0
+        """计算系统总能量（成对距离使用状态数组的精度，求和以float64累加）"""
+        bodies = self.bodies
+        dtype = bodies.dtype
+        masses = np.asarray(bodies.masses, dtype=np.float64)
+        positions = bodies.positions
+        radii = bodies.radii.astype(dtype, copy=False)
 
         # 计算动能
-        for ball in self.balls:
-            velocity_squared = ball.velocity.magnitude_squared()
-            kinetic_energy += 0.5 * ball.mass * velocity_squared
-
-        # 计算势能
-        for i in range(len(self.balls)):
-            for j in range(i + 1, len(self.balls)):
-                distance_vector = self.balls[j].position - self.balls[i].position
-                distance = distance_vector.magnitude()
-                min_distance = self.balls[i].radius + self.balls[j].radius
-                if distance > min_distance:
-                    potential_energy -= self.G * self.balls[i].mass * self.balls[j].mass / distance
+        kinetic_energy = 0.5 * float(masses @ np.einsum('ij,ij->i', bodies.velocities, bodies.velocities,
+                                                        dtype=np.float64))
+
+        # 计算势能（按行分块，每对质点计算两次后折半）
+        x = np.ascontiguousarray(positions[:, 0])
+        y = np.ascontiguousarray(positions[:, 1])
+        potential_energy = 0.0
+        rows = self._tile_rows()
+        for start in range(0, bodies.size, rows):
+            stop = min(start + rows, bodies.size)
+            dx = x[None, :] - x[start:stop, None]
+            dy = y[None, :] - y[start:stop, None]
+            dx *= dx
+            dx += dy * dy
+            distance = np.sqrt(dx)
+            min_distance = radii[start:stop, None] + radii[None, :]
+            # 只统计距离大于两者半径之和的质点对
+            inverse = np.divide(1.0, distance, out=np.zeros_like(distance), where=distance > min_distance)
+            potential_energy -= 0.5 * self.G * float(masses[start:stop] @ np.einsum('ij,j->i', inverse, masses,
+                                                                                     dtype=np.float64))
 
         return kinetic_energy + potential_energy
 
-    def add_ball(self, ball):
-        """添加质点"""
-        self.balls.append(ball)
+    def load_arrays(self, positions, velocities, masses, radii, colors=None):
+        """
+        直接引用给定数组作为质点状态（替换现有质点），不做复制
+
+        只读或内存映射（mmap_mode='c'）的数组在引擎首次写入时才会复制对应页面。
+
+        Args:
+            positions: (N, 2) 位置数组
+            velocities: (N, 2) 速度数组
+            masses: (N,) 质量数组
+            radii: (N,) 显示半径数组
+            colors: (N, 3) uint8颜色数组，None表示按调色板循环
+        """
+        self.bodies.load(positions, velocities, masses, radii, colors)
+        self.initial_energy = None
+        self.published_energy = None
+        self.physics_accumulator = 0.0
+        self.step_count = 0
+        self.sim_time = 0.0
+        self.centroid.trail = []
+        # 质心在首次更新或绘制时计算，避免加载时读取全部数据
+        self._centroid_stale = True
+
+    def add_body(self, x, y, vx, vy, mass, radius, color=None):
+        """
+        添加一个质点
+
+        Returns:
+            Ball: 新质点的视图
+        """
+        index = self.bodies.add(x, y, vx, vy, mass, radius, color, dt=self.last_dt)
+        self.initial_energy = None
+        self._centroid_stale = True
+        return Ball(self.bodies, index)
+
+    def remove_body(self, ball):
+        """删除一个质点（其他质点的序号保持不变）"""
+        self.bodies.remove(ball.index)
+        self.initial_energy = None
+        self._centroid_stale = True
+
+    def load_initial_conditions(self, initial_conditions):
+        """
+        从初始条件数组加载质点（替换现有质点）
+
+        Args:
+            initial_conditions: core.scenarios.InitialConditions
+        """
+        self.load_arrays(initial_conditions.positions, initial_conditions.velocities, initial_conditions.masses,
+                         initial_conditions.radii, initial_conditions.colors)
+
+    def load_snapshot(self, path, mmap_mode='c'):
+        """
+        从.npz文件或.npy目录加载快照，数组以内存映射方式引用
+
+        Args:
+            path: 快照路径，见core.snapshot.load_snapshot
+            mmap_mode: 内存映射模式，默认写时复制
+        """
+        from core.snapshot import load_snapshot
+        self.load_initial_conditions(load_snapshot(path, mmap_mode=mmap_mode))
+
+    def save_snapshot(self, path):
+        """将当前状态保存为未压缩的.npz快照"""
+        from core.snapshot import save_snapshot
+        save_snapshot(path, InitialConditions(*self.bodies.live_arrays()))
+
+    def on_state_updated(self):
+        """状态数组被外部（如物理子进程）更新后调用：记录轨迹并更新质心"""
+        bodies = self.bodies
+        bodies.mark_changed()
+        bodies.record_trails()
+        self.centroid.update(bodies.positions, bodies.velocities, bodies.masses)
+        self._centroid_stale = False
+
+    def restore_state(self, positions, velocities, prev_positions, step_count, sim_time, last_dt, structure=None):
+        """
+        恢复此前保存的积分状态（见core.rewind_buffer），之后的积分与从该状态连续模拟逐位一致
+
+        轨迹与质心轨迹被清空；质点结构不变时能量基准保持不变（漂移仍相对初始状态计算），
+        恢复了不同的结构时与增删质点一样重新建立能量基准。
+
+        Args:
+            positions, velocities, prev_positions: 状态数组，prev_positions为None表示尚未积分
+            step_count, sim_time: 该状态的累计步数与模拟时间
+            last_dt: 该状态最近一步的步长
+            structure: 该状态对应的质点结构（BodyStructure），None表示与当前结构相同
+        """
+        initial_energy = self.initial_energy
+        if structure is not None:
+            self.bodies.restore_structure(structure)
+            initial_energy = None
+        self.bodies.restore(positions, velocities, prev_positions)
+        self.clear_history()
+        self.initial_energy = initial_energy
+        self.step_count = step_count
+        self.sim_time = sim_time
+        self.last_dt = last_dt
+        self.physics_accumulator = 0.0
+        self._trail_phase = 0
+
+    def clear_history(self):
+        """清空轨迹与能量基准（状态被重置时调用）"""
+        self.bodies.mark_changed()
+        self.bodies.trail_lengths[:] = 0
+        self.centroid.trail = []
+        self.initial_energy = None
+        self.published_energy = None
+        self._centroid_stale = True
+
+    def refresh_centroid(self):
+        """重新计算质心位置和速度（不记录轨迹）"""
+        bodies = self.bodies
+        centroid = self.centroid
+        centroid.calculate_position(bodies.positions, bodies.masses)
+        centroid.calculate_velocity(bodies.velocities, bodies.masses)
+        centroid.prev_position = centroid.render_position = centroid.position
+        self._centroid_stale = False
+
+    def get_interpolation_alpha(self):
+        """插值系数：累积器中剩余的时间 / 步长，范围[0, 1]"""
+        return min(1.0, max(0.0, self.physics_accumulator / self.last_dt))
+
+    def interpolate(self, alpha=None):
+        """
+        计算渲染用的插值状态（质点位置与质心），在绘制和摄像头更新之前调用
+
+        Args:
+            alpha: 插值系数，默认使用get_interpolation_alpha()
+        """
+        if alpha is None:
+            alpha = self.get_interpolation_alpha()
+        if self._centroid_stale:
+            self.refresh_centroid()
+        self.bodies.interpolate(alpha)
+        self.centroid.interpolate(alpha)
 
     def update(self, dt):
         """更新物理状态"""
-        # 计算每个质点受到的总力
-        forces = [(0, 0) for _ in self.balls]
+        if self.allocation_tracker is not None:
+            self.allocation_tracker.measure(self._step, dt)
+        else:
+            self._step(dt)
+
+    def advance(self, n_steps, dt):
+        """
+        连续执行n_steps个物理步，高速模拟时替代逐步调用update
+
+        小规模系统使用预分配临时数组的融合内核，成对的软化距离等常量每次调用只计算一次；
+        中间步不计算速度，轨迹每trail_sample_steps步记录一次，质心只在最后更新一次。
+
+        Args:
+            n_steps: 步数
+            dt: 物理步长
+
+        Returns:
+            int: 执行的步数
+        """
+        if n_steps <= 0 or self.count == 0 or dt <= 0:
+            return 0
+        if self.allocation_tracker is not None:
+            # 分配跟踪按单步统计
+            for _ in range(n_steps):
+                self.update(dt)
+            return n_steps
+
+        bodies = self.bodies
+        self._prepare_integrator(dt)
+        if bodies.size * bodies.size <= CONFIG['force_tile_size']:
+            accelerate = self._pair_kernel()
+        else:
+            # 大规模系统每步的计算量远大于解释器开销，沿用分块/多线程路径
+            accelerate = self.calculate_accelerations
+
+        interval = max(1, CONFIG['trail_sample_steps'])
+        last = n_steps - 1
+        for step in range(n_steps):
+            acceleration = accelerate(out=bodies.accelerations)
+            self._integrate(dt, acceleration, update_velocities=step == last)
+            self._trail_phase = (self._trail_phase + 1) % interval
+            if self._trail_phase == 0:
+                bodies.record_trails()
+        self.step_count += n_steps
+        self.sim_time += n_steps * dt
+
+        # 上一步的质心由交换后的前一帧位置计算，保证渲染插值正确
+        self.centroid.update(bodies.positions, bodies.velocities, bodies.masses, bodies.prev_positions)
+        self._centroid_stale = False
+        return n_steps
+
+    def _pair_kernel(self):
+        """
+        创建小规模系统的加速度内核（全部质点对在一个分块内）
+
+        软化距离与G*m在创建时计算，(N, N)临时数组预先分配，结果与calculate_accelerations逐位一致。
 
-        for i in range(len(self.balls)):
-            for j in range(i + 1, len(self.balls)):
-                # 计算质点i和质点j之间的引力
-                fx, fy = self.calculate_gravity_force(self.balls[i], self.balls[j])
+        Returns:
+            callable: accelerate(out)，把加速度写入out并返回
+        """
+        bodies = self.bodies
+        dtype = bodies.dtype
+        radii = bodies.radii.astype(dtype, copy=False)
+        gm = (self.G * bodies.masses).astype(dtype, copy=False)
+        softened = radii[:, None] + radii[None, :]
+        softened *= softened
+        shape = (bodies.size, bodies.size)
+        dx, dy, distance_squared, distance, denominator = (np.empty(shape, dtype=dtype) for _ in range(5))
+        nonzero = np.empty(shape, dtype=bool)
 
-                # 牛顿第三定律
-                forces[i] = (forces[i][0] + fx, forces[i][1] + fy)
-                forces[j] = (forces[j][0] - fx, forces[j][1] - fy)
+        def accelerate(out):
+            # 位置缓冲区每步交换，需每次重新获取
+            positions = bodies.positions
+            x = positions[:, 0]
+            y = positions[:, 1]
+            np.subtract(x[None, :], x[:, None], out=dx)
+            np.subtract(y[None, :], y[:, None], out=dy)
+            np.multiply(dx, dx, out=distance_squared)
+            np.multiply(dy, dy, out=denominator)
+            np.add(distance_squared, denominator, out=distance_squared)
+            np.sqrt(distance_squared, out=distance)
 
-        # 应用力并更新位置
-        for i, ball in enumerate(self.balls):
-            if self.integration_method == 'verlet':
-                ball.apply_force_verlet(forces[i][0], forces[i][1], dt)
+            np.maximum(softened, distance_squared, out=denominator)
+            np.multiply(denominator, distance, out=denominator)
+            np.greater(distance, 0, out=nonzero)
+            factor = np.divide(gm, denominator, out=distance_squared, where=nonzero)
+            np.einsum('ij,ij->i', factor, dx, dtype=np.float64, out=out[:, 0])
+            np.einsum('ij,ij->i', factor, dy, dtype=np.float64, out=out[:, 1])
+            return out
+
+        return accelerate
+
+    def _step(self, dt):
+        """执行一个物理步"""
+        if self.count == 0 or dt <= 0:
+            return
+
+        bodies = self.bodies
+        self._prepare_integrator(dt)
+
+        if self.integration_method == 'verlet':
+            self._verlet(dt)
+        self.step_count += 1
+        self.sim_time += dt
+
+        # 添加轨迹点
+        bodies.record_trails()
 
         # 更新质心状态
-        self.centroid.update(self.balls)
+        self.centroid.update(bodies.positions, bodies.velocities, bodies.masses)
+        self._centroid_stale = False
+
+    def _prepare_integrator(self, dt):
+        """确保Verlet积分所需的前一帧位置存在，并在步长变化时保持隐含速度一致"""
+        bodies = self.bodies
+        if bodies.prev_positions is None:
+            # 为Verlet积分法初始化前一帧的位置
+            bodies.ensure_integrator_state(dt)
+        elif dt != self.last_dt:
+            # 步长变化（如调度器回退为粗步长）时保持隐含速度一致
+            bodies.rescale_previous(dt / self.last_dt)
+        self.last_dt = dt
+
+    def _verlet(self, dt):
+        """使用Verlet积分法原地更新位置和速度"""
+        acceleration = self.calculate_accelerations(out=self.bodies.accelerations)
+        self._integrate(dt, acceleration)
+
+    def _integrate(self, dt, acceleration, update_velocities=True):
+        """
+        Verlet积分的位置与速度更新
+
+        Args:
+            dt: 物理步长
+            acceleration: 当前位置处的加速度
+            update_velocities: 是否计算速度（多步推进的中间步不需要）
+        """
+        bodies = self.bodies
+        positions, prev_positions, velocities = bodies.positions, bodies.prev_positions, bodies.velocities
+
+        if update_velocities:
+            # 计算速度：v = (x(t+dt) - x(t-dt)) / (2*dt) = (x(t) - x(t-dt)) / dt + a*dt/2
+            np.subtract(positions, prev_positions, out=velocities)
+            velocities /= dt
+            velocities += acceleration * (dt / 2)
+
+        # Verlet积分：x(t+dt) = 2*x(t) - x(t-dt) + a*dt²，直接写入前一帧位置的缓冲区后交换
+        prev_positions *= -1
+        prev_positions += positions
+        prev_positions += positions
+        prev_positions += acceleration * (dt * dt)
+        bodies.swap_position_buffers()
+
+    def enable_allocation_tracking(self, enable=True, tracked_types=None):
+        """
+        开启/关闭每步分配跟踪
+
+        Args:
+            enable: 是否开启
+            tracked_types: 需要统计创建次数的类，默认统计Vector2D
+        """
+        if enable and self.allocation_tracker is None:
+            from profiling.allocations import AllocationTracker
+            self.allocation_tracker = AllocationTracker(tracked_types or (Vector2D,))
+            self.allocation_tracker.start()
+        elif not enable and self.allocation_tracker is not None:
+            self.allocation_tracker.stop()
+            self.allocation_tracker = None
+
+    def toggle_allocation_tracking(self):
+        """切换分配跟踪"""
+        self.enable_allocation_tracking(self.allocation_tracker is None)
+
+    def get_allocation_stats(self):
+        """获取分配跟踪统计，未开启时返回None"""
+        if self.allocation_tracker is None:
+            return None
+        return self.allocation_tracker.summary()
+
+    def measure_allocations(self, steps, dt, tracked_types=None):
+        """
+        执行指定步数并统计每步分配，用于断言分配预算
+
+        Args:
+            steps: 测量的步数
+            dt: 物理步长
+            tracked_types: 需要统计创建次数的类
+
+        Returns:
+            AllocationStats: 按步平均的分配统计
+        """
+        previous = self.allocation_tracker
+        if previous is not None:
+            previous.stop()
+        self.allocation_tracker = None
+        self.enable_allocation_tracking(True, tracked_types)
+        try:
+            for _ in range(steps):
+                self.update(dt)
+            return self.allocation_tracker.summary()
+        finally:
+            self.enable_allocation_tracking(False)
+            if previous is not None:
+                previous.start()
+                self.allocation_tracker = previous
 
     def check_energy_conservation(self):
         """检查能量守恒情况，返回能量漂移百分比"""
-        current_energy = self.calculate_total_energy()
+        # 物理在子进程中运行时使用其发布的能量，避免渲染进程重复O(N²)计算
+        if self.published_energy is not None:
+            current_energy = self.published_energy
+        else:
+            # 状态未变化（如暂停）时复用上一次的结果，避免每帧重复O(N²)计算
+            version = self.bodies.version
+            if self._energy_cache is None or self._energy_cache[0] != version:
+                self._energy_cache = (version, self.calculate_total_energy())
+            current_energy = self._energy_cache[1]
 
         if self.initial_energy is None:
             self.initial_energy = current_energy
@@ -117,10 +584,19 @@ class PhysicsEngine:
         return 0.0
 
     def draw(self, centroid: bool):
-        """绘制所有质点"""
-        for ball in self.balls:
-            ball.draw()
+        """绘制所有质点：有轨迹的质点逐个绘制轨迹，质点本身由批量渲染器一次绘制（密度模式下不绘制轨迹）"""
+        bodies = self.bodies
+        renderer = BodyRenderer.get_instance()
+        if not renderer.uses_density(bodies):
+            for index in range(min(len(bodies.trail_lengths), bodies.size)):
+                if bodies.trail_lengths[index] > 1:
+                    Ball(bodies, index).draw_trail()
+            # alpha渐隐模式下把所有质点轨迹一次混合到屏幕，质点绘制在轨迹之上
+            TrailRenderer.get_instance().flush(ScreenManager.get_instance().screen)
+        renderer.draw(bodies, ScreenManager.get_instance().screen)
 
         if centroid:
-            # 绘制质心
-            self.centroid.draw()
+            if self._centroid_stale:
+                self.refresh_centroid()
+            # 绘制质心（渲染质量降低时不绘制质心轨迹）
+            self.centroid.draw(CONFIG['show_centroid_trail'] and QualityGovernor.get_instance().centroid_trail)
@@ -0,0 +1,312 @@
+"""子进程物理模拟模块
+
+物理引擎在子进程中按墙钟时间推进，每步把位置和速度写入multiprocessing.shared_memory中的双缓冲区；
+渲染进程只读取最新的一致快照，暂停、速度、重置等命令通过管道发送。这样物理吞吐量不再受帧率影响，
+渲染也不会被慢的物理步阻塞。
+
+一致性使用每个缓冲区各自的序列号（写入时为奇数，写完为偶数）：读取前后序列号相同且为偶数才有效，
+否则重试；写入方始终写入非最新的缓冲区，因此读取方几乎不会与写入冲突，写入方也从不等待。
+"""
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config.config import CONFIG, FIXED_PHYSICS_DT
+
+# 每个缓冲区头部的整数字段：序列号、累计步数、重置代数
+SEQ, STEPS, GENERATION = range(3)
+INT_FIELDS = 3
+# 每个缓冲区头部的浮点字段：总能量（尚未计算时为NaN）
+ENERGY = 0
+FLOAT_FIELDS = 1
+
+
+class SharedState:
+    """共享内存中的状态布局：最新缓冲区序号、两个缓冲区的头部，静态的质量/半径与双缓冲的位置/速度"""
+
+    def __init__(self, shm, count, dtype):
+        """
+        Args:
+            shm: SharedMemory对象
+            count: 质点数量
+            dtype: 位置与速度的类型
+        """
+        self.shm = shm
+        self.count = count
+        self.dtype = np.dtype(dtype)
+
+        offset = 0
+
+        def view(shape, view_dtype):
+            nonlocal offset
+            array = np.ndarray(shape, dtype=view_dtype, buffer=shm.buf, offset=offset)
+            # 按8字节对齐下一个数组
+            offset += -(-array.nbytes // 8) * 8
+            return array
+
+        self.latest = view((1,), np.int64)
+        self.ints = view((2, INT_FIELDS), np.int64)
+        self.floats = view((2, FLOAT_FIELDS), np.float64)
+        self.masses = view((count,), np.float64)
+        self.radii = view((count,), np.float64)
+        self.positions = view((2, count, 2), self.dtype)
+        self.velocities = view((2, count, 2), self.dtype)
+        # 读取时的暂存缓冲区（只有读取方需要，第一次读取时创建）
+        self._scratch = None
+
+    @staticmethod
+    def required_size(count, dtype):
+        """共享内存所需的字节数"""
+        itemsize = np.dtype(dtype).itemsize
+        sizes = (8, 2 * INT_FIELDS * 8, 2 * FLOAT_FIELDS * 8, count * 8, count * 8,
+                 4 * count * itemsize, 4 * count * itemsize)
+        return max(8, sum(-(-size // 8) * 8 for size in sizes))
+
+    @classmethod
+    def create(cls, count, dtype):
+        """创建新的共享内存块"""
+        shm = shared_memory.SharedMemory(create=True, size=cls.required_size(count, dtype))
+        state = cls(shm, count, dtype)
+        state.latest[0] = 0
+        state.ints[:] = 0
+        state.floats[:] = np.nan
+        return state
+
+    @classmethod
+    def attach(cls, name, count, dtype):
+        """连接已存在的共享内存块（子进程使用，由父进程负责unlink）"""
+        return cls(shared_memory.SharedMemory(name=name), count, dtype)
+
+    def publish(self, positions, velocities, steps, generation, energy=None):
+        """写入非最新的缓冲区并将其设为最新"""
+        buffer = 1 - int(self.latest[0])
+        ints = self.ints[buffer]
+        ints[SEQ] += 1  # 奇数：正在写入
+        self.positions[buffer] = positions
+        self.velocities[buffer] = velocities
+        ints[STEPS] = steps
+        ints[GENERATION] = generation
+        self.floats[buffer, ENERGY] = np.nan if energy is None else energy
+        ints[SEQ] += 1  # 偶数：写入完成
+        self.latest[0] = buffer
+
+    def read(self, positions_out, velocities_out, retries=8):
+        """
+        把最新的一致快照复制到输出数组
+
+        先复制到暂存缓冲区，序列号校验通过后才写入输出数组，读到写了一半的缓冲区时输出数组保持不变。
+
+        Returns:
+            tuple: (steps, generation, energy)；多次重试仍不一致时返回None（保留上一帧状态，不阻塞）
+        """
+        if self._scratch is None:
+            self._scratch = (np.empty_like(self.positions[0]), np.empty_like(self.velocities[0]))
+        positions, velocities = self._scratch
+        for _ in range(retries):
+            buffer = int(self.latest[0])
+            seq = int(self.ints[buffer, SEQ])
+            if seq % 2:
+                continue
+            np.copyto(positions, self.positions[buffer])
+            np.copyto(velocities, self.velocities[buffer])
+            steps = int(self.ints[buffer, STEPS])
+            generation = int(self.ints[buffer, GENERATION])
+            energy = float(self.floats[buffer, ENERGY])
+            if int(self.ints[buffer, SEQ]) == seq:
+                np.copyto(positions_out, positions, casting='same_kind')
+                np.copyto(velocities_out, velocities, casting='same_kind')
+                return steps, generation, (None if np.isnan(energy) else energy)
+        return None
+
+    def close(self):
+        """断开共享内存（视图释放后才能关闭）"""
+        self.latest = self.ints = self.floats = None
+        self.masses = self.radii = self.positions = self.velocities = None
+        self._scratch = None
+        self.shm.close()
+
+
+def _run_physics(conn, shm_name, count, precision, workers):
+    """子进程入口：按墙钟时间推进物理模拟并发布状态，直到收到stop命令或管道关闭"""
+    from core.physics_engine import PhysicsEngine
+
+    engine = PhysicsEngine()
+    engine.set_precision(precision)
+    engine.set_workers(workers)
+    state = SharedState.attach(shm_name, count, PhysicsEngine.PRECISIONS[precision])
+    initial = (state.positions[0].copy(), state.velocities[0].copy(), state.masses.copy(), state.radii.copy())
+
+    def load_initial():
+        engine.load_arrays(*(array.copy() for array in initial))
+        return engine.calculate_total_energy()
+
+    energy = load_initial()
+    paused, speed, generation, steps = False, 1.0, 0, 0
+    accumulator = 0.0
+    energy_interval = CONFIG['physics_process_energy_interval']
+    max_lag = CONFIG['physics_process_max_lag']
+    last_time = last_energy_time = time.perf_counter()
+    state.publish(engine.bodies.positions, engine.bodies.velocities, steps, generation, energy)
+
+    try:
+        while True:
+            # 处理命令；暂停时在管道上阻塞等待，避免空转
+            timeout = CONFIG['physics_process_poll_interval'] if paused else 0
+            while conn.poll(timeout):
+                command, value = conn.recv()
+                if command == 'stop':
+                    return
+                if command == 'pause':
+                    paused = value
+                elif command == 'speed':
+                    speed = value
+                elif command == 'reset':
+                    energy = load_initial()
+                    generation += 1
+                    accumulator = 0.0
+                    state.publish(engine.bodies.positions, engine.bodies.velocities, steps, generation, energy)
+                timeout = 0
+
+            now = time.perf_counter()
+            if not paused:
+                # 落后太多时丢弃积压的时间，模拟变慢而不是无限追赶
+                accumulator = min(accumulator + (now - last_time) * speed, max_lag)
+            last_time = now
+
+            if paused or accumulator < FIXED_PHYSICS_DT:
+                if not paused:
+                    # 距下一步还有时间，在管道上等待（有命令时立即返回）
+                    conn.poll((FIXED_PHYSICS_DT - accumulator) / max(speed, 1e-6))
+                continue
+
+            engine.update(FIXED_PHYSICS_DT)
+            accumulator -= FIXED_PHYSICS_DT
+            steps += 1
+
+            energy = None
+            if now - last_energy_time >= energy_interval:
+                energy = engine.calculate_total_energy()
+                last_energy_time = now
+            state.publish(engine.bodies.positions, engine.bodies.velocities, steps, generation, energy)
+    except (EOFError, BrokenPipeError, KeyboardInterrupt):
+        # 父进程已退出
+        pass
+    finally:
+        engine.shutdown()
+        state.close()
+
+
+class PhysicsProcess:
+    """在子进程中运行物理引擎，渲染进程的引擎只作为镜像（读取快照、记录轨迹与质心）"""
+
+    def __init__(self):
+        self.process = None
+        self.conn = None
+        self.state = None
+        self.steps = 0  # 已同步到镜像的累计步数
+        self.generation = 0
+        self._sent = {}  # 最近发送的命令值，值不变时不重复发送
+
+    def is_running(self):
+        """子进程是否在运行"""
+        return self.process is not None and self.process.is_alive()
+
+    def start(self, engine):
+        """
+        以镜像引擎的当前状态作为初始条件启动子进程
+
+        镜像中有已删除质点的空槽位时先压缩（与子进程的质点顺序一致）；之后不能再在镜像中增删质点。
+
+        Args:
+            engine: 渲染进程中的PhysicsEngine（已加载初始条件）
+        """
+        bodies = engine.bodies
+        if bodies.free_slots:
+            # 共享内存与子进程只包含存活质点，镜像先压缩为相同的布局，sync时可以按行直接复制
+            engine.load_arrays(*bodies.live_arrays())
+        positions, velocities, masses, radii = bodies.positions, bodies.velocities, bodies.masses, bodies.radii
+        self.state = SharedState.create(len(masses), bodies.dtype)
+        self.state.masses[:] = masses
+        self.state.radii[:] = radii
+        self.state.positions[0] = positions
+        self.state.velocities[0] = velocities
+
+        # 使用spawn避免复制已初始化显示的pygame进程
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_run_physics, name='physics', daemon=True,
+                                       args=(child_conn, self.state.shm.name, len(masses), engine.precision,
+                                             engine.workers))
+        self.process.start()
+        child_conn.close()
+        self.steps = 0
+        self.generation = 0
+        self._sent = {}
+
+    def _send(self, command, value=None):
+        """发送命令，子进程已退出时忽略"""
+        try:
+            self.conn.send((command, value))
+        except (BrokenPipeError, OSError) as e:
+            print(f"Physics process is not running: {e}")
+
+    def set_paused(self, paused):
+        """暂停或继续（值不变时不发送）"""
+        if self._sent.get('pause') != paused:
+            self._sent['pause'] = paused
+            self._send('pause', paused)
+
+    def set_speed(self, speed):
+        """设置模拟速度倍率（值不变时不发送）"""
+        if self._sent.get('speed') != speed:
+            self._sent['speed'] = speed
+            self._send('speed', speed)
+
+    def reset(self):
+        """让子进程恢复初始条件"""
+        self._send('reset')
+
+    def sync(self, engine):
+        """
+        把最新快照复制到镜像引擎，记录轨迹并更新质心
+
+        Returns:
+            int: 距上次同步子进程推进的步数
+        """
+        bodies = engine.bodies
+        snapshot = self.state.read(bodies.positions, bodies.velocities)
+        if snapshot is None:
+            return 0
+        steps, generation, energy = snapshot
+        if generation != self.generation:
+            engine.clear_history()
+            engine.step_count = 0
+            engine.sim_time = 0.0
+            self.generation = generation
+        if energy is not None:
+            engine.published_energy = energy
+        advanced = steps - self.steps
+        self.steps = steps
+        if advanced > 0:
+            engine.step_count += advanced
+            engine.sim_time += advanced * FIXED_PHYSICS_DT
+            engine.on_state_updated()
+        return advanced
+
+    def stop(self):
+        """停止子进程并释放共享内存"""
+        if self.process is not None:
+            self._send('stop')
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.conn.close()
+            self.process = None
+        if self.state is not None:
+            shm = self.state.shm
+            self.state.close()
+            shm.unlink()
+            self.state = None
@@ -0,0 +1,311 @@
+import time
+import zlib
+
+import numpy as np
+
+from config.config import CONFIG
+
+# 快照保存的状态数组（prev_positions是Verlet积分的前一步位置，恢复后继续积分与连续模拟逐位一致）
+STATE_FIELDS = ('positions', 'velocities', 'prev_positions')
+
+
+def encode_delta(array, base):
+    """
+    把状态数组编码为相对关键帧的压缩差分（无损）
+
+    按位异或关键帧后，变化缓慢的高位字节（符号、指数、高位尾数）大多为零；按字节位次拆成位面分别处理：
+    零字节多的位面用zlib以最快级别压缩，低位尾数的位面接近随机噪声，压缩不了且占用大部分压缩时间，直接保存。
+
+    Args:
+        array: 当前状态数组
+        base: 关键帧中的同名数组，None表示没有可参考的数组（直接按位面编码原始数据）
+
+    Returns:
+        list: 每个字节位面的(是否压缩, bytes)
+    """
+    itemsize = array.dtype.itemsize
+    bits = np.ascontiguousarray(array).view(f'<u{itemsize}')
+    if base is not None:
+        bits = bits ^ base.view(f'<u{itemsize}')
+    planes = bits.view(np.uint8).reshape(-1, itemsize)
+    encoded = []
+    for k in range(itemsize):
+        plane = np.ascontiguousarray(planes[:, k])
+        if np.count_nonzero(plane) > plane.size * CONFIG['rewind_raw_plane_ratio']:
+            encoded.append((False, plane.tobytes()))
+        else:
+            encoded.append((True, zlib.compress(plane.tobytes(), CONFIG['rewind_compress_level'])))
+    return encoded
+
+
+def decode_delta(encoded, base, shape, dtype):
+    """
+    解码encode_delta的结果
+
+    Args:
+        encoded: 各字节位面的编码
+        base: 编码时使用的关键帧数组（或None）
+        shape, dtype: 原数组的形状与类型
+
+    Returns:
+        ndarray: 恢复的状态数组
+    """
+    itemsize = np.dtype(dtype).itemsize
+    planes = np.empty((int(np.prod(shape)), itemsize), dtype=np.uint8)
+    for k, (compressed, data) in enumerate(encoded):
+        planes[:, k] = np.frombuffer(zlib.decompress(data) if compressed else data, dtype=np.uint8)
+    bits = planes.view(f'<u{itemsize}').reshape(shape)
+    if base is not None:
+        bits ^= base.view(f'<u{itemsize}')
+    return bits.view(dtype)
+
+
+class RewindSnapshot:
+    """回退缓冲区中的一个快照：关键帧保存状态数组的副本，差分快照保存相对所属关键帧的压缩差分
+
+    质点结构（质量、存活标记等）在增删质点之间不变，同一结构的快照共用一个BodyStructure。
+    """
+
+    def __init__(self, step_count, sim_time, last_dt, arrays, structure, keyframe=None):
+        """
+        Args:
+            step_count, sim_time, last_dt: 引擎的计步状态
+            arrays: 字段名 -> 数组（关键帧）或encode_delta的编码（差分快照），没有的字段为None
+            structure: 快照时的质点结构（core.body_store.BodyStructure）
+            keyframe: 差分快照所属的关键帧（结构相同），None表示本身是关键帧
+        """
+        self.step_count = step_count
+        self.sim_time = sim_time
+        self.last_dt = last_dt
+        self.arrays = arrays
+        self.structure = structure
+        self.keyframe = keyframe
+        self.nbytes = sum(value.nbytes if isinstance(value, np.ndarray) else sum(len(data) for _, data in value)
+                          for value in arrays.values() if value is not None)
+
+    def is_keyframe(self):
+        """是否为关键帧"""
+        return self.keyframe is None
+
+    def state(self, dtype):
+        """
+        恢复完整的状态数组（差分快照只需解码一次并与关键帧异或，耗时与状态大小成正比，与历史长度无关）
+
+        Returns:
+            dict: 字段名 -> 数组（或None）
+        """
+        if self.keyframe is None:
+            return self.arrays
+        base = self.keyframe.arrays
+        shape = (self.structure.size, 2)
+        return {name: None if data is None else decode_delta(data, base[name], shape, dtype)
+                for name, data in self.arrays.items()}
+
+
+class RewindBuffer:
+    """回退缓冲区单例类，在内存中保存有界的引擎快照历史，用于回退和快速重置到初始状态
+
+    模拟运行时每隔rewind_interval秒（墙钟时间）保存一个快照：每rewind_keyframe_interval个快照（或差分压缩
+    效果不好、质点结构变化时）保存一个完整的关键帧，其余保存相对该关键帧的压缩差分，因此恢复任意快照都只需解码一次。
+    质点数超过rewind_delta_max_bodies时编码差分的耗时会造成掉帧，所有快照都直接复制为关键帧。
+    历史总字节数超过rewind_memory_bytes时从最旧的关键帧组开始丢弃；初始状态单独保存，不会被丢弃。
+    快照同时引用当时的质点结构，增删质点后回退或重置会一并恢复质量、存活标记等。
+    """
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(RewindBuffer, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # 单例模式，避免重复初始化
+        if RewindBuffer._initialized:
+            return
+
+        self.enabled = CONFIG['rewind_enabled']
+        self.interval = CONFIG['rewind_interval']
+        self.memory_limit = CONFIG['rewind_memory_bytes']
+        self.keyframe_interval = max(1, CONFIG['rewind_keyframe_interval'])
+        self.initial = None  # 初始状态（重置目标）
+        self.history = []  # 快照列表，从旧到新
+        self.nbytes = 0  # history占用的字节数
+        self.capture_time = 0.0  # 最近一次保存快照的耗时（秒）
+        self._dtype = None
+        # 最近一次复制的质点结构与当时BodyStore的结构计数（计数不变时快照共用该结构）
+        self._structure = None
+        self._structure_version = None
+        self._last_step = 0
+        self._last_capture = 0.0
+        self._deltas = 0  # 最新关键帧之后的差分快照数
+
+        RewindBuffer._initialized = True
+
+    @classmethod
+    def get_instance(cls):
+        """获取RewindBuffer单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def start(self, engine):
+        """
+        以引擎当前状态作为初始状态，清空历史
+
+        Args:
+            engine: PhysicsEngine
+        """
+        bodies = engine.bodies
+        self._dtype = bodies.positions.dtype
+        self._structure = None
+        self._structure_version = None
+        self.history = []
+        self.nbytes = 0
+        self.initial = self._capture(engine, keyframe=True)
+        self._last_step = engine.step_count
+        self._last_capture = time.perf_counter()
+        self._deltas = 0
+
+    def on_physics(self, engine, steps):
+        """
+        物理推进后调用：距上次保存超过间隔时保存快照
+
+        精度变化、或状态被外部重置（累计步数回退）时，以当前状态重新开始。
+
+        Args:
+            engine: PhysicsEngine
+            steps: 本帧执行的物理步数
+        """
+        if not self.enabled:
+            return
+        bodies = engine.bodies
+        if self.initial is None or bodies.positions.dtype != self._dtype or engine.step_count < self._last_step:
+            self.start(engine)
+            return
+        self._last_step = engine.step_count
+        if steps <= 0:
+            return
+        now = time.perf_counter()
+        if now - self._last_capture < self.interval:
+            return
+        self._last_capture = now
+        self._append(self._capture(engine, keyframe=self._deltas + 1 >= self.keyframe_interval))
+
+    def _current_structure(self, bodies):
+        """当前的质点结构（结构计数变化后才重新复制）"""
+        if bodies.structure_version != self._structure_version:
+            self._structure = bodies.capture_structure()
+            self._structure_version = bodies.structure_version
+        return self._structure
+
+    def _capture(self, engine, keyframe):
+        """保存引擎当前状态为关键帧（复制数组）或相对最新关键帧的差分"""
+        start = time.perf_counter()
+        bodies = engine.bodies
+        previous_structure = self._structure
+        structure = self._current_structure(bodies)
+        state = {name: getattr(bodies, name) for name in STATE_FIELDS}
+        snapshot = None
+        base = None if keyframe else self._latest_keyframe()
+        if base is not None and base.structure is structure and bodies.size <= CONFIG['rewind_delta_max_bodies']:
+            arrays = {name: None if array is None else encode_delta(array, base.arrays[name])
+                      for name, array in state.items()}
+            snapshot = RewindSnapshot(engine.step_count, engine.sim_time, engine.last_dt, arrays, structure, base)
+            if snapshot.nbytes > base.nbytes * CONFIG['rewind_delta_max_ratio']:
+                # 状态已偏离关键帧太远，差分不再紧凑，改存新的关键帧
+                snapshot = None
+        if snapshot is None:
+            arrays = {name: None if array is None else array.copy() for name, array in state.items()}
+            snapshot = RewindSnapshot(engine.step_count, engine.sim_time, engine.last_dt, arrays, structure)
+        if structure is not previous_structure:
+            # 新复制的结构计入引入它的快照
+            snapshot.nbytes += structure.nbytes
+        self.capture_time = time.perf_counter() - start
+        return snapshot
+
+    def _latest_keyframe(self):
+        """最新的关键帧（历史为空时为初始状态）"""
+        for snapshot in reversed(self.history):
+            if snapshot.is_keyframe():
+                return snapshot
+        return self.initial
+
+    def _append(self, snapshot):
+        """加入历史，超出内存上限时按关键帧组丢弃最旧的快照（至少保留最新的一组）"""
+        self.history.append(snapshot)
+        self.nbytes += snapshot.nbytes
+        self._deltas = 0 if snapshot.is_keyframe() else self._deltas + 1
+
+        latest = self._latest_keyframe()
+        while self.nbytes > self.memory_limit and self.history and self.history[0] is not latest:
+            self.nbytes -= self.history.pop(0).nbytes
+            # 关键帧被丢弃后，依赖它的差分快照也无法恢复
+            while self.history and not self.history[0].is_keyframe():
+                self.nbytes -= self.history.pop(0).nbytes
+
+    def _restore(self, engine, snapshot):
+        bodies = engine.bodies
+        state = snapshot.state(self._dtype)
+        # 快照之后增删过质点时连同结构一起恢复
+        changed = bodies.structure_version != self._structure_version or snapshot.structure is not self._structure
+        engine.restore_state(state['positions'], state['velocities'], state['prev_positions'],
+                             snapshot.step_count, snapshot.sim_time, snapshot.last_dt,
+                             snapshot.structure if changed else None)
+        self._structure = snapshot.structure
+        self._structure_version = bodies.structure_version
+        self._last_step = snapshot.step_count
+        self._last_capture = time.perf_counter()
+
+    def can_restore(self, engine):
+        """缓冲区中的快照是否与引擎的当前状态数组相符（精度未变化）"""
+        return self.initial is not None and engine.bodies.positions.dtype == self._dtype
+
+    def rewind(self, engine):
+        """
+        回退到早于当前状态的最近一个快照，较新的快照被丢弃（之后从该状态重新记录）
+
+        Returns:
+            bool: 是否回退（没有更早的快照或精度已变化时为False）
+        """
+        if not self.can_restore(engine):
+            return False
+        while self.history and self.history[-1].step_count >= engine.step_count:
+            self.nbytes -= self.history.pop().nbytes
+        if not self.history:
+            if engine.step_count == self.initial.step_count:
+                return False
+            return self.reset(engine)
+        self._restore(engine, self.history[-1])
+        self._deltas = 0
+        for snapshot in reversed(self.history):
+            if snapshot.is_keyframe():
+                break
+            self._deltas += 1
+        return True
+
+    def reset(self, engine):
+        """
+        恢复初始状态并清空历史（不重新创建质点或各管理器）
+
+        Returns:
+            bool: 是否重置（精度已变化时为False）
+        """
+        if not self.can_restore(engine):
+            return False
+        self.history = []
+        self.nbytes = 0
+        self._deltas = 0
+        self._restore(engine, self.initial)
+        return True
+
+    def get_status_line(self):
+        """性能面板显示的回退缓冲区状态"""
+        if self.initial is None:
+            return "rewind: off"
+        keyframes = sum(snapshot.is_keyframe() for snapshot in self.history)
+        oldest = self.history[0].sim_time if self.history else self.initial.sim_time
+        return (f"rewind: {len(self.history)} snapshots ({keyframes} key) back to t={oldest:.1f}, "
+                f"{self.nbytes / 2 ** 20:.1f}/{self.memory_limit / 2 ** 20:.0f}MB, "
+                f"capture {self.capture_time * 1000:.1f}ms")
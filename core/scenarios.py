@@ -0,0 +1,274 @@
+"""初始条件生成模块
+
+所有生成器都直接输出位置、速度、质量与半径数组（全部向量化，不创建逐质点的Python对象），
+并通过种子保证可复现。
+"""
+import math
+
+import numpy as np
+
+from config.config import CONFIG, G, BLUE, RED, PURPLE, YELLOW, GREEN, auto_params
+
+# 默认配色（按质点序号循环使用）
+PALETTE = np.array([BLUE, RED, PURPLE, YELLOW, GREEN, CONFIG['colors']['light_blue']], dtype=np.uint8)
+
+
+class InitialConditions:
+    """初始条件，按质点存放的数组集合"""
+
+    def __init__(self, positions, velocities, masses, radii, colors=None):
+        """
+        Args:
+            positions: (N, 2) 位置数组
+            velocities: (N, 2) 速度数组
+            masses: (N,) 质量数组
+            radii: (N,) 显示半径数组
+            colors: (N, 3) RGB颜色数组，None表示按调色板循环（不生成数组）
+        """
+        self.positions = positions
+        self.velocities = velocities
+        self.masses = masses
+        self.radii = radii
+        self.colors = colors
+
+    def __len__(self):
+        return len(self.masses)
+
+    def total_mass(self):
+        """系统总质量"""
+        return float(self.masses.sum())
+
+
+def mass_to_radius(masses):
+    """按固定密度由质量推算显示半径（与calculate_auto_params一致：半径 = √(质量*PI)）"""
+    return np.sqrt(masses * math.pi)
+
+
+def _finish(positions, velocities, masses, center, colors=None):
+    """平移到指定中心、消除总动量并生成半径"""
+    # 消除系统总动量，使质心保持静止
+    velocities -= (masses[:, None] * velocities).sum(axis=0) / masses.sum()
+    positions += np.asarray(center, dtype=np.float64)
+    return InitialConditions(positions, velocities, masses, mass_to_radius(masses), colors)
+
+
+def _random_directions(rng, n):
+    """生成n个二维随机单位向量"""
+    angles = rng.uniform(0.0, 2.0 * math.pi, n)
+    return np.column_stack((np.cos(angles), np.sin(angles)))
+
+
+def _projected_directions(rng, n):
+    """生成n个三维各向同性单位向量在平面上的投影"""
+    z = rng.uniform(-1.0, 1.0, n)
+    return _random_directions(rng, n) * np.sqrt(1.0 - z * z)[:, None]
+
+
+def triangle(n=3, seed=None, center=(0.0, 0.0)):
+    """
+    默认的三体等边三角形配置（使用CONFIG中的质量、间距与初始速度）
+
+    Args:
+        n: 固定为3，仅为与其他生成器保持一致的参数签名
+        seed: 未使用
+        center: 系统中心
+    """
+    radius = CONFIG['separation'] / 2  # 三角形的外接圆半径
+    speed = CONFIG['initial_speed']
+    angles = np.array([0.0, 2 * math.pi / 3, 4 * math.pi / 3])  # 右侧、左上、左下
+
+    positions = np.column_stack((np.cos(angles), np.sin(angles))) * radius + np.asarray(center, dtype=np.float64)
+    # 切向速度（垂直于半径方向）
+    velocities = np.column_stack((-np.sin(angles), np.cos(angles))) * speed
+    masses = np.array([CONFIG['mass1'], CONFIG['mass2'], CONFIG['mass3']], dtype=np.float64)
+    radii = np.array([auto_params['radius1'], auto_params['radius2'], auto_params['radius3']])
+    colors = np.array([BLUE, RED, PURPLE], dtype=np.uint8)
+    return InitialConditions(positions, velocities, masses, radii, colors)
+
+
+def plummer_sphere(n, seed=None, center=(0.0, 0.0), total_mass=None, scale_radius=None):
+    """
+    Plummer球（三维分布投影到平面）
+
+    半径按累积质量分布反解，速度按Aarseth-Hénon-Wielen方法用向量化的拒绝采样生成。
+
+    Args:
+        n: 质点数量
+        seed: 随机种子
+        center: 系统中心
+        total_mass: 总质量，默认为CONFIG中三个质点的质量之和
+        scale_radius: Plummer尺度半径，默认为CONFIG['separation']
+    """
+    rng = np.random.default_rng(seed)
+    total_mass = total_mass or float(CONFIG['mass1'] + CONFIG['mass2'] + CONFIG['mass3'])
+    scale_radius = scale_radius or float(CONFIG['separation'])
+
+    # 累积质量 M(r)/M = X  =>  r = a / sqrt(X^(-2/3) - 1)，截断最外层1%避免极远的离群点
+    fraction = rng.uniform(0.0, 0.99, n)
+    radii = scale_radius / np.sqrt(1.0 / np.cbrt(fraction * fraction) - 1.0)
+    positions = _projected_directions(rng, n) * radii[:, None]
+
+    # 速度大小 v = q * v_esc，q 服从 g(q) = q²(1-q²)^(7/2)（最大值约0.092）
+    q = np.empty(n)
+    filled = 0
+    while filled < n:
+        batch = 2 * (n - filled)
+        candidate = rng.uniform(0.0, 1.0, batch)
+        remainder = 1.0 - candidate * candidate
+        density = candidate * candidate * remainder * remainder * remainder * np.sqrt(remainder)
+        accepted = candidate[rng.uniform(0.0, 0.1, batch) < density]
+        take = min(len(accepted), n - filled)
+        q[filled:filled + take] = accepted[:take]
+        filled += take
+    escape_speed = np.sqrt(2.0 * G * total_mass / np.sqrt(radii * radii + scale_radius * scale_radius))
+    velocities = _projected_directions(rng, n) * (q * escape_speed)[:, None]
+
+    masses = np.full(n, total_mass / n)
+    return _finish(positions, velocities, masses, center)
+
+
+def keplerian_disk(n, seed=None, center=(0.0, 0.0), central_mass=None, disk_mass=None,
+                   inner_radius=None, outer_radius=None):
+    """
+    围绕中心天体的开普勒盘（第0个质点为中心天体）
+
+    盘内质点面密度均匀，速度为包含内侧盘质量的圆轨道速度。
+
+    Args:
+        n: 质点数量（包含中心天体）
+        seed: 随机种子
+        center: 系统中心
+        central_mass: 中心天体质量，默认为CONFIG['mass1']
+        disk_mass: 盘的总质量，默认为中心天体质量的1%
+        inner_radius: 盘内半径，默认为CONFIG['separation'] / 4
+        outer_radius: 盘外半径，默认为CONFIG['separation'] * 2
+    """
+    rng = np.random.default_rng(seed)
+    central_mass = central_mass or float(CONFIG['mass1'])
+    disk_mass = disk_mass if disk_mass is not None else central_mass * 0.01
+    inner_radius = inner_radius or CONFIG['separation'] / 4
+    outer_radius = outer_radius or CONFIG['separation'] * 2
+    count = n - 1
+
+    # 面密度均匀：r² 在 [r_in², r_out²] 上均匀分布
+    radii = np.sqrt(rng.uniform(inner_radius ** 2, outer_radius ** 2, count))
+    directions = _random_directions(rng, count)
+    particle_masses = np.full(count, disk_mass / max(count, 1))
+
+    # 圆轨道速度 v = sqrt(G * M(<r) / r)，M(<r)包含中心天体与内侧的盘质量
+    enclosed = central_mass + disk_mass * (radii ** 2 - inner_radius ** 2) / (outer_radius ** 2 - inner_radius ** 2)
+    speeds = np.sqrt(G * enclosed / radii)
+    tangents = np.column_stack((-directions[:, 1], directions[:, 0]))
+
+    positions = np.vstack((np.zeros((1, 2)), directions * radii[:, None]))
+    velocities = np.vstack((np.zeros((1, 2)), tangents * speeds[:, None]))
+    masses = np.concatenate(([central_mass], particle_masses))
+    return _finish(positions, velocities, masses, center)
+
+
+def uniform_cluster(n, seed=None, center=(0.0, 0.0), total_mass=None, radius=None, velocity_dispersion=None):
+    """
+    圆盘内均匀分布、速度各向同性高斯分布的星团
+
+    Args:
+        n: 质点数量
+        seed: 随机种子
+        center: 系统中心
+        total_mass: 总质量，默认为CONFIG中三个质点的质量之和
+        radius: 星团半径，默认为CONFIG['separation']
+        velocity_dispersion: 速度弥散，默认按维里平衡估计
+    """
+    rng = np.random.default_rng(seed)
+    total_mass = total_mass or float(CONFIG['mass1'] + CONFIG['mass2'] + CONFIG['mass3'])
+    radius = radius or float(CONFIG['separation'])
+    if velocity_dispersion is None:
+        # 均匀球的维里平衡：σ² ≈ 0.3 * G * M / R（每个方向）
+        velocity_dispersion = math.sqrt(0.3 * G * total_mass / radius)
+
+    positions = _random_directions(rng, n) * (radius * np.sqrt(rng.uniform(0.0, 1.0, n)))[:, None]
+    velocities = rng.normal(0.0, velocity_dispersion, (n, 2))
+    masses = np.full(n, total_mass / n)
+    return _finish(positions, velocities, masses, center)
+
+
+def hierarchical_binaries(n, seed=None, center=(0.0, 0.0), total_mass=None, separation=None, ratio=0.15):
+    """
+    层级双星系统：自顶向下逐层把每个节点拆成一对圆轨道双星
+
+    每层的间距缩小为上一层的ratio倍，最后一层只拆分部分节点以得到恰好n个质点。
+
+    Args:
+        n: 质点数量
+        seed: 随机种子
+        center: 系统中心
+        total_mass: 总质量，默认为CONFIG中三个质点的质量之和
+        separation: 最外层双星的间距，默认为CONFIG['separation']
+        ratio: 相邻层间距之比（越小层级越稳定）
+    """
+    rng = np.random.default_rng(seed)
+    total_mass = total_mass or float(CONFIG['mass1'] + CONFIG['mass2'] + CONFIG['mass3'])
+    separation = separation or float(CONFIG['separation'])
+
+    positions = np.zeros((1, 2))
+    velocities = np.zeros((1, 2))
+    masses = np.array([total_mass])
+    while len(masses) < n:
+        count = len(masses)
+        split = min(count, n - count)  # 本层需要拆分的节点数
+
+        # 质量比在[0.3, 0.7]内随机，轨道方向随机
+        fraction = rng.uniform(0.3, 0.7, split)
+        parent_masses = masses[:split]
+        mass_a = parent_masses * fraction
+        mass_b = parent_masses - mass_a
+        axis = _random_directions(rng, split)
+        tangent = np.column_stack((-axis[:, 1], axis[:, 0]))
+
+        # 两子星到共同质心的距离与速度按质量反比分配
+        relative_speed = np.sqrt(G * parent_masses / separation)
+        offset_a = (separation * mass_b / parent_masses)[:, None] * axis
+        offset_b = -(separation * mass_a / parent_masses)[:, None] * axis
+        speed_a = (relative_speed * mass_b / parent_masses)[:, None] * tangent
+        speed_b = -(relative_speed * mass_a / parent_masses)[:, None] * tangent
+
+        parent_positions = positions[:split]
+        parent_velocities = velocities[:split]
+        positions = np.vstack((parent_positions + offset_a, parent_positions + offset_b, positions[split:]))
+        velocities = np.vstack((parent_velocities + speed_a, parent_velocities + speed_b, velocities[split:]))
+        masses = np.concatenate((mass_a, mass_b, masses[split:]))
+        separation *= ratio
+
+    return _finish(positions, velocities, masses, center)
+
+
+# 场景注册表：名称 -> 生成器
+SCENARIOS = {
+    'triangle': triangle,
+    'plummer': plummer_sphere,
+    'disk': keplerian_disk,
+    'uniform': uniform_cluster,
+    'binaries': hierarchical_binaries,
+}
+
+
+def create_scenario(name, n=3, seed=None, center=(0.0, 0.0)):
+    """
+    按名称生成初始条件
+
+    Args:
+        name: 场景名称，见SCENARIOS
+        n: 质点数量（至少为1）
+        seed: 随机种子
+        center: 系统中心
+
+    Returns:
+        InitialConditions: 生成的初始条件
+
+    Raises:
+        ValueError: 未知的场景或质点数量小于1
+    """
+    if name not in SCENARIOS:
+        raise ValueError(f"Unknown scenario '{name}', expected one of: {', '.join(SCENARIOS)}")
+    if n < 1:
+        raise ValueError(f"Number of bodies must be at least 1, got {n}")
+    return SCENARIOS[name](n=n, seed=seed, center=center)
@@ -0,0 +1,142 @@
+"""初始条件快照模块
+
+从.npy/.npz文件以内存映射方式加载位置、速度、质量与半径数组。默认使用写时复制模式（mmap_mode='c'），
+加载时不读取数据，只有引擎写入的页面才会被复制，因此即使是数GB的快照也能立即加载。
+"""
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from core.scenarios import InitialConditions
+
+# 快照必须包含的数组
+REQUIRED_ARRAYS = ('positions', 'velocities', 'masses', 'radii')
+# 可选数组
+OPTIONAL_ARRAYS = ('colors',)
+FLOAT_DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+
+# zip本地文件头：签名、版本、标志、压缩方式、时间、日期、CRC、压缩大小、原始大小、文件名长度、扩展字段长度
+_LOCAL_HEADER = struct.Struct('<4s5H3I2H')
+# 支持内存映射的.npy格式版本及其头部解析函数
+_HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+def save_snapshot(path, initial_conditions):
+    """
+    保存初始条件为未压缩的.npz（未压缩的成员才能被内存映射）
+
+    Args:
+        path: 输出路径
+        initial_conditions: InitialConditions
+    """
+    arrays = {'positions': initial_conditions.positions, 'velocities': initial_conditions.velocities,
+              'masses': initial_conditions.masses, 'radii': initial_conditions.radii}
+    if initial_conditions.colors is not None:
+        arrays['colors'] = initial_conditions.colors
+    np.savez(path, **arrays)
+
+
+def _map_npz_member(path, info, mmap_mode):
+    """把.npz中一个未压缩成员直接映射为数组"""
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset)
+        fields = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+        name_length, extra_length = fields[-2], fields[-1]
+        f.seek(info.header_offset + _LOCAL_HEADER.size + name_length + extra_length)
+
+        version = np.lib.format.read_magic(f)
+        if version not in _HEADER_READERS:
+            raise ValueError(f"{path}: member '{info.filename}' uses unsupported .npy format version "
+                             f"{version[0]}.{version[1]}")
+        shape, fortran_order, dtype = _HEADER_READERS[version](f)
+        offset = f.tell()
+
+    if dtype.hasobject:
+        raise ValueError(f"{path}: member '{info.filename}' contains Python objects and cannot be mapped")
+    return np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+def _load_npz(path, mmap_mode):
+    """加载.npz中的数组；未压缩的成员使用内存映射，压缩成员只能完整读入"""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if name not in REQUIRED_ARRAYS + OPTIONAL_ARRAYS:
+                continue
+            if mmap_mode is not None and info.compress_type == zipfile.ZIP_STORED:
+                arrays[name] = _map_npz_member(path, info, mmap_mode)
+            else:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+    return arrays
+
+
+def _load_directory(path, mmap_mode):
+    """加载目录下的 positions.npy、velocities.npy 等文件"""
+    arrays = {}
+    for name in REQUIRED_ARRAYS + OPTIONAL_ARRAYS:
+        file_path = os.path.join(path, f"{name}.npy")
+        if os.path.exists(file_path):
+            arrays[name] = np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+    return arrays
+
+
+def validate_arrays(arrays, source='snapshot'):
+    """
+    校验快照数组的形状与类型（只检查元数据，不读取数据）
+
+    Raises:
+        ValueError: 缺少数组、形状不一致或类型不支持
+    """
+    missing = [name for name in REQUIRED_ARRAYS if name not in arrays]
+    if missing:
+        raise ValueError(f"{source}: missing arrays: {', '.join(missing)}")
+
+    positions = arrays['positions']
+    if positions.ndim != 2 or positions.shape[1] != 2:
+        raise ValueError(f"{source}: positions must have shape (N, 2), got {positions.shape}")
+    count = positions.shape[0]
+
+    expected_shapes = {'velocities': (count, 2), 'masses': (count,), 'radii': (count,), 'colors': (count, 3)}
+    for name, shape in expected_shapes.items():
+        if name in arrays and arrays[name].shape != shape:
+            raise ValueError(f"{source}: {name} must have shape {shape}, got {arrays[name].shape}")
+
+    for name in REQUIRED_ARRAYS:
+        if arrays[name].dtype not in FLOAT_DTYPES:
+            raise ValueError(f"{source}: {name} must be float32 or float64, got {arrays[name].dtype}")
+    if 'colors' in arrays and arrays['colors'].dtype != np.uint8:
+        raise ValueError(f"{source}: colors must be uint8, got {arrays['colors'].dtype}")
+
+
+def load_snapshot(path, mmap_mode='c'):
+    """
+    加载初始条件快照
+
+    Args:
+        path: .npz文件，或包含 positions.npy、velocities.npy、masses.npy、radii.npy（以及可选colors.npy）的目录
+        mmap_mode: 内存映射模式，默认写时复制；None表示完整读入内存
+
+    Returns:
+        InitialConditions: 数组直接引用映射的文件，未发生复制
+
+    Raises:
+        ValueError: 文件格式不支持或数组校验失败
+    """
+    if os.path.isdir(path):
+        arrays = _load_directory(path, mmap_mode)
+    elif path.endswith('.npz'):
+        arrays = _load_npz(path, mmap_mode)
+    else:
+        raise ValueError(f"{path}: expected a .npz file or a directory of .npy files")
+
+    validate_arrays(arrays, source=path)
+    return InitialConditions(arrays['positions'], arrays['velocities'], arrays['masses'], arrays['radii'],
+                             arrays.get('colors'))
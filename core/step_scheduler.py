@@ -0,0 +1,154 @@
+import time
+
+from config.config import CONFIG, FIXED_PHYSICS_DT
+
+
+class StepScheduler:
+    """物理步调度器单例类，在每帧的时间预算内推进固定步长物理，防止"死亡螺旋"
+
+    每帧最多花费physics_budget_ms执行物理步（至少执行一步以保证推进）；未执行完的模拟时间只保留
+    physics_max_carry_steps步，超出部分丢弃，使模拟变慢而不是让帧时间和积压无限增长。
+    可选地在持续落后时加倍步长（降低精度换取速度），有余量时再恢复。
+    """
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(StepScheduler, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # 单例模式，避免重复初始化
+        if StepScheduler._initialized:
+            return
+
+        self.base_dt = FIXED_PHYSICS_DT
+        self.dt_scale = 1  # 当前步长倍数（回退为粗步长时大于1）
+        self.step_time = 0.0  # 单步耗时的指数平均（秒）
+        self.requested_speed = 1.0
+        self.effective_speed = 1.0  # 实际模拟时间 / 墙钟时间的指数平均
+        self.dropped_time = 0.0  # 累计丢弃的模拟时间（秒）
+        self.behind = False  # 本帧是否因超出预算丢弃了模拟时间
+        self.frames = 0
+        self._behind_frames = 0
+        self._headroom_frames = 0
+
+        StepScheduler._initialized = True
+
+    @classmethod
+    def get_instance(cls):
+        """获取StepScheduler单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def dt(self):
+        """当前使用的物理步长"""
+        return self.base_dt * self.dt_scale
+
+    def run(self, engine, frame_dt, speed):
+        """
+        在时间预算内推进物理
+
+        Args:
+            engine: PhysicsEngine
+            frame_dt: 本帧墙钟时间（秒）
+            speed: 请求的模拟速度倍率
+
+        Returns:
+            int: 本帧执行的物理步数
+        """
+        budget = CONFIG['physics_budget_ms'] / 1000.0
+        dt = self.dt
+        engine.physics_accumulator += frame_dt * speed
+
+        start = time.perf_counter()
+        deadline = start + budget
+        steps = 0
+        while engine.physics_accumulator >= dt:
+            # 按单步耗时估计预算内还能执行的步数，用engine.advance一次推进；
+            # 单步耗时未知时先执行一步测量（每帧至少执行一步）
+            available = max(1, int(engine.physics_accumulator / dt))
+            if self.step_time > 0.0:
+                batch = min(available, int((deadline - time.perf_counter()) / self.step_time))
+            else:
+                batch = 1
+            if batch <= 0:
+                if steps:
+                    break
+                batch = 1
+            batch_start = time.perf_counter()
+            engine.advance(batch, dt)
+            step_time = (time.perf_counter() - batch_start) / batch
+            self.step_time = step_time if self.step_time == 0.0 else self.step_time * 0.8 + step_time * 0.2
+            engine.physics_accumulator -= batch * dt
+            steps += batch
+        elapsed = time.perf_counter() - start
+
+        # 有界结转：最多保留physics_max_carry_steps步的模拟时间
+        max_carry = CONFIG['physics_max_carry_steps'] * dt
+        dropped = max(0.0, engine.physics_accumulator - max_carry)
+        if dropped > 0.0:
+            engine.physics_accumulator = max_carry
+            self.dropped_time += dropped
+        self.behind = dropped > 0.0
+
+        self.observe(steps * dt, frame_dt, speed)
+        if CONFIG['physics_fallback_coarse_dt']:
+            self._adjust_step_size(elapsed, budget)
+        return steps
+
+    def observe(self, simulated_time, frame_dt, speed):
+        """
+        记录本帧推进的模拟时间，更新实际速度（物理在其他地方推进时也可直接调用）
+
+        Args:
+            simulated_time: 本帧推进的模拟时间（秒）
+            frame_dt: 本帧墙钟时间（秒）
+            speed: 请求的模拟速度倍率
+        """
+        self.requested_speed = speed
+        self.frames += 1
+        if frame_dt > 0:
+            self.effective_speed = self.effective_speed * 0.9 + simulated_time / frame_dt * 0.1
+
+    def _adjust_step_size(self, elapsed, budget):
+        """持续落后时加倍步长，持续有余量时减半（带滞回，避免来回切换）"""
+        frames = CONFIG['physics_fallback_frames']
+        if self.behind:
+            self._behind_frames += 1
+            self._headroom_frames = 0
+        elif elapsed < budget * 0.4:
+            self._headroom_frames += 1
+            self._behind_frames = 0
+        else:
+            self._behind_frames = self._headroom_frames = 0
+
+        if self._behind_frames >= frames and self.dt_scale < CONFIG['physics_max_dt_scale']:
+            self.dt_scale *= 2
+            self._behind_frames = 0
+        elif self._headroom_frames >= frames * 4 and self.dt_scale > 1:
+            # 减半步长后每帧的步数翻倍，因此要求更长时间的余量才恢复
+            self.dt_scale //= 2
+            self._headroom_frames = 0
+
+    def get_status_text(self):
+        """UI显示的调度状态"""
+        text = f"Speed: {self.effective_speed:.2f}x effective / {self.requested_speed:.2f}x requested"
+        if self.dt_scale > 1:
+            text += f" (dt x{self.dt_scale})"
+        if self.behind:
+            text += " [over budget]"
+        return text
+
+    def reset(self):
+        """清除统计并恢复基础步长"""
+        self.dt_scale = 1
+        self.step_time = 0.0
+        self.effective_speed = self.requested_speed
+        self.dropped_time = 0.0
+        self.behind = False
+        self._behind_frames = self._headroom_frames = 0
@@ -0,0 +1,426 @@
+import numpy as np
+import pygame
+
+from config.config import CONFIG, WHITE
+from core.scenarios import PALETTE
+from graphics.coordinate_system import CoordinateSystem
+from graphics.spatial_index import SpatialIndex
+from graphics.sprite_cache import SpriteCache
+from managers.camera_manager import CameraManager
+
+# 屏幕坐标的截断范围（远在屏幕外的质点只需保证不可见）
+COORDINATE_LIMIT = 1 << 30
+
+
+class BodyRenderer:
+    """批量质点渲染器单例类，一次变换所有质点坐标，小质点直接写入像素，大质点才逐个画圆
+
+    屏幕半径不超过point_render_max_radius的质点通过surfarray按NumPy索引写入屏幕像素（半径为2时写成十字），
+    其余可见质点与Ball.draw一样绘制实心圆和白色边框：按(颜色, 半径)取缓存的精灵，一次Surface.blits绘制。
+
+    聚合模式从四叉树索引中按缩放选取深度，视野内每个非空单元在质心处画一个点（大质点仍单独绘制），
+    索引未失效（暂停）时绘制代价取决于屏幕上的非空单元数而不是质点数。
+
+    质点数量极大时可切换为密度模式：按屏幕像素统计可见质点数量（可按质量加权），经对数色表着色后写入有质点的像素。
+    """
+
+    # 半径为2的质点在中心像素之外写入的像素偏移（十字形）
+    CROSS_OFFSETS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+    # 渲染模式：points逐点绘制，aggregate按四叉树单元聚合，density密度图，auto按质点数量自动选择
+    MODES = ('auto', 'points', 'aggregate', 'density')
+    # 密度色表的颜色节点（从低密度到高密度），色表第0项固定为黑色（透明）
+    DENSITY_STOPS = ((40, 0, 80), (140, 20, 140), (230, 80, 40), (255, 200, 60), (255, 255, 255))
+    DENSITY_LEVELS = 256
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(BodyRenderer, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # 单例模式，避免重复初始化
+        if BodyRenderer._initialized:
+            return
+
+        self.coord_system = CoordinateSystem.get_instance()
+        self.camera_manager = CameraManager.get_instance()
+        # 最近一帧的统计（供性能面板与基准测试使用）
+        self.points_drawn = 0
+        self.circles_drawn = 0
+        # 调色板颜色编码缓存（键为像素格式）
+        self._palette_key = None
+        self._palette_values = None
+        # 大质点的圆精灵缓存（按颜色与屏幕半径缓存，缩放后不再用到的半径由LRU淘汰）
+        self.sprite_cache = SpriteCache()
+        self.mode = CONFIG['render_mode']
+        self.active_mode = 'points'  # 最近一帧实际使用的模式
+        # 聚合模式
+        self.spatial_index = SpatialIndex()
+        self.aggregate_depth = 0
+        # 密度模式
+        self._density_surface = None
+        self._density_lut_key = None
+        self._density_table = None
+        self._density_colors = None
+
+        BodyRenderer._initialized = True
+
+    @classmethod
+    def get_instance(cls):
+        """获取BodyRenderer单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def to_screen(self, positions):
+        """
+        批量把物理坐标转换为屏幕坐标（与Camera.world_to_screen逐点计算的结果一致）
+
+        Args:
+            positions: (N, 2) 物理坐标数组
+
+        Returns:
+            tuple: (screen_x, screen_y) 两个int32数组（远在屏幕外的坐标被截断到±2^30）
+        """
+        camera = self.camera_manager.camera
+        unit_scale = self.coord_system.unit_scale
+        # 与逐点转换相同：先相对摄像头再缩放，int()向零取整
+        screen_x = (positions[:, 0] * unit_scale - camera.position.x) * camera.zoom
+        screen_x += camera.screen_width // 2
+        screen_y = (positions[:, 1] * unit_scale - camera.position.y) * camera.zoom
+        screen_y += camera.screen_height // 2
+        # 截断后再转为int32，避免超出范围的转换
+        np.clip(screen_x, -COORDINATE_LIMIT, COORDINATE_LIMIT, out=screen_x)
+        np.clip(screen_y, -COORDINATE_LIMIT, COORDINATE_LIMIT, out=screen_y)
+        return screen_x.astype(np.int32), screen_y.astype(np.int32)
+
+    def scale_radii(self, radii):
+        """批量缩放半径（与Camera.scale_radius一致，最小为1像素）"""
+        scale = self.coord_system.unit_scale * self.camera_manager.camera.zoom
+        scaled = np.minimum(radii * scale, COORDINATE_LIMIT).astype(np.int32)
+        return np.maximum(scaled, 1, out=scaled)
+
+    def _color_values(self, store, screen):
+        """
+        按screen的像素格式把所有质点颜色编码为uint32（用于32位surface）
+
+        使用调色板时颜色只取决于槽位序号，编码结果缓存起来复用。
+        """
+        red_shift, green_shift, blue_shift, _ = screen.get_shifts()
+        alpha = screen.get_masks()[3] if screen.get_flags() & pygame.SRCALPHA else 0
+
+        def pack(colors):
+            values = colors[:, 0].astype(np.uint32) << red_shift
+            values |= colors[:, 1].astype(np.uint32) << green_shift
+            values |= colors[:, 2].astype(np.uint32) << blue_shift
+            values |= np.uint32(alpha)
+            return values
+
+        colors = store.colors
+        if colors is not None:
+            return pack(colors)
+        key = (red_shift, green_shift, blue_shift, alpha)
+        if self._palette_key != key or len(self._palette_values) < store.size:
+            self._palette_key = key
+            self._palette_values = np.resize(pack(PALETTE), store.capacity)
+        return self._palette_values[:store.size]
+
+    def cycle_mode(self):
+        """切换到下一个渲染模式"""
+        self.mode = self.MODES[(self.MODES.index(self.mode) + 1) % len(self.MODES)]
+
+    def resolve_mode(self, store):
+        """当前模式下绘制该存储中的质点使用的模式（points、aggregate或density）"""
+        if self.mode != 'auto':
+            return self.mode
+        # 聚合模式需要在位置变化后重建索引（排序），模拟运行时比逐点绘制慢，只能手动选择
+        return 'density' if store.count >= CONFIG['density_auto_threshold'] else 'points'
+
+    def uses_density(self, store):
+        """当前模式下是否以密度图绘制该存储中的质点"""
+        return self.resolve_mode(store) == 'density'
+
+    def get_status_line(self):
+        """性能面板显示的渲染状态"""
+        if self.active_mode == 'density':
+            return f"render: density ({self.mode}) {self.points_drawn} bodies binned"
+        if self.active_mode == 'aggregate':
+            return (f"render: aggregate ({self.mode}) {self.points_drawn} cells at depth {self.aggregate_depth}, "
+                    f"{self.circles_drawn} circles")
+        return (f"render: points ({self.mode}) {self.points_drawn} points {self.circles_drawn} circles, "
+                f"{self.sprite_cache.get_status_line()}")
+
+    def draw(self, store, screen):
+        """
+        绘制存储中的所有存活质点（不含轨迹）
+
+        Args:
+            store: BodyStore
+            screen: 目标surface
+        """
+        self.points_drawn = self.circles_drawn = 0
+        self.active_mode = mode = self.resolve_mode(store)
+        if store.size == 0:
+            return
+        if mode == 'density':
+            self.draw_density(store, screen)
+            return
+        # 放大到索引最深一层也比聚合单元粗时逐个绘制
+        if mode == 'aggregate' and self.draw_aggregate(store, screen):
+            return
+        self.active_mode = 'points'
+
+        positions = store.render_positions if store.render_positions is not None else store.positions
+        screen_x, screen_y = self.to_screen(positions)
+        radii = self.scale_radii(store.radii)
+        width, height = screen.get_size()
+        alive = store.alive
+
+        # 小质点：中心像素在屏幕内才绘制
+        is_point = radii <= CONFIG['point_render_max_radius']
+        points = is_point & (screen_x >= 0)
+        points &= screen_x < width
+        points &= screen_y >= 0
+        points &= screen_y < height
+        if alive is not None:
+            points &= alive
+        points = np.flatnonzero(points)
+        if len(points):
+            self._draw_points(screen, store, points, screen_x[points], screen_y[points], radii[points] > 1)
+        self.points_drawn = len(points)
+
+        # 大质点：圆与屏幕相交才绘制（通常数量不多，逐个取精灵后一次blits）
+        circles = np.flatnonzero(~is_point if alive is None else ~is_point & alive)
+        if len(circles):
+            self._draw_circles(screen, store, circles, screen_x[circles], screen_y[circles], radii[circles])
+
+    def draw_aggregate(self, store, screen):
+        """
+        从四叉树索引查询视野内的聚合单元，在每个非空单元的质心处绘制一个点（颜色取单元内的一个质点），
+        屏幕半径超过point_render_max_radius的质点仍单独绘制
+
+        单元深度按缩放选取，使单元在屏幕上约为aggregate_cell_px像素。
+
+        Args:
+            store: BodyStore
+            screen: 目标surface
+
+        Returns:
+            bool: 是否已绘制（放大到索引最深一层的单元仍大于两个聚合单元时返回False，改为逐个绘制）
+        """
+        index = self.spatial_index
+        index.ensure(store)
+        if not index.count:
+            return True
+
+        camera = self.camera_manager.camera
+        unit_scale = self.coord_system.unit_scale
+        scale = unit_scale * camera.zoom  # 物理长度到屏幕像素
+        cell_px = CONFIG['aggregate_cell_px']
+        depth = index.depth_for_cell_size(cell_px / scale)
+        if index.extent / (1 << depth) * scale > 2 * cell_px:
+            return False
+        self.aggregate_depth = depth
+
+        # 视野边界为世界坐标，索引使用物理坐标
+        left, right, top, bottom = camera.get_view_bounds()
+        cells = index.query((left / unit_scale, right / unit_scale, top / unit_scale, bottom / unit_scale), depth)
+        width, height = screen.get_size()
+        if cells is not None:
+            screen_x, screen_y = self.to_screen(np.column_stack((cells['x'], cells['y'])))
+            inside = np.flatnonzero((screen_x.view(np.uint32) < width) & (screen_y.view(np.uint32) < height))
+            # 单元的等效半径（半径平方和开方），不超过小质点的上限
+            radii = self.scale_radii(np.sqrt(cells['area'][inside]))
+            np.minimum(radii, CONFIG['point_render_max_radius'], out=radii)
+            if len(inside):
+                self._draw_points(screen, store, cells['body'][inside], screen_x[inside], screen_y[inside], radii > 1)
+            self.points_drawn = len(inside)
+
+        # 大质点：先按半径筛出候选，再按与逐点绘制相同的缩放规则确认
+        large = index.bodies_larger_than(CONFIG['point_render_max_radius'] / scale)
+        if len(large):
+            large = large[self.scale_radii(store.radii[large]) > CONFIG['point_render_max_radius']]
+        if len(large):
+            positions = store.render_positions if store.render_positions is not None else store.positions
+            screen_x, screen_y = self.to_screen(positions[large])
+            self._draw_circles(screen, store, large, screen_x, screen_y, self.scale_radii(store.radii[large]))
+        return True
+
+    def _draw_circles(self, screen, store, indices, xs, ys, radii):
+        """
+        用缓存的精灵绘制大质点（半径超过sprite_max_radius的精灵太大，直接绘制）
+
+        Args:
+            screen: 目标surface
+            store: BodyStore
+            indices: 质点槽位序号
+            xs, ys: 屏幕坐标
+            radii: 屏幕半径
+        """
+        width, height = screen.get_size()
+        max_radius = CONFIG['sprite_max_radius']
+        cache = self.sprite_cache
+
+        # 剔除与屏幕不相交的圆
+        visible = (xs >= -radii) & (xs <= width + radii) & (ys >= -radii) & (ys <= height + radii)
+        indices = indices[visible]
+        colors = map(tuple, store.get_colors(indices).tolist())
+        get_sprite = cache.get
+        blits = []
+        for color, x, y, radius in zip(colors, xs[visible].tolist(), ys[visible].tolist(), radii[visible].tolist()):
+            if radius <= max_radius:
+                blits.append((get_sprite(color, radius), (x - radius, y - radius)))
+            else:
+                pygame.draw.circle(screen, color, (x, y), radius)
+                pygame.draw.circle(screen, WHITE, (x, y), radius, 1)
+        # 精灵需按质点顺序绘制（后绘制的覆盖先绘制的），超大圆很少出现，先绘制不影响观感
+        if blits:
+            screen.blits(blits, doreturn=False)
+        self.circles_drawn = int(visible.sum())
+
+    def _draw_points(self, screen, store, indices, xs, ys, cross):
+        """
+        用NumPy索引把小质点写入屏幕像素
+
+        Args:
+            screen: 目标surface
+            store: BodyStore
+            indices: 质点槽位序号
+            xs, ys: 屏幕坐标（中心像素均在屏幕内）
+            cross: 需要写成十字的质点（半径为2）
+        """
+        width, height = screen.get_size()
+        if screen.get_bytesize() == 4:
+            # 32位surface：颜色编码为整数后写入二维像素数组（比三维数组快数倍）
+            values = self._color_values(store, screen)[indices]
+            pixels = pygame.surfarray.pixels2d(screen)
+        else:
+            values = store.get_colors(indices)
+            pixels = pygame.surfarray.pixels3d(screen)
+
+        try:
+            # 像素行连续存放时使用一维索引，比二维花式索引更快
+            rows = pixels.T if pixels.ndim == 2 else None
+            flat = rows.reshape(-1) if rows is not None and rows.flags.c_contiguous else None
+
+            def write(x, y, value):
+                if flat is not None:
+                    flat[y * width + x] = value
+                else:
+                    pixels[x, y] = value
+
+            write(xs, ys, values)
+            if cross.any():
+                xs, ys, values = xs[cross], ys[cross], values[cross]
+                for dx, dy in self.CROSS_OFFSETS:
+                    x, y = xs + dx, ys + dy
+                    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+                    write(x[inside], y[inside], values[inside])
+        finally:
+            # 释放像素数组以解除surface锁定，之后才能继续用pygame.draw绘制
+            del pixels
+
+    def _density_lut(self, surface):
+        """按surface的像素格式编码的对数色表（256级，第0项为黑色），像素格式变化时重建"""
+        red_shift, green_shift, blue_shift, _ = surface.get_shifts()
+        alpha = surface.get_masks()[3] if surface.get_flags() & pygame.SRCALPHA else 0
+        key = (red_shift, green_shift, blue_shift, alpha)
+        if self._density_lut_key != key:
+            # 在颜色节点之间线性插值得到第1级到最高级的颜色
+            stops = np.array(self.DENSITY_STOPS, dtype=np.float64)
+            positions = np.linspace(0.0, 1.0, len(stops))
+            samples = np.linspace(0.0, 1.0, self.DENSITY_LEVELS - 1)
+            channels = [np.interp(samples, positions, stops[:, channel]).astype(np.uint32) for channel in range(3)]
+            lut = np.zeros(self.DENSITY_LEVELS, dtype=np.uint32)
+            lut[1:] = (channels[0] << red_shift) | (channels[1] << green_shift) | (channels[2] << blue_shift)
+            lut[1:] |= np.uint32(alpha)
+            self._density_lut_key = key
+            self._density_table = lut
+        return self._density_table
+
+    def _density_layer(self, size):
+        """非32位屏幕使用的32位中间surface（黑色为透明色键）与按行展开的颜色缓冲区，尺寸变化时重建"""
+        if self._density_surface is None or self._density_surface.get_size() != size:
+            surface = pygame.Surface(size, 0, 32)
+            surface.set_colorkey((0, 0, 0))
+            self._density_surface = surface
+            self._density_colors = np.zeros(size[0] * size[1], dtype=np.uint32)
+        return self._density_surface, self._density_colors
+
+    def draw_density(self, store, screen):
+        """
+        按屏幕像素统计可见质点并以对数色表绘制密度图（遵循当前摄像头变换）
+
+        没有质点的像素保持原样（网格仍然可见）。
+
+        Args:
+            store: BodyStore
+            screen: 目标surface
+        """
+        positions = store.render_positions if store.render_positions is not None else store.positions
+        screen_x, screen_y = self.to_screen(positions)
+        width, height = screen.get_size()
+
+        # 负坐标按无符号数比较时变为极大值，一次比较同时检查两端边界
+        visible = screen_x.view(np.uint32) < width
+        visible &= screen_y.view(np.uint32) < height
+        alive = store.alive
+        if alive is not None:
+            visible &= alive
+
+        # 像素按行展开的一维序号；屏幕外质点的序号溢出也无妨，随后被筛掉
+        pixel = screen_y * width
+        pixel += screen_x
+        pixel = pixel[visible]
+        self.points_drawn = len(pixel)
+        if not len(pixel):
+            return
+
+        if CONFIG['density_mass_weighted']:
+            # 以平均质量归一化，使加权结果与计数处于同一量级
+            masses = store.masses[visible]
+            mean_mass = masses.mean()
+            weights = masses / mean_mass if mean_mass > 0 else masses
+            density = np.bincount(pixel, weights=weights, minlength=width * height)
+            occupied = np.flatnonzero(density != 0)
+            values = density[occupied]
+        else:
+            # 排序去重直接得到有质点的像素及其计数，比对整屏bincount后再扫描非零项快
+            occupied, counts = np.unique(pixel, return_counts=True)
+            values = counts.astype(np.float64)
+        peak = values.max()
+        if peak <= 0:
+            return
+
+        # 对数映射到色表：log(1 + n) / log(1 + 峰值)，有质点的像素至少为第1级
+        np.log1p(values, out=values)
+        values *= (self.DENSITY_LEVELS - 1) / np.log1p(peak)
+        np.ceil(values, out=values)
+        # 峰值像素可能因舍入误差略超最高级
+        np.minimum(values, self.DENSITY_LEVELS - 1, out=values)
+        levels = values.astype(np.uint8)
+
+        if screen.get_bytesize() == 4:
+            # 32位屏幕：与小质点一样直接写入有质点的像素
+            colors = self._density_lut(screen)[levels]
+            pixels = pygame.surfarray.pixels2d(screen)
+            try:
+                rows = pixels.T
+                if rows.flags.c_contiguous:
+                    rows.reshape(-1)[occupied] = colors
+                else:
+                    pixels[occupied % width, occupied // width] = colors
+            finally:
+                del pixels
+            return
+
+        # 其他像素格式：写入带透明色键的中间surface后整体blit
+        surface, buffer = self._density_layer((width, height))
+        buffer.fill(0)
+        buffer[occupied] = self._density_lut(surface)[levels]
+        # (height, width)转置为surfarray使用的(width, height)
+        pygame.surfarray.blit_array(surface, buffer.reshape(height, width).T)
+        screen.blit(surface, (0, 0))
@@ -16,6 +16,8 @@ class Camera:
         self.zoom = 1.0
         self.min_zoom = 0.1
         self.max_zoom = 10.0
+        # 场景内部渲染比例（RenderTarget绘制期间zoom已乘以该比例，绘制代码据此还原用户看到的缩放）
+        self.render_scale = 1.0
 
         # 跟踪目标
         self.target = None  # 要跟踪的对象
@@ -80,12 +82,25 @@ class Camera:
     def update(self):
         """更新摄像头状态"""
         if self.follow_mode and self.target:
-            # 平滑跟踪目标
-            target_position = self.target.position
+            # 平滑跟踪目标（有插值位置时跟踪渲染位置，与绘制保持一致）
+            target_position = getattr(self.target, 'render_position', self.target.position)
 
             # 使用线性插值实现平滑跟踪
             self.position = self.position + (target_position - self.position) * self.follow_smoothness
 
+    def is_settled(self, tolerance=0.5):
+        """
+        跟踪模式下摄像头是否已到达目标（与目标的屏幕距离不超过tolerance像素）；非跟踪模式总是返回True
+
+        Args:
+            tolerance: 允许的屏幕距离（像素）
+        """
+        if not (self.follow_mode and self.target):
+            return True
+        target_position = getattr(self.target, 'render_position', self.target.position)
+        offset = (target_position - self.position) * self.zoom
+        return abs(offset.x) <= tolerance and abs(offset.y) <= tolerance
+
     def world_to_screen(self, world_x, world_y):
         """将世界坐标转换为屏幕坐标"""
         # 相对于摄像头的坐标
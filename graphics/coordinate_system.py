@@ -33,6 +33,7 @@ class CoordinateSystem:
         self.grid_color = (40, 40, 40)  # 深灰色网格线
         self.major_grid_color = (80, 80, 80)  # 主网格线颜色 - 更明显
         self.major_grid_interval = 5  # 每5条线绘制一条主网格线
+        self.grid_detail = 'full'  # 网格细节：full全部网格线，major只绘制主网格线，off不绘制（由渲染质量调节器设置）
 
         # 网格缓存相关
         self.grid_surface = None
@@ -60,6 +61,28 @@ class CoordinateSystem:
         self.grid_cache_valid = False
         return self
 
+    def set_viewport(self, screen_width, screen_height):
+        """
+        设置当前绘制目标的尺寸（按渲染比例绘制场景时使用，不重置网格缓存）
+
+        Args:
+            screen_width: 绘制目标宽度（像素）
+            screen_height: 绘制目标高度（像素）
+        """
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+
+    def set_grid_detail(self, detail):
+        """
+        设置网格细节
+
+        Args:
+            detail: 'full'、'major'或'off'
+        """
+        if detail != self.grid_detail:
+            self.grid_detail = detail
+            self.grid_cache_valid = False  # 细节改变，网格缓存失效
+
     def set_zoom(self, zoom):
         """设置缩放比例"""
         if self.camera_manager.get_zoom() != zoom:
@@ -90,7 +113,9 @@ class CoordinateSystem:
                 self.last_zoom == camera.zoom and
                 self.last_camera_x == camera.x and
                 self.last_camera_y == camera.y and
-                self.last_grid_enabled == self.grid_enabled)
+                self.last_grid_enabled == self.grid_enabled and
+                self.grid_surface is not None and
+                self.grid_surface.get_size() == (self.screen_width, self.screen_height))
 
     def _update_grid_cache_state(self):
         """更新网格缓存状态"""
@@ -103,7 +128,8 @@ class CoordinateSystem:
 
     def _render_grid_to_surface(self):
         """将网格渲染到缓存surface"""
-        if self.grid_surface is None:
+        # 绘制目标尺寸变化（渲染比例切换）时重新创建
+        if self.grid_surface is None or self.grid_surface.get_size() != (self.screen_width, self.screen_height):
             self.grid_surface = pygame.Surface((self.screen_width, self.screen_height))
 
         # 清空surface（透明背景）
@@ -152,10 +178,10 @@ class CoordinateSystem:
                 line_width = 2  # 主网格线更粗
             else:
                 color = self.grid_color
-                line_width = 1
+                line_width = 1 if self.grid_detail == 'full' else 0
 
             # 绘制线条（只要在屏幕范围内就绘制）
-            if x >= 0:
+            if x >= 0 and line_width:
                 pygame.draw.line(self.grid_surface, color, (int(x), 0), (int(x), self.screen_height), line_width)
             x += actual_grid_size
             line_count += 1
@@ -171,16 +197,18 @@ class CoordinateSystem:
                 line_width = 2  # 主网格线更粗
             else:
                 color = self.grid_color
-                line_width = 1
+                line_width = 1 if self.grid_detail == 'full' else 0
 
             # 绘制线条（只要在屏幕范围内就绘制）
-            if y >= 0:
+            if y >= 0 and line_width:
                 pygame.draw.line(self.grid_surface, color, (0, int(y)), (self.screen_width, int(y)), line_width)
             y += actual_grid_size
             line_count += 1
 
     def draw_grid(self):
         """绘制背景网格（使用缓存优化）"""
+        if self.grid_detail == 'off':
+            return
         if not self._is_grid_cache_valid():
             # 缓存无效，重新渲染网格
             self._render_grid_to_surface()
@@ -0,0 +1,122 @@
+from collections import deque
+
+from config.config import CONFIG
+
+
+class QualityGovernor:
+    """渲染质量调节器单例类，根据实测帧耗时与目标帧率自动降低或恢复渲染质量
+
+    帧耗时的滚动平均超出帧预算时降低一级；低于预算的quality_upgrade_ratio并持续更长时间才恢复一级，
+    两个阈值之间不调整（滞回），避免在两级之间来回切换。
+    """
+
+    # 质量等级（0为最高）：轨迹显示长度倍数、轨迹抽稀倍数、网格细节、是否绘制质心轨迹、UI刷新间隔（帧）、场景渲染比例
+    LEVELS = (
+        {'trail_scale': 1.0, 'trail_skip': 1, 'grid_detail': 'full', 'centroid_trail': True, 'ui_interval': 1,
+         'render_scale': 1.0},
+        {'trail_scale': 0.5, 'trail_skip': 2, 'grid_detail': 'full', 'centroid_trail': True, 'ui_interval': 2,
+         'render_scale': 1.0},
+        {'trail_scale': 0.25, 'trail_skip': 4, 'grid_detail': 'major', 'centroid_trail': False, 'ui_interval': 4,
+         'render_scale': 1.0},
+        {'trail_scale': 0.1, 'trail_skip': 8, 'grid_detail': 'off', 'centroid_trail': False, 'ui_interval': 8,
+         'render_scale': 0.5},
+    )
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(QualityGovernor, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # 单例模式，避免重复初始化
+        if QualityGovernor._initialized:
+            return
+
+        self.enabled = CONFIG['quality_governor']
+        self.level = 0
+        self.frame_times = deque(maxlen=CONFIG['quality_window'])  # 最近的帧工作耗时（毫秒）
+        self.average_ms = 0.0
+        self._headroom_frames = 0  # 连续低于恢复阈值的帧数
+        self._apply()
+
+        QualityGovernor._initialized = True
+
+    @classmethod
+    def get_instance(cls):
+        """获取QualityGovernor单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def budget_ms(self):
+        """每帧的时间预算（毫秒）"""
+        return 1000.0 / CONFIG['fps']
+
+    def _apply(self):
+        """把当前等级的设置展开为属性，供绘制代码直接读取"""
+        settings = self.LEVELS[self.level]
+        self.trail_scale = settings['trail_scale']
+        self.trail_skip = settings['trail_skip']
+        self.grid_detail = settings['grid_detail']
+        self.centroid_trail = settings['centroid_trail']
+        self.ui_interval = settings['ui_interval']
+        self.render_scale = settings['render_scale']
+
+    def set_level(self, level):
+        """
+        切换质量等级
+
+        Args:
+            level: 0（最高）到len(LEVELS)-1
+        """
+        level = max(0, min(level, len(self.LEVELS) - 1))
+        if level != self.level:
+            self.level = level
+            self._apply()
+        # 新等级的耗时重新统计
+        self.frame_times.clear()
+        self._headroom_frames = 0
+
+    def observe(self, frame_ms):
+        """
+        记录一帧的工作耗时并按需调整等级
+
+        Args:
+            frame_ms: 本帧的工作耗时（毫秒，不含等待下一帧的时间）
+        """
+        if not self.enabled:
+            return
+        self.frame_times.append(frame_ms)
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return
+
+        self.average_ms = sum(self.frame_times) / len(self.frame_times)
+        budget = self.budget_ms
+        if self.average_ms > budget * CONFIG['quality_downgrade_ratio']:
+            self._headroom_frames = 0
+            if self.level < len(self.LEVELS) - 1:
+                self.set_level(self.level + 1)
+        elif self.average_ms < budget * CONFIG['quality_upgrade_ratio']:
+            self._headroom_frames += 1
+            if self._headroom_frames >= CONFIG['quality_upgrade_frames'] and self.level > 0:
+                self.set_level(self.level - 1)
+        else:
+            self._headroom_frames = 0
+
+    def get_status_lines(self):
+        """性能面板显示的当前设置"""
+        state = "auto" if self.enabled else "off"
+        return [f"quality: {self.level}/{len(self.LEVELS) - 1} ({state}) avg {self.average_ms:.1f}ms"
+                f" / {self.budget_ms:.1f}ms",
+                f"  trail x{self.trail_scale:g} skip x{self.trail_skip} grid {self.grid_detail}",
+                f"  centroid trail {'on' if self.centroid_trail else 'off'} ui every {self.ui_interval}f"
+                f" scale {self.render_scale:.0%}"]
+
+    def reset(self):
+        """恢复最高质量并清空统计"""
+        self.average_ms = 0.0
+        self.set_level(0)
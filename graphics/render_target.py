@@ -0,0 +1,121 @@
+from contextlib import contextmanager
+
+import pygame
+
+from config.config import CONFIG
+from graphics.coordinate_system import CoordinateSystem
+from graphics.quality_governor import QualityGovernor
+from managers.camera_manager import CameraManager
+from managers.screen_manager import ScreenManager
+
+
+class RenderTarget:
+    """场景渲染目标单例类，按内部渲染比例把场景（背景、网格、质点）绘制到较小的离屏surface后放大到窗口
+
+    填充、网格blit与轨迹等的开销与像素数成正比，降低渲染比例可以用清晰度换取帧率；UI仍以原生分辨率绘制。
+    实际比例取用户设置与渲染质量调节器给出的比例中较小的一个，比例为1时直接绘制到窗口，没有额外开销。
+    """
+
+    # V键循环切换的用户渲染比例
+    SCALES = (1.0, 0.75, 0.5)
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(RenderTarget, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # 单例模式，避免重复初始化
+        if RenderTarget._initialized:
+            return
+
+        self.user_scale = CONFIG['render_scale']
+        self.surface = None  # 离屏场景surface（比例为1时不创建）
+        self.last_scale = 1.0  # 最近一帧实际使用的比例
+
+        RenderTarget._initialized = True
+
+    @classmethod
+    def get_instance(cls):
+        """获取RenderTarget单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def scale(self):
+        """当前的实际渲染比例（用户设置与质量调节器的较小值，不低于render_scale_min）"""
+        scale = min(self.user_scale, QualityGovernor.get_instance().render_scale)
+        return max(CONFIG['render_scale_min'], min(scale, 1.0))
+
+    def set_scale(self, scale):
+        """
+        设置用户渲染比例
+
+        Args:
+            scale: 内部分辨率与窗口分辨率之比（render_scale_min到1.0）
+        """
+        self.user_scale = max(CONFIG['render_scale_min'], min(scale, 1.0))
+
+    def cycle_scale(self):
+        """切换到下一个用户渲染比例"""
+        larger = [scale for scale in self.SCALES if scale < self.user_scale - 1e-9]
+        self.set_scale(larger[0] if larger else self.SCALES[0])
+
+    def get_status_line(self):
+        """性能面板显示的渲染比例"""
+        return (f"render scale {self.last_scale:.0%} (user {self.user_scale:.0%}, "
+                f"quality {QualityGovernor.get_instance().render_scale:.0%})")
+
+    @contextmanager
+    def scene(self):
+        """
+        场景绘制上下文：期间ScreenManager.screen指向离屏surface，摄像头与坐标系统按比例缩小视口和缩放，
+        退出时恢复（放大到窗口由present完成）
+        """
+        scale = self.scale
+        screen_manager = ScreenManager.get_instance()
+        display = screen_manager.screen
+        width, height = display.get_size()
+        target_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        if target_size == (width, height):
+            self.last_scale = 1.0
+            yield
+            return
+
+        if self.surface is None or self.surface.get_size() != target_size:
+            # 与窗口相同的像素格式，放大时可以直接写入窗口
+            self.surface = pygame.Surface(target_size).convert(display)
+        self.last_scale = target_size[0] / width
+
+        camera = CameraManager.get_instance().camera
+        coord_system = CoordinateSystem.get_instance()
+        zoom = camera.zoom
+        camera.screen_width, camera.screen_height = target_size
+        camera.zoom = zoom * self.last_scale
+        camera.render_scale = self.last_scale
+        coord_system.set_viewport(*target_size)
+        screen_manager.set_target(self.surface)
+        try:
+            yield
+        finally:
+            screen_manager.set_target(None)
+            coord_system.set_viewport(width, height)
+            camera.screen_width, camera.screen_height = width, height
+            camera.zoom = zoom
+            camera.render_scale = 1.0
+
+    def present(self):
+        """把最近一次按降低比例绘制的场景放大到窗口（比例为1时不做任何事）；应在绘制UI之前调用"""
+        if self.last_scale >= 1.0:
+            return
+        display = ScreenManager.get_instance().display
+        size = display.get_size()
+        # 直接写入窗口surface，不分配新的surface
+        if CONFIG['render_scale_smooth'] and display.get_bytesize() in (3, 4):
+            pygame.transform.smoothscale(self.surface, size, display)
+        else:
+            pygame.transform.scale(self.surface, size, display)
@@ -0,0 +1,216 @@
+import math
+
+import numpy as np
+
+
+def _spread_bits(values):
+    """把16位整数的各位隔位展开（第i位移到第2i位），用于交织Morton码"""
+    values = values.astype(np.uint32)
+    values = (values | (values << 8)) & 0x00FF00FF
+    values = (values | (values << 4)) & 0x0F0F0F0F
+    values = (values | (values << 2)) & 0x33333333
+    values = (values | (values << 1)) & 0x55555555
+    return values
+
+
+def morton_codes(cell_x, cell_y):
+    """由网格坐标计算Morton码（x占偶数位，y占奇数位）"""
+    return _spread_bits(cell_x) | (_spread_bits(cell_y) << 1)
+
+
+class SpatialIndex:
+    """质点位置的线性四叉树索引，按Morton码排序后提供任意深度网格单元的聚合查询
+
+    根节点为包含所有存活质点的正方形，最深一层把它划分为2^MAX_DEPTH × 2^MAX_DEPTH个单元。
+    第d层的每个单元对应排序后Morton码的一段连续区间，因此单元的质点数、总质量与质心
+    都可以用前缀和在O(log N)时间内得到。查询从根节点逐层展开与视野相交的非空单元，
+    代价只与视野内的非空单元数有关，与质点总数无关。
+
+    位置变化（BodyStore.version变化）后需要重新构建（一次排序，O(N log N)）。
+    """
+
+    MAX_DEPTH = 16
+    # 四个子单元在Morton码中的序号（dx + 2 * dy）及其网格偏移
+    CHILD_CODES = np.arange(4, dtype=np.uint64)
+    CHILD_X = np.array([0, 1, 0, 1])
+    CHILD_Y = np.array([0, 0, 1, 1])
+
+    def __init__(self):
+        self.store = None
+        self.version = None  # 构建时BodyStore的版本
+        self.count = 0
+        self.origin = (0.0, 0.0)  # 根节点左上角（物理坐标）
+        self.extent = 1.0  # 根节点边长（物理坐标）
+        self.codes = None  # 排序后的Morton码
+        self.bodies = None  # 排序后的质点槽位序号
+        # 质量、x/y方向质量矩与半径平方的前缀和（(N + 1, 4)，首行为0），单元内的和为两端之差
+        self._prefix = None
+        self._max_radius = 0.0
+        self._by_radius = None  # (按半径排序的半径, 对应的槽位序号)，需要时才计算
+
+    def ensure(self, store):
+        """
+        质点位置变化后重新构建索引
+
+        Args:
+            store: BodyStore
+
+        Returns:
+            bool: 是否重新构建
+        """
+        if store is self.store and store.version == self.version:
+            return False
+        self.build(store)
+        return True
+
+    def build(self, store):
+        """
+        按存活质点的当前位置构建索引
+
+        Args:
+            store: BodyStore
+        """
+        self.store = store
+        self.version = store.version
+        alive = store.alive
+        if alive is None:
+            bodies = None
+            positions = store.positions.astype(np.float64, copy=False)
+        else:
+            bodies = np.flatnonzero(alive)
+            positions = store.positions[bodies].astype(np.float64, copy=False)
+        self.count = len(positions)
+        self._by_radius = None
+        if not self.count:
+            self.codes = np.empty(0, dtype=np.uint32)
+            self.bodies = np.empty(0, dtype=np.intp)
+            return
+
+        xs, ys = positions[:, 0], positions[:, 1]
+        left, top = float(xs.min()), float(ys.min())
+        extent = max(float(xs.max()) - left, float(ys.max()) - top)
+        # 稍微放大根节点，使最大坐标也落在最后一个单元内
+        extent = extent * (1.0 + 1e-9) if extent > 0 else 1.0
+        self.origin = (left, top)
+        self.extent = extent
+
+        cells = 1 << self.MAX_DEPTH
+        scale = cells / extent
+        cell_x = np.clip((xs - left) * scale, 0, cells - 1).astype(np.uint32)
+        cell_y = np.clip((ys - top) * scale, 0, cells - 1).astype(np.uint32)
+        codes = morton_codes(cell_x, cell_y)
+        order = np.argsort(codes)
+        self.codes = codes[order]
+        self.bodies = order if alive is None else bodies[order]
+
+        # 质量、质量矩与半径平方先按原顺序连续计算，再按行一次重排（随机访问只有一轮），最后一次cumsum
+        masses = store.masses if alive is None else store.masses[bodies]
+        radii = store.radii if alive is None else store.radii[bodies]
+        columns = np.empty((self.count, 4))
+        columns[:, 0] = masses
+        np.multiply(masses, xs, out=columns[:, 1])
+        np.multiply(masses, ys, out=columns[:, 2])
+        np.multiply(radii, radii, out=columns[:, 3])
+        self._max_radius = float(radii.max())
+        sums = np.empty((self.count + 1, 4))
+        sums[0] = 0.0
+        np.take(columns, order, axis=0, out=sums[1:])
+        np.cumsum(sums, axis=0, out=sums)
+        self._prefix = sums
+
+    def depth_for_cell_size(self, cell_size):
+        """
+        单元边长不小于cell_size（物理坐标）的最深层级
+
+        Returns:
+            int: 0到MAX_DEPTH之间的深度
+        """
+        if cell_size <= 0:
+            return self.MAX_DEPTH
+        depth = math.floor(math.log2(self.extent / cell_size))
+        return max(0, min(depth, self.MAX_DEPTH))
+
+    def query(self, bounds, depth):
+        """
+        查询与给定范围相交的第depth层非空单元的聚合信息
+
+        Args:
+            bounds: (left, right, top, bottom) 物理坐标范围
+            depth: 网格深度（0到MAX_DEPTH）
+
+        Returns:
+            dict: 各非空单元的count（质点数）、mass（总质量）、x/y（质心，总质量为0时取单元内第一个质点的位置）、
+                area（半径平方和）与body（单元内的一个质点序号，用于取颜色）；没有单元时返回None
+        """
+        if not self.count:
+            return None
+        left, right, top, bottom = bounds
+        cell_size = self.extent / (1 << depth)
+        origin_x, origin_y = self.origin
+        # 视野在第depth层覆盖的单元范围
+        first_x = math.floor((left - origin_x) / cell_size)
+        last_x = math.floor((right - origin_x) / cell_size)
+        first_y = math.floor((top - origin_y) / cell_size)
+        last_y = math.floor((bottom - origin_y) / cell_size)
+
+        # 从根节点逐层向下，只展开与视野相交的非空单元的四个子单元（空区域不再细分）
+        keys = np.zeros(1, dtype=np.uint64)
+        cell_x = np.zeros(1, dtype=np.int64)
+        cell_y = np.zeros(1, dtype=np.int64)
+        lo = np.zeros(1, dtype=np.intp)
+        hi = np.full(1, self.count, dtype=np.intp)
+        for level in range(1, depth + 1):
+            keys = (keys[:, None] * 4 + self.CHILD_CODES).ravel()
+            cell_x = (cell_x[:, None] * 2 + self.CHILD_X).ravel()
+            cell_y = (cell_y[:, None] * 2 + self.CHILD_Y).ravel()
+            # 第level层单元对应最深一层Morton码的一段连续区间；子单元的终点就是下一个兄弟单元的起点，
+            # 最后一个子单元的终点是父单元的终点，因此每层只需查找一次起点
+            # （起点在uint32范围内，与排序后的码同类型比较，避免每次查询整体转换类型）
+            starts = (keys << (2 * (self.MAX_DEPTH - level))).astype(np.uint32)
+            child_lo = np.searchsorted(self.codes, starts).reshape(-1, 4)
+            child_hi = np.empty_like(child_lo)
+            child_hi[:, :3] = child_lo[:, 1:]
+            child_hi[:, 3] = hi
+            lo, hi = child_lo.ravel(), child_hi.ravel()
+
+            shift = depth - level
+            keep = (cell_x >= first_x >> shift) & (cell_x <= last_x >> shift)
+            keep &= (cell_y >= first_y >> shift) & (cell_y <= last_y >> shift)
+            keep &= hi > lo
+            keep = np.flatnonzero(keep)
+            if not len(keep):
+                return None
+            keys, cell_x, cell_y, lo, hi = keys[keep], cell_x[keep], cell_y[keep], lo[keep], hi[keep]
+
+        sums = self._prefix[hi] - self._prefix[lo]
+        mass = sums[:, 0]
+        has_mass = mass > 0
+        safe_mass = np.where(has_mass, mass, 1.0)
+        # 总质量为0（只含零质量的测试质点）时取第一个质点的位置
+        first = self.store.positions[self.bodies[lo]]
+        return {
+            'count': hi - lo,
+            'mass': mass,
+            'x': np.where(has_mass, sums[:, 1] / safe_mass, first[:, 0]),
+            'y': np.where(has_mass, sums[:, 2] / safe_mass, first[:, 1]),
+            'area': sums[:, 3],
+            'body': self.bodies[lo],
+        }
+
+    def bodies_larger_than(self, radius):
+        """
+        半径大于radius的存活质点（用于在聚合单元之上单独绘制大质点）
+
+        首次调用时按半径排序一次，之后每次查询只需二分查找。
+
+        Returns:
+            ndarray: 槽位序号（按半径从小到大）
+        """
+        if not self.count or self._max_radius <= radius:
+            return self.bodies[:0]
+        if self._by_radius is None:
+            radii = self.store.radii[self.bodies]
+            order = np.argsort(radii)
+            self._by_radius = (radii[order], self.bodies[order])
+        radii, bodies = self._by_radius
+        return bodies[np.searchsorted(radii, radius, side='right'):]
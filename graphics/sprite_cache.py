@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+import pygame
+
+from config.config import BLACK, CONFIG, WHITE
+
+
+class SpriteCache:
+    """质点圆精灵缓存，按(颜色, 屏幕半径)缓存预先绘制好的实心圆与白色边框，超出容量时淘汰最久未使用的项
+
+    键只取决于屏幕半径，缩放变化时仍用得到的半径的精灵继续命中，不再使用的半径由LRU逐渐淘汰。
+
+    精灵尺寸为(2r+1, 2r+1)，圆心位于(r, r)，blit到(x - r, y - r)与在(x, y)处直接绘制的像素完全一致。
+    """
+
+    def __init__(self, capacity=None):
+        """
+        Args:
+            capacity: 最多缓存的精灵数，默认为CONFIG['sprite_cache_size']
+        """
+        self.capacity = capacity or CONFIG['sprite_cache_size']
+        self.sprites = OrderedDict()  # (颜色, 半径) -> surface，按最近使用排序
+        # 统计（供性能面板使用）
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def clear(self):
+        """清空缓存"""
+        self.sprites.clear()
+
+    def get(self, color, radius):
+        """
+        获取指定颜色与屏幕半径的精灵，不存在时绘制并缓存
+
+        Args:
+            color: RGB颜色元组
+            radius: 屏幕半径（像素，不小于1）
+
+        Returns:
+            pygame.Surface: 以黑色（质点为黑色时为近黑色）为透明色键的精灵
+        """
+        key = (color, radius)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        size = 2 * radius + 1
+        # 透明色键不能与质点颜色相同
+        colorkey = BLACK if tuple(color) != BLACK else (1, 1, 1)
+        sprite = pygame.Surface((size, size))
+        sprite.fill(colorkey)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        pygame.draw.circle(sprite, WHITE, (radius, radius), radius, 1)
+        sprite.set_colorkey(colorkey)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.capacity:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def get_status_line(self):
+        """性能面板显示的缓存状态"""
+        total = self.hits + self.misses
+        rate = self.hits / total * 100.0 if total else 0.0
+        return f"sprites: {len(self.sprites)}/{self.capacity} hit {rate:.0f}%"
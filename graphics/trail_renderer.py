@@ -0,0 +1,115 @@
+import numpy as np
+import pygame
+
+from config.config import BLACK, CONFIG
+
+
+class TrailRenderer:
+    """轨迹渲染器单例类，按时间把轨迹渐隐绘制
+
+    一条轨迹按点序（从旧到新）分成trail_fade_buckets段，每段用一次pygame.draw.lines绘制，
+    越旧的段越透明，每条轨迹只需几次绘制调用。渐隐方式：
+    gradient按不透明度把颜色预先与背景色（黑色）混合后直接绘制，没有逐像素混合的开销；
+    alpha把各段以带透明度的颜色写入共用的SRCALPHA图层，flush时只把绘制过的区域混合到屏幕上；
+    off不渐隐，整条轨迹一次绘制。
+    """
+
+    FADE_MODES = ('gradient', 'alpha', 'off')
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(TrailRenderer, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # 单例模式，避免重复初始化
+        if TrailRenderer._initialized:
+            return
+
+        self.mode = CONFIG['trail_fade']
+        self.buckets = max(1, CONFIG['trail_fade_buckets'])
+        self.min_alpha = CONFIG['trail_fade_min_alpha']
+        self._gradients = {}  # (颜色, 分段数) -> 各段混合后的颜色
+        # alpha模式的共用图层与本次flush之前绘制过的区域
+        self._layer = None
+        self._dirty = None
+
+        TrailRenderer._initialized = True
+
+    @classmethod
+    def get_instance(cls):
+        """获取TrailRenderer单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def _alphas(self, count):
+        """count段从旧到新的不透明度（0-1），从min_alpha之上线性增加到最新一段的1"""
+        return self.min_alpha + (1.0 - self.min_alpha) * np.arange(1, count + 1) / count
+
+    def _gradient(self, color, count):
+        """按各段不透明度与黑色背景预先混合的颜色"""
+        key = (color, count)
+        colors = self._gradients.get(key)
+        if colors is None:
+            background = np.array(BLACK, dtype=np.float64)
+            blended = background + (np.array(color[:3], dtype=np.float64) - background) * self._alphas(count)[:, None]
+            colors = [tuple(row) for row in np.rint(blended).astype(int).tolist()]
+            self._gradients[key] = colors
+        return colors
+
+    def _layer_for(self, screen):
+        """alpha模式的图层（与绘制目标同尺寸，尺寸变化时重新创建）"""
+        if self._layer is None or self._layer.get_size() != screen.get_size():
+            self._layer = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+            self._dirty = None
+        return self._layer
+
+    def draw(self, screen, points, color):
+        """
+        绘制一条渐隐轨迹
+
+        Args:
+            screen: 绘制目标surface
+            points: 屏幕坐标点列表（从旧到新）
+            color: 轨迹颜色（RGB）
+        """
+        if len(points) < 2:
+            return
+        if self.mode == 'off':
+            pygame.draw.lines(screen, color, False, points, 1)
+            return
+
+        # 分段边界：第i段包含bounds[i]到bounds[i + 1]的点（相邻段共享端点，保证连续）
+        count = min(self.buckets, len(points) - 1)
+        bounds = np.rint(np.linspace(0, len(points) - 1, count + 1)).astype(int).tolist()
+        color = tuple(color[:3])
+
+        if self.mode == 'gradient':
+            for start, stop, faded in zip(bounds, bounds[1:], self._gradient(color, count)):
+                pygame.draw.lines(screen, faded, False, points[start:stop + 1], 1)
+            return
+
+        layer = self._layer_for(screen)
+        alphas = np.rint(self._alphas(count) * 255).astype(int).tolist()
+        for start, stop, alpha in zip(bounds, bounds[1:], alphas):
+            rect = pygame.draw.lines(layer, (*color, alpha), False, points[start:stop + 1], 1)
+            self._dirty = rect if self._dirty is None else self._dirty.union(rect)
+
+    def flush(self, screen):
+        """
+        把alpha模式图层上绘制过的区域混合到屏幕并清空（其他模式直接绘制，无需flush）
+
+        Args:
+            screen: 绘制目标surface
+        """
+        if self._dirty is None:
+            return
+        dirty = self._dirty.clip(self._layer.get_rect())
+        self._dirty = None
+        if dirty.width and dirty.height:
+            screen.blit(self._layer, dirty.topleft, dirty)
+            self._layer.fill((0, 0, 0, 0), dirty)
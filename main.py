@@ -1,30 +1,78 @@
-import math
+import argparse
 import sys
-
-import pygame
-
-from config.config import BLACK, RED, BLUE, PURPLE
-from config.config import CONFIG, auto_params, WIDTH, HEIGHT, FPS, FIXED_PHYSICS_DT
-from core.ball import Ball
+import time
+
+# pygame.pkgdata在可导入时会加载pkg_resources（冷启动约100~150ms），但只用它查找内置字体等资源，
+# 缺失时会回退为按文件路径查找。导入pygame期间暂时屏蔽它，导入后恢复，不影响其他模块使用。
+# pygame没有跳过pkgdata的开关，只能在导入期间占位；try/finally保证导入失败时也恢复（tests/test_startup.py覆盖）
+_hide_pkg_resources = 'pkg_resources' not in sys.modules
+if _hide_pkg_resources:
+    sys.modules['pkg_resources'] = None
+try:
+    import pygame
+finally:
+    if _hide_pkg_resources and sys.modules.get('pkg_resources', False) is None:
+        del sys.modules['pkg_resources']
+
+from config.config import BLACK, CONFIG
+from config.config import WIDTH, HEIGHT, FPS, FIXED_PHYSICS_DT
 from core.physics_engine import PhysicsEngine
+from core.scenarios import SCENARIOS, create_scenario
+from core.step_scheduler import StepScheduler
 from graphics.coordinate_system import CoordinateSystem
+from graphics.quality_governor import QualityGovernor
+from graphics.render_target import RenderTarget
 from managers.camera_manager import CameraManager
 from managers.game_controller import GameController
 from managers.screen_manager import ScreenManager
 from managers.ui_manager import UIManager
-
-# 初始化pygame
-pygame.init()
+from profiling.capture import ProfileCapture
+from profiling.frame_profiler import FrameProfiler
 
 
 class Game:
     """主类"""
 
-    def __init__(self):
+    def __init__(self, scenario='triangle', n_bodies=3, seed=None, snapshot=None, precision=None,
+                 physics_process=False, record=None, replay=None):
+        """
+        Args:
+            scenario: 初始条件场景名称，见core.scenarios.SCENARIOS
+            n_bodies: 质点数量（triangle场景固定为3）
+            seed: 随机种子
+            snapshot: 初始条件快照路径（.npz或.npy目录），指定时忽略场景参数
+            precision: 状态数组精度（'float64'或'float32'），默认使用CONFIG['simulation_precision']
+            physics_process: 是否在子进程中运行物理模拟（渲染进程只读取共享内存中的最新状态）
+            record: 轨迹录制输出路径，空字符串表示按时间戳命名，None表示不录制
+            replay: 回放的轨迹文件路径，指定时不运行物理，忽略场景、快照与物理子进程参数
+        """
+        self.scenario = scenario
+        self.n_bodies = n_bodies
+        self.seed = seed
+        self.snapshot = snapshot
+        self.precision = precision
+        self.use_physics_process = physics_process
+        self.physics_process = None  # 物理子进程（init时按需创建）
+        self.record = record
+        self.replay = replay
+        self.player = None  # 回放器，回放模式下代替物理推进
         self.clock = pygame.time.Clock()
+        self.profiler = FrameProfiler.get_instance()
+        self.profile_capture = ProfileCapture.get_instance()
+        self.step_scheduler = StepScheduler.get_instance()
+        self.quality_governor = QualityGovernor.get_instance()
+        self.render_target = RenderTarget.get_instance()
+        # 物理子进程、回退缓冲区、录制与回放模块只在用到时导入，不计入启动耗时
+        self.rewind_buffer = None
+        # 空闲（暂停且画面不变）时停止重绘，阻塞等待输入
+        self.idle = False
+        self._drawn_view = None  # 最近一次绘制时的摄像头位置与缩放
 
     def init(self):
         """初始化"""
+        # 只初始化用到的显示和字体子系统（pygame.init还会初始化音频、手柄等）
+        pygame.display.init()
+        pygame.font.init()
 
         # 初始化屏幕管理器
         self.screen_manager = ScreenManager.get_instance().initialize(WIDTH, HEIGHT, "Scalable Physics Engine")
@@ -37,9 +85,12 @@ class Game:
 
         # 创建UI管理器（单例模式）
         self.ui_manager = UIManager.get_instance()
+        self.ui_manager.set_clock(self.clock)
 
         # 创建物理引擎
         self.engine = PhysicsEngine()
+        if self.precision:
+            self.engine.set_precision(self.precision)
 
         # 初始化物理参数
         self.init_physics()
@@ -47,123 +98,220 @@ class Game:
         # 初始化游戏控制器
         self.game_controller = GameController()
 
+        # 回放模式：注册回放按键并显示时间轴（物理子进程不再需要）
+        if self.player:
+            self.game_controller.set_player(self.player)
+            self.ui_manager.set_player(self.player)
+        elif self.use_physics_process:
+            # 启动物理子进程（以已加载的初始条件为起点）
+            from core.physics_process import PhysicsProcess
+            self.physics_process = PhysicsProcess()
+            self.physics_process.start(self.engine)
+            self.game_controller.set_physics_process(self.physics_process)
+        elif CONFIG['rewind_enabled']:
+            # 保存初始状态用于回退与重置
+            from core.rewind_buffer import RewindBuffer
+            self.rewind_buffer = RewindBuffer.get_instance()
+            self.rewind_buffer.start(self.engine)
+            self.game_controller.set_rewind_buffer(self.rewind_buffer)
+
+        # 从初始状态开始录制轨迹
+        if self.record is not None:
+            try:
+                self.game_controller.get_recorder().start(self.engine, self.record or None)
+            except OSError as e:
+                print(f"Error starting trajectory recording: {e}")
+
     def init_physics(self):
         """初始化物理系统"""
-        # 创建三个质点 - 三角形配置
-        center_x, center_y = WIDTH // 2, HEIGHT // 2
-        self.separation = CONFIG['separation']
-        self.mass1 = CONFIG['mass1']
-        self.mass2 = CONFIG['mass2']
-        self.mass3 = CONFIG['mass3']
-        self.initial_speed = CONFIG['initial_speed']
-        self.total_mass = self.mass1 + self.mass2 + self.mass3
-
-        # 三角形配置：三个球形成等边三角形
-        angle1 = 0  # 球1在右侧
-        angle2 = 2 * math.pi / 3  # 球2在左上
-        angle3 = 4 * math.pi / 3  # 球3在左下
-
-        # 计算三个球的初始位置（围绕质心形成三角形）
-        radius = self.separation / 2  # 三角形的外接圆半径
-
-        # 球1位置和速度
-        self.x1 = center_x + radius * math.cos(angle1)
-        self.y1 = center_y + radius * math.sin(angle1)
-        # 切向速度（垂直于半径方向）
-        self.vx1 = -self.initial_speed * math.sin(angle1)
-        self.vy1 = self.initial_speed * math.cos(angle1)
-        # 球2位置和速度
-        self.x2 = center_x + radius * math.cos(angle2)
-        self.y2 = center_y + radius * math.sin(angle2)
-        self.vx2 = -self.initial_speed * math.sin(angle2)
-        self.vy2 = self.initial_speed * math.cos(angle2)
-        # 球3位置和速度
-        self.x3 = center_x + radius * math.cos(angle3)
-        self.y3 = center_y + radius * math.sin(angle3)
-        self.vx3 = -self.initial_speed * math.sin(angle3)
-        self.vy3 = self.initial_speed * math.cos(angle3)
-        # 创建三个球
-        self.ball1 = Ball(
-            x=self.x1, y=self.y1, vx=self.vx1, vy=self.vy1,
-            mass=self.mass1,
-            radius=auto_params['radius1'],
-            color=BLUE
-        )
-
-        self.ball2 = Ball(
-            x=self.x2, y=self.y2, vx=self.vx2, vy=self.vy2,
-            mass=self.mass2,
-            radius=auto_params['radius2'],
-            color=RED
-        )
-
-        self.ball3 = Ball(
-            x=self.x3, y=self.y3, vx=self.vx3, vy=self.vy3,
-            mass=self.mass3,
-            radius=auto_params['radius3'],
-            color=PURPLE
-        )
-
-        # 添加质点到物理引擎
-        self.engine.add_ball(self.ball1)
-        self.engine.add_ball(self.ball2)
-        self.engine.add_ball(self.ball3)
+        if self.replay:
+            # 回放以内存映射方式打开轨迹文件，载入第一帧
+            from recording.replay import TrajectoryPlayer
+            try:
+                self.player = TrajectoryPlayer(self.replay)
+                self.player.load(self.engine)
+                return
+            except (OSError, ValueError) as e:
+                self.player = None
+                print(f"Error opening trajectory {self.replay}: {e}")
+
+        if self.snapshot:
+            # 快照以内存映射方式加载，坐标按原样使用（加载失败时改用场景）
+            try:
+                self.engine.load_snapshot(self.snapshot)
+                return
+            except (OSError, ValueError) as e:
+                print(f"Error loading snapshot: {e}")
+
+        # 按所选场景生成初始条件（默认是三个质点的三角形配置），以屏幕中心为系统中心
+        center = (WIDTH // 2, HEIGHT // 2)
+        initial_conditions = create_scenario(self.scenario, n=self.n_bodies, seed=self.seed, center=center)
+        self.engine.load_initial_conditions(initial_conditions)
 
     def update_physics(self, frame_dt):
-        """更新物理系统"""
-        if not self.game_controller.is_paused():
-            simulation_speed = self.ui_manager.get_simulation_speed()
-            self.engine.physics_accumulator += frame_dt * simulation_speed
-            while self.engine.physics_accumulator >= FIXED_PHYSICS_DT:
-                self.engine.update(FIXED_PHYSICS_DT)
-                self.engine.physics_accumulator -= FIXED_PHYSICS_DT
+        """更新物理系统，返回本帧执行的物理步数（回放时为移动的帧数）"""
+        paused = self.game_controller.is_paused()
+        simulation_speed = self.ui_manager.get_simulation_speed()
+
+        if self.player:
+            # 回放：按播放速度移动帧游标，返回移动的帧数
+            return self.player.update(frame_dt, simulation_speed, paused)
+
+        if self.physics_process:
+            # 物理在子进程中按自己的节奏推进，这里只同步命令并读取最新快照
+            self.physics_process.set_paused(paused)
+            self.physics_process.set_speed(simulation_speed)
+            steps = self.physics_process.sync(self.engine)
+            if not paused:
+                self.step_scheduler.observe(steps * FIXED_PHYSICS_DT, frame_dt, simulation_speed)
+            return steps
+
+        if paused:
+            return 0
+
+        # 调度器在每帧时间预算内推进物理，超出部分有界结转，避免帧时间与积压互相放大
+        return self.step_scheduler.run(self.engine, frame_dt, simulation_speed)
+
+    def needs_redraw(self, steps):
+        """
+        本帧画面是否可能变化：模拟运行、处理了输入事件、摄像头移动或尚未跟上跟踪目标、正在拖动滑块时都需要重绘
+
+        Args:
+            steps: 本帧执行的物理步数
+        """
+        if not CONFIG['idle_render_suppression']:
+            return True
+        camera = self.camera_manager.camera
+        view = (camera.position.x, camera.position.y, camera.zoom)
+        return (not self.game_controller.is_paused() or steps > 0 or self.game_controller.had_events() or
+                view != self._drawn_view or not camera.is_settled() or self.ui_manager.is_dragging())
 
     def draw(self):
         """绘制画面"""
-        # 清屏
-        self.screen_manager.fill(BLACK)
+        profiler = self.profiler
 
         # 更新摄像头
-        self.camera_manager.update()
+        with profiler.phase('camera'):
+            # 在上一物理步与当前物理步之间插值（物理子进程与回放模式下直接绘制最新状态）
+            self.engine.interpolate(1.0 if self.physics_process or self.player else None)
+            self.camera_manager.update()
+
+            # 更新坐标系统缩放
+            self.coord_system.set_zoom(self.ui_manager.get_zoom_level())
+
+        # 场景按内部渲染比例绘制（比例小于1时绘制到离屏surface）
+        with self.render_target.scene():
+            with profiler.phase('grid'):
+                # 清屏
+                self.screen_manager.fill(BLACK)
 
-        # 更新坐标系统缩放
-        self.coord_system.set_zoom(self.ui_manager.get_zoom_level())
+                # 绘制背景网格（细节由渲染质量调节器决定）
+                self.coord_system.set_grid_detail(self.quality_governor.grid_detail)
+                self.coord_system.draw_grid()
 
-        # 绘制背景网格
-        self.coord_system.draw_grid()
+            # 绘制物体
+            with profiler.phase('bodies'):
+                self.engine.draw(self.game_controller.should_show_centroid())
 
-        # 绘制物体
-        self.engine.draw(self.game_controller.should_show_centroid())
+        # 把场景放大到窗口，UI在其上以原生分辨率绘制
+        with profiler.phase('scale'):
+            self.render_target.present()
 
         # 绘制UI
-        self.ui_manager.draw_ui(self.game_controller.is_paused())
+        with profiler.phase('ui'):
+            self.ui_manager.draw_ui(self.game_controller.is_paused())
 
-        pygame.display.flip()
+        with profiler.phase('flip'):
+            pygame.display.flip()
 
     def loop(self):
         """主循环"""
         while self.game_controller.is_running():
+            if self.idle:
+                # 画面没有变化：阻塞等待输入而不是以帧率空转重绘，超时后继续等待
+                if not self.game_controller.wait_for_event(CONFIG['idle_wait_ms']):
+                    continue
+                # 等待的时间不计入下一帧的帧时间
+                self.clock.tick()
+                self.idle = False
+
             frame_dt = self.clock.tick(FPS) / 1000.0  # 帧时间增量
+            frame_start = time.perf_counter()
+            self.profiler.begin_frame(frame_dt)
 
             # 处理事件
-            self.game_controller.handle_events()
+            with self.profiler.phase('events'):
+                self.game_controller.handle_events()
 
             # 物理计算
-            self.update_physics(frame_dt)
+            with self.profiler.phase('physics'):
+                steps = self.update_physics(frame_dt)
+                # 录制只复制状态并放入队列，写盘在后台线程中完成
+                if self.game_controller.recorder:
+                    self.game_controller.recorder.on_physics(self.engine)
+                if self.rewind_buffer:
+                    self.rewind_buffer.on_physics(self.engine, steps)
+            self.profiler.add_physics_steps(steps)
+
+            if not self.needs_redraw(steps):
+                # 不重绘的帧不计入性能统计，下一轮进入空闲等待
+                self.idle = True
+                continue
 
             # 绘制
             self.draw()
+            camera = self.camera_manager.camera
+            self._drawn_view = (camera.position.x, camera.position.y, camera.zoom)
+
+            self.profiler.end_frame()
+            self.profile_capture.on_frame()
+
+            # 按本帧工作耗时（不含等待时间）调节渲染质量
+            self.quality_governor.observe((time.perf_counter() - frame_start) * 1000.0)
 
         # 清理资源
         self.game_controller.cleanup()
+        if self.physics_process:
+            self.physics_process.stop()
 
         # 退出
         pygame.quit()
         sys.exit()
 
 
+def positive_int(value):
+    """argparse类型：正整数"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="Scalable Physics Engine")
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='triangle',
+                        help='initial conditions to simulate')
+    parser.add_argument('-n', '--bodies', type=positive_int, default=3, help='number of bodies (ignored by triangle)')
+    parser.add_argument('--seed', type=int, default=None, help='random seed for the scenario generator')
+    parser.add_argument('--precision', choices=sorted(PhysicsEngine.PRECISIONS), default=None,
+                        help='storage precision for positions and velocities')
+    parser.add_argument('--physics-process', action='store_true',
+                        help='run physics in a child process that publishes state through shared memory')
+    parser.add_argument('--snapshot', default=None,
+                        help='memory-map initial conditions from a .npz file or a directory of .npy files')
+    parser.add_argument('--record', nargs='?', const='', default=None, metavar='PATH',
+                        help='record the run to a trajectory file (default: timestamped file in recordings/)')
+    parser.add_argument('--replay', default=None, metavar='PATH',
+                        help='play back a trajectory file instead of simulating')
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
     """主函数"""
-    game = Game()
+    args = parse_args()
+    game = Game(scenario=args.scenario, n_bodies=args.bodies, seed=args.seed, snapshot=args.snapshot,
+                precision=args.precision, physics_process=args.physics_process, record=args.record,
+                replay=args.replay)
     game.init()
     game.loop()
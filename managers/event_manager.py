@@ -14,6 +14,10 @@ class EventManager:
         self._key_handlers: Dict[int, List[Callable]] = {}
         # 连续按键处理器列表
         self._continuous_key_handlers: List[Callable] = []
+        # 空闲等待期间收到的事件，留给下一次handle_events分发
+        self._pending_events: List[pygame.event.Event] = []
+        # 最近一次handle_events分发的事件数（用于判断画面是否需要重绘）
+        self.events_handled = 0
 
     def register_event_handler(self, event_type: int, handler: Callable):
         """注册事件处理器
@@ -68,9 +72,28 @@ class EventManager:
         except ValueError:
             pass
 
+    def wait(self, timeout):
+        """
+        阻塞等待下一个事件，收到的事件在下一次handle_events中按顺序分发
+
+        Args:
+            timeout: 最长等待时间（毫秒）
+
+        Returns:
+            bool: 是否收到事件（超时返回False）
+        """
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return False
+        self._pending_events.append(event)
+        return True
+
     def handle_events(self):
         """处理所有pygame事件"""
-        for event in pygame.event.get():
+        events = self._pending_events + pygame.event.get()
+        self._pending_events = []
+        self.events_handled = len(events)
+        for event in events:
             # 分发通用事件
             if event.type in self._event_handlers:
                 for handler in self._event_handlers[event.type]:
@@ -1,6 +1,9 @@
 import pygame
 
+from config.config import CONFIG
 from core.physics_engine import PhysicsEngine
+from profiling.capture import ProfileCapture
+from profiling.frame_profiler import FrameProfiler
 from .camera_manager import CameraManager
 from .event_manager import EventManager
 from .game_state_manager import GameStateManager
@@ -19,9 +22,17 @@ class GameController:
         self.camera_manager = CameraManager.get_instance()
         self.ui_manager = UIManager.get_instance()
         self.engine = PhysicsEngine.get_instance()
+        self.profiler = FrameProfiler.get_instance()
+        self.profile_capture = ProfileCapture.get_instance()
+        self.recorder = None  # 轨迹录制器（第一次录制时创建）
 
-        # 跟踪目标列表
-        self.targets = self.engine.balls.copy()
+        # 物理子进程、回退缓冲区与回放器（由Game设置，决定重置与回退的处理方式）
+        self.physics_process = None
+        self.rewind_buffer = None
+        self.player = None
+
+        # 跟踪目标列表（前三个质点和质心）
+        self.targets = self.engine.balls[:3]
         self.targets.append(self.engine.centroid)
         self.camera_manager.set_target(self.targets[0])  # 设置默认跟踪目标
 
@@ -57,6 +68,27 @@ class GameController:
         self.event_manager.register_key_handler(
             pygame.K_TAB, self._handle_target_cycle
         )
+        self.event_manager.register_key_handler(
+            pygame.K_F4, self._handle_profiler_export
+        )
+        self.event_manager.register_key_handler(
+            pygame.K_F5, self._handle_cprofile_toggle
+        )
+        self.event_manager.register_key_handler(
+            pygame.K_F6, self._handle_tracemalloc_toggle
+        )
+        self.event_manager.register_key_handler(
+            pygame.K_F7, self._handle_allocation_tracking_toggle
+        )
+        self.event_manager.register_key_handler(
+            pygame.K_F8, self._handle_recording_toggle
+        )
+        self.event_manager.register_key_handler(
+            pygame.K_r, self._handle_reset
+        )
+        self.event_manager.register_key_handler(
+            pygame.K_BACKSPACE, self._handle_rewind
+        )
 
         # 注册连续按键处理器
         self.event_manager.register_continuous_key_handler(
@@ -82,6 +114,47 @@ class GameController:
             pygame.MOUSEWHEEL, self.ui_manager.handle_event
         )
 
+    def set_player(self, player):
+        """进入回放模式：注册回放控制按键
+
+        Args:
+            player: recording.replay.TrajectoryPlayer
+        """
+        self.player = player
+        jump = CONFIG['replay_jump_fraction']
+        self.event_manager.register_key_handler(
+            pygame.K_b, lambda key: player.toggle_direction()
+        )
+        self.event_manager.register_key_handler(
+            pygame.K_COMMA, lambda key: player.step(-1)
+        )
+        self.event_manager.register_key_handler(
+            pygame.K_PERIOD, lambda key: player.step(1)
+        )
+        self.event_manager.register_key_handler(
+            pygame.K_PAGEUP, lambda key: player.jump(-jump)
+        )
+        self.event_manager.register_key_handler(
+            pygame.K_PAGEDOWN, lambda key: player.jump(jump)
+        )
+
+    def set_physics_process(self, physics_process):
+        """物理在子进程中运行时，重置命令发送给子进程"""
+        self.physics_process = physics_process
+
+    def set_rewind_buffer(self, rewind_buffer):
+        """物理在本进程中运行时，重置与回退由回退缓冲区完成"""
+        self.rewind_buffer = rewind_buffer
+        self.ui_manager.set_rewind_buffer(rewind_buffer)
+
+    def get_recorder(self):
+        """获取轨迹录制器（录制模块在第一次录制时才导入）"""
+        if self.recorder is None:
+            from recording.recorder import TrajectoryRecorder
+            self.recorder = TrajectoryRecorder.get_instance()
+            self.ui_manager.set_recorder(self.recorder)
+        return self.recorder
+
     def _handle_quit_event(self, event):
         """处理退出事件"""
         self.state_manager.stop_game()
@@ -100,6 +173,8 @@ class GameController:
         Args:
             target_index: 目标索引
         """
+        if target_index >= len(self.targets):
+            return
         self.camera_manager.set_target(self.targets[target_index])
         self.state_manager.set_target_index(target_index)
 
@@ -109,6 +184,55 @@ class GameController:
         next_index = (current_index + 1) % len(self.targets)
         self._handle_target_selection(next_index)
 
+    def _handle_profiler_export(self, key):
+        """导出帧性能数据"""
+        try:
+            path = self.profiler.export_csv()
+            print(f"Frame profile exported to {path}")
+        except OSError as e:
+            print(f"Error exporting frame profile: {e}")
+
+    def _handle_cprofile_toggle(self, key):
+        """开始或提前结束cProfile采集"""
+        try:
+            self.profile_capture.toggle_cprofile()
+        except OSError as e:
+            print(f"Error writing cProfile capture: {e}")
+
+    def _handle_tracemalloc_toggle(self, key):
+        """开始或提前结束tracemalloc采集"""
+        try:
+            self.profile_capture.toggle_tracemalloc()
+        except OSError as e:
+            print(f"Error writing tracemalloc capture: {e}")
+
+    def _handle_allocation_tracking_toggle(self, key):
+        """切换物理步分配跟踪"""
+        self.engine.toggle_allocation_tracking()
+
+    def _handle_recording_toggle(self, key):
+        """开始或结束轨迹录制"""
+        try:
+            self.get_recorder().toggle(self.engine)
+        except OSError as e:
+            print(f"Error starting trajectory recording: {e}")
+
+    def _handle_reset(self, key):
+        """重置到初始状态（回放时跳到第一帧）"""
+        if self.player:
+            self.player.seek(0)
+        elif self.physics_process:
+            self.physics_process.reset()
+        elif not (self.rewind_buffer and self.rewind_buffer.reset(self.engine)):
+            print("Cannot reset: no saved initial state (rewind buffer disabled or precision changed)")
+
+    def _handle_rewind(self, key):
+        """回退到上一个快照"""
+        if self.player or self.physics_process or not self.rewind_buffer:
+            # 回放有自己的时间轴；子进程模式下积分状态在子进程中，无法在这里恢复
+            return
+        self.rewind_buffer.rewind(self.engine)
+
     def _handle_keydown_event(self, event):
         """处理按键按下事件"""
         # 让UI管理器处理其他键盘事件
@@ -122,6 +246,14 @@ class GameController:
         # 处理事件队列
         self.event_manager.handle_events()
 
+    def wait_for_event(self, timeout: int) -> bool:
+        """阻塞等待下一个事件（最多timeout毫秒），返回是否收到事件"""
+        return self.event_manager.wait(timeout)
+
+    def had_events(self) -> bool:
+        """最近一次handle_events是否处理了事件"""
+        return self.event_manager.events_handled > 0
+
     def is_running(self) -> bool:
         """游戏是否在运行"""
         return self.state_manager.is_running()
@@ -136,4 +268,11 @@ class GameController:
 
     def cleanup(self):
         """清理资源"""
+        # 退出时写出未完成的采集
+        self.profile_capture.stop_cprofile()
+        self.profile_capture.stop_tracemalloc()
+        if self.recorder:
+            self.recorder.stop()
+        self.engine.enable_allocation_tracking(False)
+        self.engine.shutdown()
         self.event_manager.clear_all_handlers()
@@ -6,6 +6,7 @@ class ScreenManager:
 
     _instance = None
     _screen = None
+    _target = None  # 场景绘制目标（降低渲染比例时为离屏surface）
 
     def __new__(cls):
         if cls._instance is None:
@@ -33,11 +34,27 @@ class ScreenManager:
 
     @property
     def screen(self):
-        """获取screen对象"""
+        """获取当前的绘制目标（设置了离屏目标时返回离屏surface，否则返回窗口surface）"""
+        if self._target is not None:
+            return self._target
+        return self.display
+
+    @property
+    def display(self):
+        """获取窗口surface"""
         if self._screen is None:
             raise RuntimeError("Screen not initialized. Please call initialize() first.")
         return self._screen
 
+    def set_target(self, surface):
+        """
+        设置场景绘制目标
+
+        Args:
+            surface: 离屏surface；为None时恢复绘制到窗口
+        """
+        self._target = surface
+
     def get_size(self):
         """获取屏幕尺寸"""
         return self.width, self.height
@@ -1,9 +1,12 @@
 import pygame
 
-from config.config import CONFIG, WIDTH, FIXED_PHYSICS_DT
+from config.config import CONFIG, WIDTH, HEIGHT, FIXED_PHYSICS_DT
 from core.physics_engine import PhysicsEngine
+from core.step_scheduler import StepScheduler
 from graphics.coordinate_system import CoordinateSystem
-from ui.ui_components import SpeedSlider, ZoomSlider, EnergyGraph, InfoText
+from graphics.quality_governor import QualityGovernor
+from profiling.capture import ProfileCapture
+from profiling.frame_profiler import FrameProfiler
 from .camera_manager import CameraManager
 from .screen_manager import ScreenManager
 
@@ -17,15 +20,31 @@ class UIManager:
         # 通过单例获取CoordinateSystem实例
         self.coord_system = CoordinateSystem.get_instance()
         self.font = pygame.font.Font(None, 24)
+        self.small_font = pygame.font.Font(None, CONFIG['profiler_font_size'])
         # 获取CameraManager实例
         self.camera_manager = CameraManager.get_instance()
         self.engine = PhysicsEngine.get_instance()
+        self.profiler = FrameProfiler.get_instance()
+        self.profile_capture = ProfileCapture.get_instance()
+        self.step_scheduler = StepScheduler.get_instance()
+        self.quality_governor = QualityGovernor.get_instance()
+        # 主循环时钟，用于显示真实帧率
+        self.clock = None
 
         # UI组件
         self.energy_graph = None
         self.info_text_display = None
         self.speed_slider = None
         self.zoom_slider = None
+        self.profiler_overlay = None
+        self.capture_summary = None
+        self.timeline = None  # 只在回放时创建
+
+        # 回放器（None表示实时模拟）
+        self.player = None
+        # 回退缓冲区与轨迹录制器（用到时才创建，None时性能面板不显示其状态）
+        self.rewind_buffer = None
+        self.recorder = None
 
         # 拖动相关状态
         self.dragging = False
@@ -34,6 +53,10 @@ class UIManager:
         # UI可见性控制
         self.ui_visible = True
 
+        # 降低UI刷新率时缓存的UI图层与帧计数
+        self.ui_surface = None
+        self.ui_frame = 0
+
         # 初始化UI组件
         self._init_ui_components()
 
@@ -46,6 +69,9 @@ class UIManager:
 
     def _init_ui_components(self):
         """初始化UI组件"""
+        # UI组件包在首次创建UIManager时才导入，不计入模块导入阶段的启动耗时
+        from ui.ui_components import SpeedSlider, ZoomSlider, EnergyGraph, InfoText, ProfilerOverlay, CaptureSummary
+
         # 创建能量图表
         self.energy_graph = EnergyGraph(
             x=CONFIG['energy_graph_x'],
@@ -78,11 +104,49 @@ class UIManager:
             initial_val=0.3
         )
 
+        # 创建性能分析面板
+        self.profiler_overlay = ProfilerOverlay(
+            x=WIDTH - CONFIG['profiler_overlay_x_offset'],
+            y=CONFIG['profiler_overlay_y'],
+            width=CONFIG['profiler_overlay_x_offset'] - 10,
+            line_height=CONFIG['profiler_font_size']
+        )
+
+        # 创建性能采集摘要（位于能量图表下方）
+        self.capture_summary = CaptureSummary(
+            x=CONFIG['energy_graph_x'],
+            y=CONFIG['energy_graph_y'] + CONFIG['energy_graph_height'] + 40,
+            line_height=CONFIG['profiler_font_size']
+        )
+
+    def set_clock(self, clock):
+        """设置主循环时钟"""
+        self.clock = clock
+
+    def set_player(self, player):
+        """进入回放模式：在屏幕底部创建时间轴"""
+        from ui.ui_components import Timeline
+
+        self.player = player
+        height = CONFIG['timeline_height']
+        self.timeline = Timeline(x=10, y=HEIGHT - height - 10, width=WIDTH - 20, height=height,
+                                 on_seek=player.seek_fraction)
+
+    def set_rewind_buffer(self, rewind_buffer):
+        """在性能面板中显示回退缓冲区状态"""
+        self.rewind_buffer = rewind_buffer
+
+    def set_recorder(self, recorder):
+        """在性能面板中显示录制状态（录制中时）"""
+        self.recorder = recorder
+
     def handle_event(self, event):
         """处理UI相关事件"""
         # 让滑块处理鼠标事件
         self.speed_slider.handle_event(event)
         self.zoom_slider.handle_event(event)
+        if self.timeline:
+            self.timeline.handle_event(event)
 
         # 检查是否点击在UI组件上
         mouse_x, mouse_y = event.pos if hasattr(event, 'pos') else (0, 0)
@@ -97,17 +161,32 @@ class UIManager:
             # 更新滑块值以反映摄像头的缩放
             self.zoom_slider.val = self.camera_manager.get_zoom()
 
+    def is_dragging(self):
+        """是否正在拖动滑块"""
+        return (self.speed_slider.dragging or self.zoom_slider.dragging or
+                (self.timeline is not None and self.timeline.dragging))
+
     def handle_keyboard_event(self, key):
         """处理键盘事件"""
         if key == pygame.K_g:
             # 切换网格显示
             self.coord_system.toggle_grid()
+        elif key == pygame.K_h:
+            # 切换质点渲染模式（自动/逐点/密度图）
+            from graphics.body_renderer import BodyRenderer
+            BodyRenderer.get_instance().cycle_mode()
+        elif key == pygame.K_v:
+            # 切换场景内部渲染比例（100%/75%/50%）
+            from graphics.render_target import RenderTarget
+            RenderTarget.get_instance().cycle_scale()
         elif key == pygame.K_e:
             # 切换UI显示
             self.energy_graph.toggle_visibility()
             self.info_text_display.toggle_visibility()
             self.speed_slider.toggle_visibility()
             self.zoom_slider.toggle_visibility()
+            if self.timeline:
+                self.timeline.toggle_visibility()
         elif key == pygame.K_0:
             # 重置速度为1.0
             self.speed_slider.val = 1.0
@@ -124,6 +203,9 @@ class UIManager:
         elif key == pygame.K_f:
             # 切换跟踪模式
             self.camera_manager.toggle_follow_mode()
+        elif key == pygame.K_F3:
+            # 切换性能分析面板
+            self.profiler_overlay.toggle_visibility()
 
         # 让摄像头处理按键事件
         self.camera_manager.handle_key_press(key)
@@ -149,38 +231,84 @@ class UIManager:
         if 10 <= mouse_x <= 300 and 10 <= mouse_y <= 200:
             return True
 
+        # 检查回放时间轴区域（含上方的状态文本）
+        if self.timeline and self.timeline.visible and \
+                self.timeline.rect.inflate(0, CONFIG.get('label_y_offset', 25) * 2).collidepoint(mouse_x, mouse_y):
+            return True
+
         return False
 
     def draw_ui(self, paused=False):
-        """绘制所有UI组件"""
+        """绘制所有UI组件（渲染质量降低时每ui_interval帧重绘一次UI图层，其余帧复用）"""
         if not self.ui_visible:
             return
 
         screen = ScreenManager.get_instance().screen
+        # 暂停时只在画面变化时重绘，之后进入空闲等待，复用的旧UI图层会一直停留在屏幕上，因此每次都重绘
+        interval = 1 if paused else self.quality_governor.ui_interval
+        if interval <= 1:
+            self.ui_surface = None
+            self._draw_components(screen, paused)
+            return
 
+        self.ui_frame = (self.ui_frame + 1) % interval
+        if self.ui_surface is None or self.ui_surface.get_size() != screen.get_size():
+            # 与网格缓存一样以黑色为透明色（colorkey的blit比逐像素alpha混合快得多）
+            self.ui_surface = pygame.Surface(screen.get_size()).convert()
+            self.ui_surface.set_colorkey((0, 0, 0))
+            self.ui_frame = 0
+        if self.ui_frame == 0:
+            self.ui_surface.fill((0, 0, 0))
+            self._draw_components(self.ui_surface, paused)
+        screen.blit(self.ui_surface, (0, 0))
+
+    def _draw_components(self, screen, paused):
+        """把UI组件绘制到指定的surface"""
         # 绘制控制滑块
         self.speed_slider.draw(screen, self.font)
         self.zoom_slider.draw(screen, self.font)
 
+        # 绘制回放时间轴
+        if self.timeline:
+            self.timeline.update(self.player.get_progress(), self.player.get_status_line())
+            self.timeline.draw(screen, self.font)
+
         # 获取能量守恒信息
         energy_drift = self.engine.check_energy_conservation()
 
         # 绘制能量图表
         self.energy_graph.draw(screen, self.font, energy_drift)
 
-        self.draw_pause_overlay(paused)
+        self.draw_pause_overlay(paused, screen)
 
         # 更新并绘制信息文本
         self.info_text_display.update(
-            self.engine, pygame.time.Clock(), CONFIG['initial_speed'],
-            CONFIG['separation'], FIXED_PHYSICS_DT, self.camera_manager.camera
+            self.engine, self.clock or pygame.time.Clock(), CONFIG['initial_speed'],
+            CONFIG['separation'], FIXED_PHYSICS_DT, self.camera_manager.camera, self.step_scheduler
         )
         self.info_text_display.draw(screen, self.font)
 
-    def draw_pause_overlay(self, paused):
+        # 更新并绘制性能分析面板
+        if self.profiler_overlay.visible:
+            from graphics.body_renderer import BodyRenderer
+            from graphics.render_target import RenderTarget
+            status_lines = self.quality_governor.get_status_lines() + [
+                BodyRenderer.get_instance().get_status_line(), RenderTarget.get_instance().get_status_line()]
+            if self.rewind_buffer:
+                status_lines.append(self.rewind_buffer.get_status_line())
+            if self.recorder and self.recorder.is_recording():
+                status_lines.append(self.recorder.get_status_line())
+            self.profiler_overlay.update(self.profiler, self.engine.get_allocation_stats(), status_lines)
+            self.profiler_overlay.draw(screen, self.small_font)
+
+        # 绘制性能采集摘要
+        self.capture_summary.update(self.profile_capture.get_summary_lines())
+        self.capture_summary.draw(screen, self.small_font)
+
+    def draw_pause_overlay(self, paused, screen=None):
         """绘制暂停覆盖层"""
         if paused:
-            screen = ScreenManager.get_instance().screen
+            screen = screen or ScreenManager.get_instance().screen
             try:
                 pause_text = self.font.render("PAUSED", True, (255, 255, 0))  # YELLOW
                 text_rect = pause_text.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2))
@@ -0,0 +1,4 @@
+"""性能分析包
+
+包含帧分阶段计时、性能采集等运行时诊断功能。
+"""
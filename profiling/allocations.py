@@ -0,0 +1,163 @@
+import functools
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+from config.config import CONFIG
+from profiling import tracing
+
+
+class AllocationStats:
+    """物理步分配统计（按步平均）"""
+
+    def __init__(self, steps, step_time, net_blocks, peak_bytes, by_type):
+        self.steps = steps  # 统计的步数
+        self.step_time = step_time  # 平均单步耗时(ms)
+        self.net_blocks = net_blocks  # 单步净增内存块数（sys.getallocatedblocks差值）
+        self.peak_bytes = peak_bytes  # 单步临时分配峰值（tracemalloc峰值差值）
+        self.by_type = by_type  # 单步按类型统计的对象创建次数
+
+    def violations(self, max_peak_bytes=None, max_net_blocks=None, max_by_type=None):
+        """
+        检查是否超出分配预算
+
+        Args:
+            max_peak_bytes: 单步临时分配峰值上限
+            max_net_blocks: 单步净增内存块数上限
+            max_by_type: 类型名 -> 单步创建次数上限
+
+        Returns:
+            list: 超出预算的描述，为空表示满足预算
+        """
+        problems = []
+        if max_peak_bytes is not None and self.peak_bytes > max_peak_bytes:
+            problems.append(f"peak {self.peak_bytes:.0f} B/step > {max_peak_bytes} B/step")
+        if max_net_blocks is not None and self.net_blocks > max_net_blocks:
+            problems.append(f"net {self.net_blocks:.1f} blocks/step > {max_net_blocks} blocks/step")
+        for name, limit in (max_by_type or {}).items():
+            count = self.by_type.get(name, 0.0)
+            if count > limit:
+                problems.append(f"{name} {count:.1f}/step > {limit}/step")
+        return problems
+
+    def assert_within_budget(self, **budget):
+        """超出预算时抛出AssertionError，参数同violations"""
+        problems = self.violations(**budget)
+        if problems:
+            raise AssertionError(f"allocation budget exceeded over {self.steps} steps: " + '; '.join(problems))
+
+    def __str__(self):
+        types = ' '.join(f"{name}={count:.1f}" for name, count in sorted(self.by_type.items()))
+        return (f"AllocationStats(steps={self.steps}, step={self.step_time:.3f}ms, "
+                f"peak={self.peak_bytes:.0f}B, net={self.net_blocks:+.1f} blocks, {types})")
+
+
+class AllocationTracker:
+    """分配跟踪器，统计每个物理步的内存分配
+
+    临时分配量来自tracemalloc峰值，净增量来自sys.getallocatedblocks；按类型的对象创建次数
+    通过在跟踪期间临时包装被跟踪类的__init__获得，关闭跟踪后恢复原状，不影响正常运行的性能。
+    """
+
+    def __init__(self, tracked_types=(), window=None):
+        self.window = window or CONFIG['profiler_window']
+        self.records = deque(maxlen=self.window)  # (耗时ms, 净增块数, 峰值字节, 类型计数)
+        self._counts = {}
+        self._tracked = {}  # 类 -> 原始__init__（None表示继承而来）
+        self.active = False
+        self.tracked_types = tuple(tracked_types)
+
+    def start(self):
+        """开始跟踪：启动tracemalloc并包装被跟踪类"""
+        if self.active:
+            return
+        for cls in self.tracked_types:
+            self._wrap_type(cls)
+        self._ensure_tracing()
+        self.active = True
+
+    def stop(self):
+        """停止跟踪并恢复被包装的类"""
+        if not self.active:
+            return
+        for cls, original in self._tracked.items():
+            if original is None:
+                del cls.__init__
+            else:
+                cls.__init__ = original
+        self._tracked.clear()
+        # 快照采集仍在进行时tracemalloc保持开启
+        tracing.release(self)
+        self.active = False
+
+    def _ensure_tracing(self):
+        """确保tracemalloc处于开启状态（可能在跟踪期间被外部关闭）"""
+        tracing.acquire(self)
+
+    def _wrap_type(self, cls):
+        """包装类的__init__以统计创建次数"""
+        original = cls.__dict__.get('__init__')
+        init = cls.__init__
+        counts = self._counts
+        name = cls.__name__
+
+        @functools.wraps(init)
+        def counting_init(instance, *args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            init(instance, *args, **kwargs)
+
+        self._tracked[cls] = original
+        cls.__init__ = counting_init
+
+    def measure(self, step, *args):
+        """
+        执行并测量一个物理步
+
+        Args:
+            step: 物理步函数
+            *args: 传给step的参数
+
+        Returns:
+            step的返回值
+        """
+        self._ensure_tracing()
+        self._counts.clear()
+        tracemalloc.reset_peak()
+        traced_before, _ = tracemalloc.get_traced_memory()
+        blocks_before = sys.getallocatedblocks()
+        start = time.perf_counter()
+
+        result = step(*args)
+
+        elapsed = (time.perf_counter() - start) * 1000.0
+        blocks_after = sys.getallocatedblocks()
+        _, peak = tracemalloc.get_traced_memory()
+        self.records.append((elapsed, blocks_after - blocks_before, peak - traced_before, dict(self._counts)))
+        return result
+
+    def summary(self):
+        """
+        汇总滚动窗口内的统计
+
+        Returns:
+            AllocationStats: 按步平均的分配统计，无数据时返回None
+        """
+        steps = len(self.records)
+        if steps == 0:
+            return None
+        by_type = {cls.__name__: 0.0 for cls in self.tracked_types}
+        for _, _, _, counts in self.records:
+            for name, count in counts.items():
+                by_type[name] = by_type.get(name, 0.0) + count
+        return AllocationStats(
+            steps=steps,
+            step_time=sum(record[0] for record in self.records) / steps,
+            net_blocks=sum(record[1] for record in self.records) / steps,
+            peak_bytes=sum(record[2] for record in self.records) / steps,
+            by_type={name: count / steps for name, count in by_type.items()},
+        )
+
+    def reset(self):
+        """清空统计数据"""
+        self.records.clear()
@@ -0,0 +1,204 @@
+import os
+import time
+
+from config.config import CONFIG
+
+
+class ProfileCapture:
+    """性能采集单例类，按帧数范围采集cProfile调用统计与tracemalloc内存快照差异
+
+    cProfile、pstats与tracemalloc在首次采集时才导入（pstats冷启动导入约20~30ms），避免拖慢程序启动。
+    """
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ProfileCapture, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # 单例模式，避免重复初始化
+        if ProfileCapture._initialized:
+            return
+
+        self.frames = CONFIG['profile_capture_frames']  # 每次采集的帧数
+        self.output_dir = CONFIG['profiler_output_dir']
+        self.top_n = CONFIG['profile_summary_lines']  # 屏幕摘要显示的条目数
+
+        # cProfile采集状态
+        self._profiler = None
+        self._profile_frames = 0
+
+        # tracemalloc采集状态
+        self._snapshot = None
+        self._trace_frames = 0
+
+        # 最近一次采集结果的摘要，键为采集类型，值为(摘要行, 生成时间)
+        self.summaries = {}
+
+        ProfileCapture._initialized = True
+
+    @classmethod
+    def get_instance(cls):
+        """获取ProfileCapture单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def is_profiling(self):
+        """是否正在采集cProfile"""
+        return self._profiler is not None
+
+    def is_tracing(self):
+        """是否正在采集tracemalloc"""
+        return self._snapshot is not None
+
+    def _output_path(self, prefix, extension):
+        """生成带时间戳的输出路径"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
+        return os.path.join(self.output_dir, f"{prefix}_{timestamp}.{extension}")
+
+    def _set_summary(self, kind, lines):
+        """设置某类采集的屏幕摘要"""
+        self.summaries[kind] = (lines, time.monotonic())
+
+    def toggle_cprofile(self):
+        """开始或提前结束cProfile采集"""
+        if self.is_profiling():
+            self.stop_cprofile()
+        else:
+            self.start_cprofile()
+
+    def start_cprofile(self):
+        """开始cProfile采集"""
+        import cProfile
+        self._profile_frames = 0
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop_cprofile(self):
+        """
+        结束cProfile采集并写出结果
+
+        Returns:
+            str: 写出的.prof文件路径
+        """
+        if not self.is_profiling():
+            return None
+        import pstats
+        profiler = self._profiler
+        profiler.disable()
+        self._profiler = None
+        frames = max(1, self._profile_frames)
+
+        path = self._output_path('cprofile', 'prof')
+        profiler.dump_stats(path)
+        stats = pstats.Stats(profiler)
+        with open(os.path.splitext(path)[0] + '.txt', 'w') as f:
+            stats.stream = f
+            stats.sort_stats('tottime').print_stats(50)
+
+        # 按自身耗时排序，附带每帧调用次数（例如每帧创建了多少Vector2D）
+        entries = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        lines = [f"cProfile: {frames} frames -> {path}"]
+        for (filename, line, function), (_, calls, total_time, _, _) in entries[:self.top_n]:
+            location = f"{os.path.basename(filename)}:{line}" if line else filename
+            lines.append(f"  {total_time / frames * 1000:7.3f}ms/frame {calls / frames:9.1f} calls/frame  "
+                         f"{function} ({location})")
+        self._set_summary('cprofile', lines)
+        print('\n'.join(lines))
+        return path
+
+    def toggle_tracemalloc(self):
+        """开始或提前结束tracemalloc采集"""
+        if self.is_tracing():
+            self.stop_tracemalloc()
+        else:
+            self.start_tracemalloc()
+
+    def start_tracemalloc(self):
+        """开始tracemalloc采集并记录起始快照"""
+        import tracemalloc
+        from profiling import tracing
+        tracing.acquire(self, CONFIG['tracemalloc_frames'])
+        self._trace_frames = 0
+        self._snapshot = tracemalloc.take_snapshot()
+
+    def stop_tracemalloc(self):
+        """
+        记录结束快照，与起始快照对比并写出结果
+
+        Returns:
+            str: 写出的文本文件路径
+        """
+        if not self.is_tracing():
+            return None
+        import cProfile
+        import pstats
+        import tracemalloc
+        from profiling import tracing
+        if not tracemalloc.is_tracing():
+            # tracemalloc在采集期间被外部关闭，无法取得结束快照
+            self._snapshot = None
+            tracing.release(self)
+            print("tracemalloc capture aborted: tracing was stopped during the capture")
+            return None
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            # 同时进行cProfile采集时，排除其自身的开销
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, pstats.__file__),
+        ]
+        snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+        differences = snapshot.compare_to(self._snapshot.filter_traces(filters), 'lineno')
+        self._snapshot = None
+        tracing.release(self)
+        frames = max(1, self._trace_frames)
+
+        path = self._output_path('tracemalloc', 'txt')
+        with open(path, 'w') as f:
+            f.write(f"tracemalloc snapshot diff over {frames} frames\n")
+            for difference in differences[:100]:
+                f.write(f"{difference}\n")
+
+        lines = [f"tracemalloc: {frames} frames -> {path}"]
+        for difference in differences[:self.top_n]:
+            frame = difference.traceback[0]
+            lines.append(f"  {difference.size_diff / frames:+9.1f} B/frame {difference.count_diff / frames:+8.2f} "
+                         f"blocks/frame  {os.path.basename(frame.filename)}:{frame.lineno}")
+        self._set_summary('tracemalloc', lines)
+        print('\n'.join(lines))
+        return path
+
+    def on_frame(self):
+        """每帧结束时调用，采集满指定帧数后自动结束"""
+        if self.is_profiling():
+            self._profile_frames += 1
+            if self._profile_frames >= self.frames:
+                self.stop_cprofile()
+        if self.is_tracing():
+            self._trace_frames += 1
+            if self._trace_frames >= self.frames:
+                self.stop_tracemalloc()
+
+    def get_summary_lines(self):
+        """
+        获取需要在屏幕上显示的摘要
+
+        Returns:
+            list: 采集进行中时为进度，结束后一段时间内为结果摘要
+        """
+        lines = []
+        if self.is_profiling():
+            lines.append(f"cProfile: recording {self._profile_frames}/{self.frames} frames")
+        if self.is_tracing():
+            lines.append(f"tracemalloc: recording {self._trace_frames}/{self.frames} frames")
+        now = time.monotonic()
+        for summary, created in self.summaries.values():
+            if now - created < CONFIG['profile_summary_seconds']:
+                lines.extend(summary)
+        return lines
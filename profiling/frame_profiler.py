@@ -0,0 +1,199 @@
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config.config import CONFIG
+
+
+class FrameProfiler:
+    """帧分析器单例类，记录主循环各阶段耗时并提供滚动百分位统计"""
+
+    # 主循环的阶段划分（按执行顺序）
+    PHASES = ('events', 'physics', 'camera', 'grid', 'bodies', 'scale', 'ui', 'flip')
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(FrameProfiler, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # 单例模式，避免重复初始化
+        if FrameProfiler._initialized:
+            return
+
+        self.enabled = True
+        self.window = CONFIG['profiler_window']  # 滚动窗口大小（帧数）
+        self.output_dir = CONFIG['profiler_output_dir']
+
+        # 滚动历史数据（毫秒）
+        self.frame_times = deque(maxlen=self.window)  # 每帧工作耗时
+        self.frame_intervals = deque(maxlen=self.window)  # 相邻两帧的实际间隔
+        self.phase_times = {phase: deque(maxlen=self.window) for phase in self.PHASES}
+        self.physics_steps = deque(maxlen=self.window)  # 每帧物理步数
+
+        # 当前帧的临时数据
+        self._current = {}
+        self._phase_start = {}
+        self._frame_start = None
+        self._frame_steps = 0
+        self.frame_count = 0
+
+        FrameProfiler._initialized = True
+
+    @classmethod
+    def get_instance(cls):
+        """获取FrameProfiler单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def begin_frame(self, frame_dt=None):
+        """
+        开始记录一帧
+
+        Args:
+            frame_dt: 距上一帧的实际间隔（秒），通常来自clock.tick
+        """
+        if not self.enabled:
+            return
+        self._current = {phase: 0.0 for phase in self.PHASES}
+        self._frame_steps = 0
+        if frame_dt is not None:
+            self.frame_intervals.append(frame_dt * 1000.0)
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """结束当前帧并写入滚动历史"""
+        if not self.enabled or self._frame_start is None:
+            return
+        self.frame_times.append((time.perf_counter() - self._frame_start) * 1000.0)
+        for phase in self.PHASES:
+            self.phase_times[phase].append(self._current.get(phase, 0.0))
+        self.physics_steps.append(self._frame_steps)
+        self._frame_start = None
+        self.frame_count += 1
+
+    def start_phase(self, name):
+        """开始计时一个阶段"""
+        if self.enabled:
+            self._phase_start[name] = time.perf_counter()
+
+    def end_phase(self, name):
+        """结束计时一个阶段，同一帧内多次计时会累加"""
+        if not self.enabled:
+            return
+        start = self._phase_start.pop(name, None)
+        if start is not None:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            self._current[name] = self._current.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def phase(self, name):
+        """阶段计时上下文管理器"""
+        self.start_phase(name)
+        try:
+            yield
+        finally:
+            self.end_phase(name)
+
+    def add_physics_steps(self, steps):
+        """记录本帧执行的物理步数"""
+        self._frame_steps += steps
+
+    @staticmethod
+    def percentiles(values, qs=(50, 95, 99)):
+        """
+        计算百分位数（最近秩法）
+
+        Args:
+            values: 数值序列
+            qs: 百分位列表
+
+        Returns:
+            tuple: 与qs对应的百分位值，无数据时全部为0
+        """
+        if not values:
+            return tuple(0.0 for _ in qs)
+        ordered = sorted(values)
+        last = len(ordered) - 1
+        return tuple(ordered[min(last, int(round(q / 100.0 * last)))] for q in qs)
+
+    def get_summary(self):
+        """
+        获取各阶段的p50/p95/p99统计
+
+        Returns:
+            dict: 阶段名 -> (p50, p95, p99)，包含'frame'总耗时与'steps'物理步数
+        """
+        summary = {phase: self.percentiles(self.phase_times[phase]) for phase in self.PHASES}
+        summary['frame'] = self.percentiles(self.frame_times)
+        summary['steps'] = self.percentiles(self.physics_steps)
+        return summary
+
+    def get_fps(self):
+        """根据最近的帧间隔计算平均帧率"""
+        if not self.frame_intervals:
+            return 0.0
+        average = sum(self.frame_intervals) / len(self.frame_intervals)
+        return 1000.0 / average if average > 0 else 0.0
+
+    def histogram(self, bins=None, max_ms=None):
+        """
+        计算帧耗时直方图
+
+        Args:
+            bins: 分桶数量
+            max_ms: 最大统计范围（毫秒），超出部分计入最后一个桶
+
+        Returns:
+            list: 每个桶的帧数
+        """
+        bins = bins or CONFIG['profiler_histogram_bins']
+        max_ms = max_ms or CONFIG['profiler_histogram_max_ms']
+        counts = [0] * bins
+        bin_width = max_ms / bins
+        for frame_time in self.frame_times:
+            index = min(bins - 1, int(frame_time / bin_width))
+            counts[index] += 1
+        return counts
+
+    def export_csv(self, path=None):
+        """
+        导出滚动窗口内的逐帧数据为CSV
+
+        Args:
+            path: 输出路径，默认写入输出目录下带时间戳的文件
+
+        Returns:
+            str: 实际写入的文件路径
+        """
+        import csv
+
+        if path is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            timestamp = time.strftime('%Y%m%d_%H%M%S')
+            path = os.path.join(self.output_dir, f"frame_profile_{timestamp}.csv")
+
+        first_frame = self.frame_count - len(self.frame_times)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'frame_ms'] + [f"{phase}_ms" for phase in self.PHASES] + ['physics_steps'])
+            for i, frame_time in enumerate(self.frame_times):
+                row = [first_frame + i, f"{frame_time:.4f}"]
+                row += [f"{self.phase_times[phase][i]:.4f}" for phase in self.PHASES]
+                row.append(self.physics_steps[i])
+                writer.writerow(row)
+        return path
+
+    def reset(self):
+        """清空所有统计数据"""
+        self.frame_times.clear()
+        self.frame_intervals.clear()
+        for times in self.phase_times.values():
+            times.clear()
+        self.physics_steps.clear()
+        self.frame_count = 0
@@ -0,0 +1,34 @@
+"""tracemalloc共享开启模块
+
+物理步分配跟踪（F7）与tracemalloc快照采集（F6）都需要tracemalloc处于开启状态，两者可以任意交错开关。
+每个使用者开启时登记、结束时注销，只有在最后一个使用者注销、且tracemalloc是由这里开启的情况下才关闭它。
+"""
+import tracemalloc
+
+_owners = set()  # 当前依赖tracemalloc的使用者
+_started = False  # tracemalloc是否由这里开启（启动参数-X tracemalloc等外部开启的不关闭）
+
+
+def acquire(owner, frames=1):
+    """
+    登记使用者，tracemalloc未开启时开启（重复登记无副作用）
+
+    Args:
+        owner: 使用者对象
+        frames: 开启时每条分配记录保存的调用栈帧数
+    """
+    global _started
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        _started = True
+    _owners.add(owner)
+
+
+def release(owner):
+    """注销使用者，没有其他使用者时关闭由这里开启的tracemalloc（重复注销无副作用）"""
+    global _started
+    _owners.discard(owner)
+    if not _owners and _started:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        _started = False
@@ -0,0 +1,4 @@
+"""轨迹录制包
+
+包含轨迹文件格式、后台写入的轨迹录制器等运行记录相关功能。
+"""
@@ -0,0 +1,296 @@
+"""轨迹录制模块
+
+主循环在物理推进后调用TrajectoryRecorder.on_physics：按抽样间隔复制当前的位置与速度，放入队列后立即返回；
+后台写入线程从队列取出帧，写入按块扩展的内存映射文件。队列满（磁盘跟不上）时丢弃该帧并计数，
+物理循环从不等待磁盘。
+"""
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from config.config import CONFIG
+from recording.trajectory import (HEADER_SIZE, KEYFRAME_DTYPE, pack_header, record_dtype, static_layout)
+
+
+class TrajectoryWriter:
+    """轨迹文件写入器（只在写入线程中使用）：写入文件头与静态数组，帧记录按块映射写入，结束时写入关键帧索引"""
+
+    def __init__(self, path, masses, radii, colors, itemsize, decimation, dt):
+        """
+        Args:
+            path: 输出路径
+            masses, radii: (N,) 静态数组
+            colors: (N, 3) uint8颜色
+            itemsize: 位置与速度的字节数（4或8）
+            decimation: 最小抽样间隔（步）
+            dt: 物理步长
+        """
+        self.path = path
+        self.count = len(masses)
+        self.dtype = record_dtype(self.count, itemsize)
+        self.chunk_frames = max(1, CONFIG['recording_chunk_bytes'] // self.dtype.itemsize)
+        self.keyframe_interval = CONFIG['recording_keyframe_interval']
+        self.static_offset = HEADER_SIZE
+        *offsets, static_size = static_layout(self.count)
+        self.frames_offset = self.static_offset + static_size
+        self.header = {'count': self.count, 'itemsize': itemsize, 'decimation': decimation, 'dt': dt,
+                       'frames': 0, 'chunk_frames': self.chunk_frames, 'keyframe_interval': self.keyframe_interval,
+                       'static_offset': self.static_offset, 'frames_offset': self.frames_offset,
+                       'index_offset': 0, 'keyframes': 0, 'step_spacing': 0.0}
+
+        self.file = open(path, 'wb+')
+        self.file.write(pack_header(**self.header))
+        static = bytearray(static_size)
+        for offset, array in zip(offsets, (np.asarray(masses, dtype='<f8'), np.asarray(radii, dtype='<f8'),
+                                           np.asarray(colors, dtype=np.uint8))):
+            data = array.tobytes()
+            static[offset:offset + len(data)] = data
+        self.file.write(static)
+        self.file.flush()
+
+        self.frames = 0
+        self.keyframes = []  # (帧序号, 累计步数, 时间)
+        # 相邻帧记录之间的步数累计（写入文件头的实际平均间隔，重置处不计入）
+        self._last_step = None
+        self._spacing_steps = 0
+        self._spacing_records = 0
+        self._chunk = None  # 当前块的映射
+        self._chunk_start = 0
+
+    def _map_chunk(self):
+        """扩展文件并映射下一个块"""
+        self._chunk_start = self.frames
+        end = self.frames_offset + (self.frames + self.chunk_frames) * self.dtype.itemsize
+        self.file.truncate(end)
+        self._chunk = np.memmap(self.file, dtype=self.dtype, mode='r+',
+                                offset=self.frames_offset + self.frames * self.dtype.itemsize,
+                                shape=(self.chunk_frames,))
+
+    def _flush_chunk(self):
+        """把当前块写回磁盘并更新文件头"""
+        if self._chunk is None:
+            return
+        self._chunk.flush()
+        self._chunk = None
+        self._write_header()
+
+    def _write_header(self):
+        """在文件头记录已写入的帧数与实际平均记录间隔"""
+        self.header['frames'] = self.frames
+        if self._spacing_records:
+            self.header['step_spacing'] = self._spacing_steps / self._spacing_records
+        self.file.seek(0)
+        self.file.write(pack_header(**self.header))
+        self.file.flush()
+
+    def write(self, sim_time, step, positions, velocities, keyframe):
+        """
+        写入一帧
+
+        Args:
+            sim_time: 模拟时间
+            step: 累计步数
+            positions, velocities: (N, 2) 状态
+            keyframe: 是否为关键帧（状态不连续处）
+        """
+        if self._chunk is None:
+            self._map_chunk()
+        record = self._chunk[self.frames - self._chunk_start]
+        record['time'] = sim_time
+        record['step'] = step
+        record['positions'] = positions
+        record['velocities'] = velocities
+        if keyframe or self.frames % self.keyframe_interval == 0:
+            self.keyframes.append((self.frames, step, sim_time))
+        if self._last_step is not None and step > self._last_step:
+            self._spacing_steps += step - self._last_step
+            self._spacing_records += 1
+        self._last_step = step
+        self.frames += 1
+        if self.frames - self._chunk_start == self.chunk_frames:
+            self._flush_chunk()
+        else:
+            # 每帧更新文件头的帧数（只写128字节），录制中断时已写入的帧都可读
+            self._write_header()
+
+    def close(self):
+        """截掉最后一块未使用的部分，写入关键帧索引并更新文件头"""
+        self._flush_chunk()
+        index_offset = self.frames_offset + self.frames * self.dtype.itemsize
+        self.file.truncate(index_offset)
+        self.file.seek(index_offset)
+        self.file.write(np.array(self.keyframes, dtype=KEYFRAME_DTYPE).tobytes())
+        self.header['index_offset'] = index_offset
+        self.header['keyframes'] = len(self.keyframes)
+        self._write_header()
+        self.file.close()
+
+
+class TrajectoryRecorder:
+    """轨迹录制器单例类，把引擎状态按抽样间隔流式写入轨迹文件（格式见recording.trajectory）
+
+    录制在每帧物理推进之后进行，每帧最多记录一次：抽样间隔是记录之间的最小步数，一帧执行的步数更多时
+    （模拟速度大于1）实际间隔等于该帧的步数。实际的平均间隔写入文件头，回放按帧记录的时间定位。
+    """
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(TrajectoryRecorder, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # 单例模式，避免重复初始化
+        if TrajectoryRecorder._initialized:
+            return
+
+        self.output_dir = CONFIG['recording_output_dir']
+        self.decimation = max(1, CONFIG['recording_decimation'])
+        self.path = None  # 正在录制的文件，None表示未录制
+        self.last_path = None  # 最近一次录制完成的文件
+        self.frames = 0  # 已放入队列的帧数
+        self.dropped = 0  # 队列满时丢弃的帧数
+        self._queue = None
+        self._thread = None
+        self._size = 0  # 录制开始时的槽位数
+        self._next_step = 0  # 下一次记录的累计步数
+        self._last_step = None
+        self.error = None  # 写入线程遇到的错误
+
+        TrajectoryRecorder._initialized = True
+
+    @classmethod
+    def get_instance(cls):
+        """获取TrajectoryRecorder单例实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def is_recording(self):
+        """是否正在录制"""
+        return self.path is not None
+
+    def _output_path(self):
+        """生成带时间戳的输出路径"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
+        return os.path.join(self.output_dir, f"trajectory_{timestamp}.traj")
+
+    def toggle(self, engine):
+        """开始或结束录制"""
+        if self.is_recording():
+            self.stop()
+        else:
+            self.start(engine)
+
+    def start(self, engine, path=None):
+        """
+        开始录制（立即记录当前状态作为第一帧）
+
+        Args:
+            engine: PhysicsEngine
+            path: 输出路径，默认在recording_output_dir下按时间戳命名
+
+        Raises:
+            OSError: 无法创建文件
+        """
+        if self.is_recording():
+            return
+        bodies = engine.bodies
+        path = path or self._output_path()
+        writer = TrajectoryWriter(path, bodies.masses, bodies.radii, bodies.get_colors(np.arange(bodies.size)),
+                                  bodies.positions.dtype.itemsize, self.decimation, engine.last_dt)
+        self.path = path
+        self.frames = 0
+        self.dropped = 0
+        self.error = None
+        self._size = bodies.size
+        # 队列按字节预算限制长度，质点很多时也不会占用过多内存
+        frame_bytes = bodies.positions.nbytes + bodies.velocities.nbytes
+        self._queue = queue.Queue(maxsize=max(2, CONFIG['recording_queue_bytes'] // frame_bytes))
+        self._thread = threading.Thread(target=self._write_loop, args=(writer, self._queue), name='trajectory-writer',
+                                        daemon=True)
+        self._thread.start()
+        self._last_step = None
+        self._record(engine, keyframe=True)
+        print(f"Recording trajectory to {path}")
+
+    def stop(self):
+        """结束录制：等待写入线程写完队列中的帧并写入关键帧索引"""
+        if not self.is_recording():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self.last_path = self.path
+        if self.error is not None:
+            print(f"Error writing trajectory: {self.error}")
+        else:
+            print(f"Trajectory saved to {self.path} ({self.frames} frames, {self.dropped} dropped)")
+        self.path = None
+        self._queue = None
+        self._thread = None
+
+    def on_physics(self, engine):
+        """
+        物理推进后调用：距上次记录至少decimation步时记录当前状态（一帧中间的步不记录）
+
+        Args:
+            engine: PhysicsEngine
+        """
+        if not self.is_recording():
+            return
+        if self.error is not None or engine.bodies.size != self._size:
+            # 写入失败或质点数变化（帧记录是定长的）时结束录制
+            if self.error is None:
+                print("Body count changed, stopping trajectory recording")
+            self.stop()
+            return
+        step = engine.step_count
+        if step < self._last_step:
+            # 状态被重置，从新的起点重新计算抽样点
+            self._record(engine, keyframe=True)
+        elif step >= self._next_step:
+            self._record(engine, keyframe=False)
+
+    def _record(self, engine, keyframe):
+        """复制当前状态放入写入队列（队列满时丢弃）"""
+        bodies = engine.bodies
+        step = engine.step_count
+        self._last_step = step
+        self._next_step = step + self.decimation
+        try:
+            self._queue.put_nowait((engine.sim_time, step, bodies.positions.copy(), bodies.velocities.copy(),
+                                    keyframe))
+            self.frames += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self, writer, frames):
+        """写入线程：逐帧写入直到收到None"""
+        try:
+            while True:
+                frame = frames.get()
+                if frame is None:
+                    break
+                writer.write(*frame)
+        except (OSError, ValueError) as e:
+            self.error = e
+            # 继续取出剩余的帧，避免主线程在stop时等待
+            while frames.get() is not None:
+                pass
+        finally:
+            try:
+                writer.close()
+            except (OSError, ValueError) as e:
+                self.error = self.error or e
+
+    def get_status_line(self):
+        """性能面板显示的录制状态，未录制时返回None"""
+        if not self.is_recording():
+            return None
+        return f"recording: {self.frames} frames (>= {self.decimation} steps apart), {self.dropped} dropped"
@@ -0,0 +1,182 @@
+"""轨迹回放模块
+
+TrajectoryPlayer把轨迹文件（见recording.trajectory）中的帧复制到物理引擎的状态数组中，之后的摄像头、
+质点绘制与能量图表沿用实时模拟的路径，回放期间不运行物理。帧记录是定长的并以内存映射方式打开，
+跳转到任意帧只需读取这一条记录（按时间跳转先在关键帧索引上二分），与录制时长无关。
+帧之间的步数不固定（每个渲染帧最多录制一次），因此播放按模拟时间推进游标，再按帧记录的时间查找对应的帧。
+逐帧前进时像实时模拟一样追加轨迹点；跳转、倒放或一帧前进多帧时，从文件中截取当前帧之前的一个窗口重建轨迹。
+"""
+import numpy as np
+
+from config.config import CONFIG
+from recording.trajectory import open_trajectory
+
+# 轨迹文件状态字节数对应的引擎精度
+PRECISION_BY_ITEMSIZE = {4: 'float32', 8: 'float64'}
+
+
+class TrajectoryPlayer:
+    """轨迹回放器：按播放速度和方向在回放时间轴上移动游标，把游标处的帧写入引擎状态"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: .traj文件路径
+
+        Raises:
+            OSError: 无法打开文件
+            ValueError: 文件格式不正确或没有帧
+        """
+        self.trajectory = open_trajectory(path)
+        self.path = path
+        self.engine = None
+        # 回放时间轴上的游标（模拟秒，重置前后的各段首尾相接；与实时模拟相同，每帧推进frame_dt * speed）
+        self.cursor = 0.0
+        self.frame = None  # 当前显示的帧
+        self.direction = 1  # 1正放，-1倒放
+
+    @property
+    def frames(self):
+        """总帧数"""
+        return len(self.trajectory)
+
+    def load(self, engine):
+        """
+        把轨迹的静态数组与第一帧载入引擎（状态数组是副本，映射文件保持只读）
+
+        Args:
+            engine: PhysicsEngine
+        """
+        trajectory = self.trajectory
+        self.engine = engine
+        engine.set_precision(PRECISION_BY_ITEMSIZE[trajectory.header['itemsize']])
+        engine.load_arrays(np.array(trajectory.positions[0]), np.array(trajectory.velocities[0]),
+                           np.array(trajectory.masses), np.array(trajectory.radii), np.array(trajectory.colors))
+        engine.last_dt = trajectory.dt
+        self.frame = None
+        self.seek(0)
+
+    def toggle_direction(self):
+        """切换正放与倒放"""
+        self.direction = -self.direction
+
+    def update(self, frame_dt, speed, paused):
+        """
+        按帧时间推进游标并显示对应的帧（到达首尾时停在该帧）
+
+        Args:
+            frame_dt: 帧时间增量（秒）
+            speed: 播放速度倍率（与模拟速度相同）
+            paused: 是否暂停
+
+        Returns:
+            int: 本次移动的帧数（0表示画面状态没有变化）
+        """
+        if paused:
+            return 0
+        trajectory = self.trajectory
+        self.cursor += self.direction * speed * frame_dt
+        self.cursor = min(max(self.cursor, 0.0), trajectory.playback_duration)
+        return self._show(trajectory.frame_at_playback(self.cursor))
+
+    def seek(self, frame):
+        """
+        跳转到指定帧（游标移到该帧的时间）
+
+        Returns:
+            int: 移动的帧数
+        """
+        frame = min(max(int(frame), 0), self.frames - 1)
+        self.cursor = self.trajectory.playback_position(frame)
+        return self._show(frame)
+
+    def seek_position(self, position):
+        """跳转到回放时间轴上的位置（模拟秒）"""
+        trajectory = self.trajectory
+        self.cursor = min(max(position, 0.0), trajectory.playback_duration)
+        return self._show(trajectory.frame_at_playback(self.cursor))
+
+    def seek_fraction(self, fraction):
+        """跳转到时间轴上的相对位置（0-1）"""
+        if self.trajectory.playback_duration <= 0:
+            return self.seek(round(fraction * (self.frames - 1)))
+        return self.seek_position(fraction * self.trajectory.playback_duration)
+
+    def seek_time(self, time):
+        """跳转到不晚于给定模拟时间的最后一帧（见TrajectoryFile.frame_at）"""
+        return self.seek(self.trajectory.frame_at(time))
+
+    def step(self, frames):
+        """相对当前帧前进（负数为后退）指定帧数"""
+        return self.seek((self.frame or 0) + frames)
+
+    def jump(self, fraction):
+        """相对当前位置前进（负数为后退）回放时长的指定比例（至少移动一帧）"""
+        moved = self.seek_position(self.cursor + fraction * self.trajectory.playback_duration)
+        return moved or self.step(1 if fraction > 0 else -1)
+
+    def get_progress(self):
+        """当前帧在时间轴上的相对位置（0-1）"""
+        duration = self.trajectory.playback_duration
+        if duration > 0:
+            return self.trajectory.playback_position(self.frame) / duration
+        return self.frame / (self.frames - 1) if self.frames > 1 else 0.0
+
+    def get_status_line(self):
+        """时间轴上方显示的回放状态"""
+        trajectory = self.trajectory
+        direction = "Forward" if self.direction > 0 else "Reverse"
+        return (f"Replay {self.frame + 1}/{self.frames}  t={float(trajectory.times[self.frame]):.2f}"
+                f"/{float(trajectory.times[-1]):.2f}  {direction}  "
+                f"(B=Reverse, ,/.=Step, PgUp/PgDn=Jump, click timeline to seek)")
+
+    def _show(self, frame):
+        """把指定帧写入引擎状态，返回移动的帧数"""
+        previous = self.frame
+        if frame == previous:
+            return 0
+        trajectory = self.trajectory
+        engine = self.engine
+        bodies = engine.bodies
+        np.copyto(bodies.positions, trajectory.positions[frame], casting='unsafe')
+        np.copyto(bodies.velocities, trajectory.velocities[frame], casting='unsafe')
+        engine.step_count = int(trajectory.steps[frame])
+        engine.sim_time = float(trajectory.times[frame])
+        self.frame = frame
+
+        if previous is not None and frame == previous + 1 and trajectory.steps[frame] >= trajectory.steps[previous]:
+            # 连续前进一帧：与物理子进程同步时相同，追加轨迹点并更新质心
+            engine.on_state_updated()
+        else:
+            self._rebuild_history(frame)
+        return abs(frame - previous) if previous is not None else 1
+
+    def _window_start(self, frame, length):
+        """以frame结尾、最长length帧且不跨越重置点（累计步数回退处）的窗口起点"""
+        start = max(0, frame - length + 1)
+        steps = self.trajectory.steps[start:frame + 1]
+        resets = np.flatnonzero(np.diff(steps.astype(np.int64)) < 0)
+        return start + int(resets[-1]) + 1 if len(resets) else start
+
+    def _rebuild_history(self, frame):
+        """跳转后从当前帧之前的窗口切片重建质点轨迹与质心轨迹（只读取窗口内的记录，能量基准保持不变）"""
+        engine = self.engine
+        bodies = engine.bodies
+        positions = self.trajectory.positions
+
+        trail_bodies = min(len(bodies.trail_lengths), self.trajectory.count)
+        start = self._window_start(frame, bodies.max_trail)
+        # 当前帧由on_state_updated追加，窗口只包含之前的帧
+        bodies.load_trails(positions[start:frame, :trail_bodies])
+
+        # 质心轨迹需要读取窗口内所有质点的位置，按读取预算缩短窗口（之后逐帧前进时再增长）
+        centroid = engine.centroid
+        length = min(centroid.trail_length, max(1, CONFIG['replay_centroid_budget'] // self.trajectory.count))
+        start = max(start, frame - length + 1)
+        masses = bodies.masses
+        total_mass = float(masses.sum())
+        centroid.trail = []
+        if centroid.is_show and total_mass > 0:
+            # 逐帧计算（每次只读取一帧的位置，不创建窗口大小的临时数组）
+            centroid.trail = [tuple((masses @ positions[i] / total_mass).tolist()) for i in range(start, frame)]
+        engine.on_state_updated()
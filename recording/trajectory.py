@@ -0,0 +1,243 @@
+"""轨迹文件格式模块
+
+轨迹文件（.traj）是小端序的二进制文件，布局为：
+
+    文件头（HEADER_SIZE字节，见HEADER）
+    静态数组：质量(N,) float64、半径(N,) float64、颜色(N, 3) uint8（按8字节对齐）
+    帧记录：每帧一条定长记录（时间、累计步数、位置(N, 2)、速度(N, 2)），见record_dtype
+    关键帧索引：(帧序号, 累计步数, 时间)数组，录制结束时写入
+
+帧记录是定长的，因此整个帧区可以用np.memmap直接映射为结构化数组，positions等字段是映射文件上的
+跨步视图，分析时不发生复制。关键帧索引是紧凑的时间索引：按时间定位帧时只需在索引上二分查找，
+不必读取所有帧记录的时间字段；状态不连续处（如重置）也是关键帧。
+录制过程中每写入一帧就更新文件头的帧数，录制中断时已写入的帧仍然可读（没有索引时按间隔重建）。
+
+每个渲染帧最多记录一帧，抽样间隔只是记录之间的最小步数：模拟速度大于1时一帧执行多步，实际间隔更大。
+因此回放按帧记录的时间定位，文件头另外保存实际的平均记录间隔。
+"""
+import struct
+
+import numpy as np
+
+MAGIC = b'NBODYTRJ'
+VERSION = 1
+HEADER_SIZE = 128
+# 魔数、版本、文件头大小、质点数、状态字节数（4或8）、最小抽样间隔（步）、物理步长、帧数、块大小（帧）、
+# 关键帧间隔（帧）、静态数组偏移、帧区偏移、索引偏移（0表示尚未写入）、关键帧数、实际平均记录间隔（步）
+HEADER = struct.Struct('<8sIIQIIdQIIQQQQd')
+HEADER_FIELDS = ('magic', 'version', 'header_size', 'count', 'itemsize', 'decimation', 'dt', 'frames',
+                 'chunk_frames', 'keyframe_interval', 'static_offset', 'frames_offset', 'index_offset',
+                 'keyframes', 'step_spacing')
+KEYFRAME_DTYPE = np.dtype([('frame', '<u8'), ('step', '<u8'), ('time', '<f8')])
+STATE_DTYPES = {4: np.dtype('<f4'), 8: np.dtype('<f8')}
+
+
+def record_dtype(count, itemsize):
+    """
+    帧记录的结构化类型
+
+    Args:
+        count: 质点数
+        itemsize: 位置与速度的字节数（4或8）
+    """
+    state = STATE_DTYPES[itemsize]
+    return np.dtype([('time', '<f8'), ('step', '<u8'), ('positions', state, (count, 2)),
+                     ('velocities', state, (count, 2))])
+
+
+def _align(offset):
+    """按8字节对齐"""
+    return -(-offset // 8) * 8
+
+
+def static_layout(count):
+    """
+    静态数组在文件中的布局
+
+    Returns:
+        tuple: (质量偏移, 半径偏移, 颜色偏移, 静态区总字节数)，偏移相对静态区起点
+    """
+    masses = 0
+    radii = masses + count * 8
+    colors = radii + count * 8
+    return masses, radii, colors, _align(colors + count * 3)
+
+
+def pack_header(**fields):
+    """按HEADER打包文件头（补零到HEADER_SIZE字节）"""
+    values = dict(fields, magic=MAGIC, version=VERSION, header_size=HEADER_SIZE)
+    return HEADER.pack(*(values[name] for name in HEADER_FIELDS)).ljust(HEADER_SIZE, b'\0')
+
+
+def read_header(f):
+    """
+    读取并校验文件头
+
+    Raises:
+        ValueError: 不是轨迹文件或版本不支持
+    """
+    data = f.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError("file is too short for a trajectory header")
+    magic, version = struct.unpack_from('<8sI', data)
+    if magic != MAGIC:
+        raise ValueError("not a trajectory file")
+    if version != VERSION:
+        raise ValueError(f"unsupported trajectory version {version}")
+    header = dict(zip(HEADER_FIELDS, HEADER.unpack_from(data)))
+    if header['itemsize'] not in STATE_DTYPES:
+        raise ValueError(f"unsupported state item size {header['itemsize']}")
+    return header
+
+
+class TrajectoryFile:
+    """只读的轨迹文件，所有数组都是映射文件上的视图（不复制）
+
+    Attributes:
+        count: 质点数
+        dt: 物理步长
+        decimation: 录制时的最小抽样间隔（步）
+        step_spacing: 相邻帧记录之间的实际平均步数（不计重置处）
+        masses, radii, colors: 静态数组
+        records: 帧记录结构化数组（np.memmap）
+        times, steps, positions, velocities: records各字段的视图
+        keyframes: 关键帧索引（KEYFRAME_DTYPE）
+        segment_starts: 每段连续时间的起始帧（重置处累计步数回退，开始新的一段）
+        segment_offsets: 每段在回放时间轴上的起点（各段首尾相接，单位为模拟秒）
+        playback_duration: 回放时间轴的总长度
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: .traj文件路径
+
+        Raises:
+            ValueError: 文件格式不正确或没有帧记录
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            header = read_header(f)
+        self.header = header
+        self.count = header['count']
+        self.dt = header['dt']
+        self.decimation = header['decimation']
+        self.step_spacing = header['step_spacing']
+
+        count = self.count
+        static = header['static_offset']
+        masses, radii, colors, _ = static_layout(count)
+        self.masses = np.memmap(path, dtype='<f8', mode='r', offset=static + masses, shape=(count,))
+        self.radii = np.memmap(path, dtype='<f8', mode='r', offset=static + radii, shape=(count,))
+        self.colors = np.memmap(path, dtype=np.uint8, mode='r', offset=static + colors, shape=(count, 3))
+
+        self.record_dtype = record_dtype(count, header['itemsize'])
+        frames = header['frames']
+        if not frames:
+            # 录制开始后还没有写入任何帧就被中断
+            raise ValueError(f"trajectory '{path}' has no frames")
+        self.records = np.memmap(path, dtype=self.record_dtype, mode='r', offset=header['frames_offset'],
+                                 shape=(frames,))
+        self.times = self.records['time']
+        self.steps = self.records['step']
+        self.positions = self.records['positions']
+        self.velocities = self.records['velocities']
+
+        if header['index_offset'] and header['keyframes']:
+            self.keyframes = np.memmap(path, dtype=KEYFRAME_DTYPE, mode='r', offset=header['index_offset'],
+                                       shape=(header['keyframes'],))
+            # 重置处一定是关键帧，只需比较关键帧与其前一帧的步数
+            candidates = self.keyframes['frame'][self.keyframes['frame'] > 0].astype(np.int64)
+            resets = candidates[self.steps[candidates] < self.steps[candidates - 1]]
+        else:
+            # 录制被中断时没有索引，按关键帧间隔重建（只读取这些帧的时间与步数）
+            frame = np.arange(0, frames, max(1, header['keyframe_interval']))
+            self.keyframes = np.empty(len(frame), dtype=KEYFRAME_DTYPE)
+            self.keyframes['frame'] = frame
+            self.keyframes['step'] = self.steps[frame]
+            self.keyframes['time'] = self.times[frame]
+            # 重建的索引不包含重置点，扫描步数列查找
+            resets = np.flatnonzero(np.diff(self.steps.astype(np.int64)) < 0) + 1
+
+        self.segment_starts = np.concatenate(([0], resets)).astype(np.int64)
+        segment_stops = np.append(self.segment_starts[1:], frames)
+        durations = np.asarray(self.times[segment_stops - 1] - self.times[self.segment_starts], dtype=np.float64)
+        self.segment_offsets = np.concatenate(([0.0], np.cumsum(durations)[:-1]))
+        self.playback_duration = float(durations.sum())
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        """录制的模拟时长"""
+        return float(self.times[-1] - self.times[0])
+
+    def frame_at(self, time):
+        """
+        不晚于给定模拟时间的最后一帧（先在关键帧索引上二分，再在两个关键帧之间二分）
+
+        状态不连续（重置）后时间会从头开始，此时返回最后一段中对应的帧。
+
+        Args:
+            time: 模拟时间
+
+        Returns:
+            int: 帧序号（早于第一帧时为0）
+        """
+        return self._frame_in_segment(len(self.segment_starts) - 1, time)
+
+    def frame_at_playback(self, position):
+        """
+        回放时间轴上给定位置对应的帧（不晚于该位置的最后一帧）
+
+        Args:
+            position: 回放时间轴上的位置（0到playback_duration）
+
+        Returns:
+            int: 帧序号
+        """
+        if position >= self.playback_duration:
+            # 末尾直接取最后一帧（各段时长累加后的舍入误差不会使游标停在倒数第二帧）
+            return len(self) - 1
+        segment = max(0, int(np.searchsorted(self.segment_offsets, position, side='right')) - 1)
+        start = int(self.segment_starts[segment])
+        return self._frame_in_segment(segment, float(self.times[start]) + position - self.segment_offsets[segment])
+
+    def playback_position(self, frame):
+        """帧在回放时间轴上的位置"""
+        segment = int(np.searchsorted(self.segment_starts, frame, side='right')) - 1
+        start = int(self.segment_starts[segment])
+        return float(self.segment_offsets[segment] + (self.times[frame] - self.times[start]))
+
+    def _frame_in_segment(self, segment, time):
+        """在一段连续时间内查找不晚于time的最后一帧（只读取相邻两个关键帧之间的时间字段）"""
+        start = int(self.segment_starts[segment])
+        stop = int(self.segment_starts[segment + 1]) if segment + 1 < len(self.segment_starts) else len(self)
+        frames = self.keyframes['frame']
+        low = int(np.searchsorted(frames, start, side='left'))
+        high = int(np.searchsorted(frames, stop, side='left'))
+        position = low + int(np.searchsorted(self.keyframes['time'][low:high], time, side='right')) - 1
+        first = int(frames[position]) if position >= low else start
+        last = int(frames[position + 1]) if position + 1 < high else stop
+        frame = first + int(np.searchsorted(self.times[first:last], time, side='right')) - 1
+        return max(frame, start)
+
+    def close(self):
+        """释放对映射数组的引用（调用方仍持有的视图在其释放后才解除映射）"""
+        for name in ('masses', 'radii', 'colors', 'records', 'times', 'steps', 'positions', 'velocities',
+                     'keyframes', 'segment_starts', 'segment_offsets'):
+            setattr(self, name, None)
+
+
+def open_trajectory(path):
+    """
+    以内存映射方式打开轨迹文件
+
+    Args:
+        path: .traj文件路径
+
+    Returns:
+        TrajectoryFile
+    """
+    return TrajectoryFile(path)
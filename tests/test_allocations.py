@@ -0,0 +1,74 @@
+import tempfile
+import tracemalloc
+import unittest
+
+from config.config import FIXED_PHYSICS_DT
+from core.physics_engine import PhysicsEngine
+from core.scenarios import create_scenario
+from core.vector2d import Vector2D
+from profiling.capture import ProfileCapture
+
+
+class AllocationBudgetTest(unittest.TestCase):
+    """物理步分配预算测试"""
+
+    def setUp(self):
+        self.engine = PhysicsEngine()
+        self.engine.load_initial_conditions(create_scenario('triangle'))
+        # 第一步创建Verlet积分状态，不计入预算
+        self.engine.update(FIXED_PHYSICS_DT)
+
+    def test_step_within_budget(self):
+        stats = self.engine.measure_allocations(100, FIXED_PHYSICS_DT, (Vector2D,))
+        self.assertEqual(stats.steps, 100)
+        # 每步只有质心更新创建两个Vector2D（位置与速度），临时数组很小
+        stats.assert_within_budget(max_peak_bytes=16 * 1024, max_net_blocks=32, max_by_type={'Vector2D': 2})
+
+    def test_budget_violation_raises(self):
+        stats = self.engine.measure_allocations(10, FIXED_PHYSICS_DT, (Vector2D,))
+        with self.assertRaises(AssertionError):
+            stats.assert_within_budget(max_by_type={'Vector2D': 0})
+
+
+class SharedTracingTest(unittest.TestCase):
+    """分配跟踪（F7）与tracemalloc采集（F6）交错开关"""
+
+    def setUp(self):
+        self.engine = PhysicsEngine()
+        self.engine.load_initial_conditions(create_scenario('triangle'))
+        self.capture = ProfileCapture.get_instance()
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output_dir.cleanup)
+        self.addCleanup(setattr, self.capture, 'output_dir', self.capture.output_dir)
+        self.capture.output_dir = self.output_dir.name
+
+    def tearDown(self):
+        self.engine.enable_allocation_tracking(False)
+        self.capture.stop_tracemalloc()
+
+    def test_capture_outlives_allocation_tracking(self):
+        self.engine.enable_allocation_tracking(True)
+        self.capture.start_tracemalloc()
+        self.engine.enable_allocation_tracking(False)
+        self.assertTrue(tracemalloc.is_tracing())
+        self.assertIsNotNone(self.capture.stop_tracemalloc())
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_allocation_tracking_outlives_capture(self):
+        self.capture.start_tracemalloc()
+        self.engine.enable_allocation_tracking(True)
+        self.assertIsNotNone(self.capture.stop_tracemalloc())
+        self.assertTrue(tracemalloc.is_tracing())
+        self.engine.update(FIXED_PHYSICS_DT)
+        self.engine.enable_allocation_tracking(False)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_capture_stopped_externally(self):
+        self.capture.start_tracemalloc()
+        tracemalloc.stop()
+        self.assertIsNone(self.capture.stop_tracemalloc())
+        self.assertFalse(self.capture.is_tracing())
+
+
+if __name__ == '__main__':
+    unittest.main()
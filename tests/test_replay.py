@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from config.config import FIXED_PHYSICS_DT
+from core.physics_engine import PhysicsEngine
+from core.scenarios import create_scenario
+from recording.recorder import TrajectoryRecorder
+from recording.replay import TrajectoryPlayer
+
+
+class TrajectoryPlaybackTest(unittest.TestCase):
+    """回放按模拟时间推进的测试"""
+
+    STEPS_PER_FRAME = 4
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'run.traj')
+        self.engine = PhysicsEngine()
+        self.initial = create_scenario('disk', n=8, seed=0)
+        self.engine.load_initial_conditions(self.initial)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, frames_before_reset, frames_after_reset=0):
+        """每帧执行多步并录制（相当于模拟速度大于1），可选在中途重置"""
+        engine = self.engine
+        recorder = TrajectoryRecorder.get_instance()
+        recorder.start(engine, self.path)
+        for frame in range(frames_before_reset + frames_after_reset):
+            if frame == frames_before_reset:
+                engine.load_initial_conditions(self.initial)
+                recorder.on_physics(engine)
+            engine.advance(self.STEPS_PER_FRAME, FIXED_PHYSICS_DT)
+            recorder.on_physics(engine)
+        recorder.stop()
+        player = TrajectoryPlayer(self.path)
+        player.load(engine)
+        return player
+
+    def test_playback_follows_simulation_time(self):
+        player = self.record(10)
+        # 游标放在两帧之间（避开浮点累加恰好落在帧时间上的边界情况）
+        player.seek_position(self.STEPS_PER_FRAME * FIXED_PHYSICS_DT / 2)
+        self.assertEqual(player.frame, 0)
+        # 与录制时相同的速度下，每个渲染帧前进一条记录
+        for frame in range(1, 11):
+            self.assertEqual(player.update(FIXED_PHYSICS_DT, self.STEPS_PER_FRAME, False), 1)
+            self.assertEqual(player.frame, frame)
+            self.assertLessEqual(self.engine.sim_time, player.cursor)
+        # 到达末尾后停在最后一帧
+        self.assertEqual(player.update(FIXED_PHYSICS_DT, self.STEPS_PER_FRAME, False), 0)
+
+    def test_playback_across_reset(self):
+        player = self.record(6, 3)
+        trajectory = player.trajectory
+        self.assertEqual(list(trajectory.segment_starts), [0, 7])
+        frame_time = self.STEPS_PER_FRAME * FIXED_PHYSICS_DT
+        self.assertAlmostEqual(trajectory.playback_duration, 9 * frame_time)
+
+        player.seek_position(frame_time / 2)
+        frames = []
+        while player.update(FIXED_PHYSICS_DT, self.STEPS_PER_FRAME, False):
+            frames.append(player.frame)
+        # 重置前的最后一帧与新一段的起点在时间轴上重合，游标越过该点后进入新的一段
+        self.assertEqual(frames, [1, 2, 3, 4, 5, 7, 8, 9, 10])
+        self.assertEqual(player.get_progress(), 1.0)
+
+        player.seek_fraction(0.5)
+        self.assertAlmostEqual(player.cursor, trajectory.playback_position(player.frame), delta=frame_time)
+        player.toggle_direction()
+        self.assertEqual(player.update(FIXED_PHYSICS_DT, self.STEPS_PER_FRAME, False), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
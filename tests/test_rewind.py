@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from config.config import CONFIG, FIXED_PHYSICS_DT
+from core.physics_engine import PhysicsEngine
+from core.rewind_buffer import RewindBuffer
+from core.scenarios import create_scenario
+
+
+class RewindBufferTest(unittest.TestCase):
+    """回退缓冲区测试"""
+
+    def setUp(self):
+        self.engine = PhysicsEngine()
+        self.initial = create_scenario('disk', n=64, seed=0)
+        self.engine.load_initial_conditions(self.initial)
+        self.buffer = RewindBuffer.get_instance()
+        self.buffer.interval = 0.0  # 每次推进都保存快照
+        self.buffer.start(self.engine)
+
+    def tearDown(self):
+        self.buffer.interval = CONFIG['rewind_interval']
+
+    def run_steps(self, frames):
+        """推进若干帧，返回每帧之后的位置"""
+        positions = {}
+        for _ in range(frames):
+            self.engine.advance(2, FIXED_PHYSICS_DT)
+            self.buffer.on_physics(self.engine, 2)
+            positions[self.engine.step_count] = self.engine.bodies.positions.copy()
+        return positions
+
+    def test_rewind_continues_bit_exact(self):
+        positions = self.run_steps(40)
+        final = self.engine.step_count
+        self.assertTrue(self.buffer.rewind(self.engine))
+        self.assertLess(self.engine.step_count, final)
+        while self.engine.step_count < final:
+            self.engine.advance(2, FIXED_PHYSICS_DT)
+            np.testing.assert_array_equal(self.engine.bodies.positions, positions[self.engine.step_count])
+
+    def test_reset_restores_removed_body(self):
+        engine = self.engine
+        self.run_steps(5)
+        engine.remove_body(engine.balls[3])
+        self.run_steps(5)
+        self.assertTrue(self.buffer.reset(engine))
+        bodies = engine.bodies
+        self.assertEqual(bodies.count, 64)
+        self.assertTrue(bodies.is_alive(3))
+        np.testing.assert_array_equal(bodies.masses, self.initial.masses)
+        np.testing.assert_array_equal(bodies.radii, self.initial.radii)
+        np.testing.assert_array_equal(bodies.positions, self.initial.positions)
+
+    def test_rewind_across_added_body(self):
+        engine = self.engine
+        self.run_steps(5)
+        before = engine.step_count
+        engine.add_body(0.0, 0.0, 0.0, 0.0, 10.0, 2.0)
+        self.run_steps(3)
+        self.assertEqual(engine.bodies.count, 65)
+        # 回退到加入质点之前的快照时结构一并恢复
+        while engine.step_count > before:
+            self.assertTrue(self.buffer.rewind(engine))
+        self.assertEqual(engine.bodies.count, 64)
+        self.assertEqual(len(engine.bodies.positions), 64)
+        self.assertIsNone(engine.initial_energy)
+
+    def test_large_systems_store_keyframes_only(self):
+        limit = CONFIG['rewind_delta_max_bodies']
+        CONFIG['rewind_delta_max_bodies'] = 10
+        try:
+            self.run_steps(5)
+        finally:
+            CONFIG['rewind_delta_max_bodies'] = limit
+        self.assertTrue(all(snapshot.is_keyframe() for snapshot in self.buffer.history))
+
+
+if __name__ == '__main__':
+    unittest.main()
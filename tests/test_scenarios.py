@@ -0,0 +1,29 @@
+import unittest
+
+from core.scenarios import SCENARIOS, create_scenario
+from main import parse_args
+
+
+class ScenarioArgumentTest(unittest.TestCase):
+    """场景质点数量校验测试"""
+
+    def test_rejects_fewer_than_one_body(self):
+        for name in SCENARIOS:
+            for n in (0, -1):
+                with self.subTest(name=name, n=n), self.assertRaises(ValueError):
+                    create_scenario(name, n=n, seed=0)
+
+    def test_single_body(self):
+        for name in SCENARIOS:
+            with self.subTest(name=name):
+                self.assertGreaterEqual(len(create_scenario(name, n=1, seed=0).positions), 1)
+
+    def test_bodies_argument_must_be_positive(self):
+        self.assertEqual(parse_args(['-n', '5']).bodies, 5)
+        for value in ('0', '-3'):
+            with self.subTest(value=value), self.assertRaises(SystemExit):
+                parse_args(['-n', value])
+
+
+if __name__ == '__main__':
+    unittest.main()
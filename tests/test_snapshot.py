@@ -0,0 +1,55 @@
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+
+import numpy as np
+
+from core.scenarios import create_scenario
+from core.snapshot import REQUIRED_ARRAYS, load_snapshot, save_snapshot
+
+
+def write_npz(path, arrays, version):
+    """按指定的.npy格式版本写出未压缩的.npz"""
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, array in arrays.items():
+            buffer = io.BytesIO()
+            np.lib.format.write_array(buffer, array, version=version)
+            archive.writestr(f"{name}.npy", buffer.getvalue())
+
+
+class SnapshotLoadTest(unittest.TestCase):
+    """快照加载测试"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.initial = create_scenario('disk', n=16, seed=0)
+        self.arrays = {name: getattr(self.initial, name) for name in REQUIRED_ARRAYS}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_round_trip_is_memory_mapped(self):
+        save_snapshot(self.path('s.npz'), self.initial)
+        snapshot = load_snapshot(self.path('s.npz'))
+        self.assertIsInstance(snapshot.positions, np.memmap)
+        np.testing.assert_array_equal(snapshot.positions, self.initial.positions)
+
+    def test_format_2_0_members(self):
+        write_npz(self.path('v2.npz'), self.arrays, (2, 0))
+        snapshot = load_snapshot(self.path('v2.npz'))
+        self.assertIsInstance(snapshot.velocities, np.memmap)
+        np.testing.assert_array_equal(snapshot.velocities, self.initial.velocities)
+
+    def test_unsupported_format_version(self):
+        write_npz(self.path('v3.npz'), self.arrays, (3, 0))
+        with self.assertRaisesRegex(ValueError, 'version 3.0'):
+            load_snapshot(self.path('v3.npz'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import statistics
+import subprocess
+import sys
+import unittest
+
+from benchmarks.startup import PROJECT_ROOT, measure_import_time
+
+# 只在用到时才导入的模块：出现在import main的导入记录中说明某处又加回了模块级导入
+LAZY_MODULES = (
+    'pkg_resources',
+    'multiprocessing',
+    'multiprocessing.shared_memory',
+    'concurrent.futures',
+    'zlib',
+    'core.physics_process',
+    'core.rewind_buffer',
+    'recording.recorder',
+    'recording.replay',
+    'recording.trajectory',
+    'ui.ui_components',
+    'cProfile',
+    'tracemalloc',
+)
+
+# 项目自身的导入耗时（import main减去pygame，pygame自身会导入numpy）占pygame导入耗时的比例上限，
+# 按比例比较可以抵消机器快慢的差异
+MAX_OVERHEAD_RATIO = 0.5
+
+
+def run_python(code):
+    """在全新的解释器中执行代码，返回标准输出"""
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    completed = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, env=env,
+                               capture_output=True, text=True, check=True)
+    return completed.stdout.strip()
+
+
+class StartupImportTest(unittest.TestCase):
+    """启动导入测试（-X importtime）"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.samples, cls.timings = measure_import_time('main', runs=3)
+
+    def test_lazy_modules_not_imported(self):
+        # 导入失败的占位模块也会出现在记录中，pkg_resources另由sys.modules检查
+        imported = [name for name in LAZY_MODULES if name in self.timings and name != 'pkg_resources']
+        self.assertEqual(imported, [])
+
+    def test_project_import_overhead(self):
+        pygame_ms = self.timings['pygame'][1] / 1000.0
+        overhead_ms = statistics.median(self.samples) - pygame_ms
+        self.assertLessEqual(overhead_ms, pygame_ms * MAX_OVERHEAD_RATIO,
+                             f"import main spends {overhead_ms:.1f} ms beyond pygame ({pygame_ms:.1f} ms)")
+
+    def test_pkg_resources_hidden_only_while_importing_pygame(self):
+        # 导入main后pkg_resources既没有被加载，也没有留下占位（其他模块仍可正常导入它）
+        self.assertEqual(run_python("import sys, main; print('pkg_resources' in sys.modules)"), 'False')
+
+    def test_pygame_resources_without_pkg_resources(self):
+        # pkgdata回退为按文件路径查找内置字体
+        code = ("import main, pygame.pkgdata; "
+                "print(len(pygame.pkgdata.getResource('freesansbold.ttf', 'pygame').read()) > 0)")
+        self.assertEqual(run_python(code), 'True')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from config.config import FIXED_PHYSICS_DT
+from core.physics_engine import PhysicsEngine
+from core.scenarios import create_scenario
+from recording.recorder import TrajectoryRecorder, TrajectoryWriter
+from recording.trajectory import open_trajectory
+
+
+class TrajectoryStepSpacingTest(unittest.TestCase):
+    """轨迹文件实际记录间隔测试"""
+
+    STEPS_PER_FRAME = 4
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'run.traj')
+        engine = PhysicsEngine()
+        engine.load_initial_conditions(create_scenario('disk', n=8, seed=0))
+        recorder = TrajectoryRecorder.get_instance()
+        recorder.start(engine, self.path)
+        # 模拟速度大于1：每帧执行多步，每帧最多记录一次
+        for _ in range(10):
+            engine.advance(self.STEPS_PER_FRAME, FIXED_PHYSICS_DT)
+            recorder.on_physics(engine)
+        recorder.stop()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_header_records_actual_spacing(self):
+        trajectory = open_trajectory(self.path)
+        self.assertEqual(len(trajectory), 11)
+        self.assertEqual(trajectory.step_spacing, self.STEPS_PER_FRAME)
+        self.assertLess(trajectory.decimation, trajectory.step_spacing)
+
+
+class InterruptedRecordingTest(unittest.TestCase):
+    """录制中断（没有调用close）时的轨迹文件"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'run.traj')
+        engine = PhysicsEngine()
+        engine.load_initial_conditions(create_scenario('disk', n=8, seed=0))
+        self.engine = engine
+        bodies = engine.bodies
+        self.writer = TrajectoryWriter(self.path, bodies.masses, bodies.radii, bodies.get_colors(np.arange(bodies.size)),
+                                       bodies.positions.dtype.itemsize, 1, FIXED_PHYSICS_DT)
+
+    def tearDown(self):
+        self.writer._chunk = None
+        self.writer.file.close()
+        self.directory.cleanup()
+
+    def test_frames_shorter_than_a_chunk_readable(self):
+        for _ in range(5):
+            self.engine.advance(2, FIXED_PHYSICS_DT)
+            bodies = self.engine.bodies
+            self.writer.write(self.engine.sim_time, self.engine.step_count, bodies.positions, bodies.velocities,
+                              keyframe=False)
+        trajectory = open_trajectory(self.path)
+        self.assertEqual(len(trajectory), 5)
+        self.assertEqual(trajectory.step_spacing, 2)
+        self.assertEqual(trajectory.frame_at_playback(trajectory.playback_duration), 4)
+
+    def test_no_frames_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            open_trajectory(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -267,31 +267,27 @@ class InfoText(UIComponent):
         self.line_height = line_height
         self.texts = []
 
-    def update(self, engine, clock, initial_speed, separation, FIXED_PHYSICS_DT, camera):
+    def update(self, engine, clock, initial_speed, separation, FIXED_PHYSICS_DT, camera, scheduler=None):
         """更新显示信息"""
 
-        ball1 = engine.balls[0]
-        ball2 = engine.balls[1]
-        ball3 = engine.balls[2]
+        # 只显示前三个质点的详细信息（大规模场景下质点数量可能很多）
+        shown = engine.balls[:3]
 
         # 计算距离和速度（物理值，不受缩放影响）
-        distance12 = ball1.position.distance_to(ball2.position)
-        distance13 = ball1.position.distance_to(ball3.position)
-        distance23 = ball2.position.distance_to(ball3.position)
-        speed1 = ball1.velocity.magnitude()
-        speed2 = ball2.velocity.magnitude()
-        speed3 = ball3.velocity.magnitude()
+        distances = ' '.join(f"{i + 1}-{j + 1}={shown[i].position.distance_to(shown[j].position):.1f}"
+                             for i in range(len(shown)) for j in range(i + 1, len(shown)))
+        speeds = ' '.join(f"Ball{i + 1}={ball.velocity.magnitude():.1f}" for i, ball in enumerate(shown))
+        masses = ','.join(str(round(ball.mass, 4)) for ball in shown)
+        if len(engine.balls) > len(shown):
+            masses += f",... N={len(engine.balls)}"
 
         # 摄像头信息
         camera_info = []
         if camera:
             target_name = "None"
-            if camera.target == ball1:
-                target_name = "Ball1"
-            elif camera.target == ball2:
-                target_name = "Ball2"
-            elif camera.target == ball3:
-                target_name = "Ball3"
+            for i, ball in enumerate(shown):
+                if camera.target == ball:
+                    target_name = f"Ball{i + 1}"
 
             follow_status = "ON" if camera.follow_mode else "OFF"
             camera_info = [
@@ -302,14 +298,17 @@ class InfoText(UIComponent):
         # 更新信息文本
         self.texts = [
                          f"FPS: {int(clock.get_fps())}",
-                         f"Integration: {engine.integration_method.upper()} (Fixed dt={FIXED_PHYSICS_DT * 1000:.1f}ms)",
-                         f"Config: Mass({ball1.mass},{ball2.mass},{ball3.mass}) Speed({initial_speed}) Distance({separation})",
-                         f"Distances: 1-2={distance12:.1f} 1-3={distance13:.1f} 2-3={distance23:.1f}",
-                         f"Speeds: Ball1={speed1:.1f} Ball2={speed2:.1f} Ball3={speed3:.1f}",
+                         f"Integration: {engine.integration_method.upper()} (Fixed dt={FIXED_PHYSICS_DT * 1000:.1f}ms) "
+                         f"Precision: {engine.precision}",
+                     ] + ([scheduler.get_status_text()] if scheduler else []) + [
+                         f"Config: Mass({masses}) Speed({initial_speed}) Distance({separation})",
+                         f"Distances: {distances}",
+                         f"Speeds: {speeds}",
                          f"G={G}",
                      ] + camera_info + [
-                         "Controls: SPACE=Pause, R=Reset, C=Centroid, E=Toggle UI, 0=UI Reset",
-                         "Camera: F=Follow, 1/2/3=Track Ball, TAB=Next Target, WASD=Move, HOME=Reset"
+                         "Controls: SPACE=Pause, R=Reset, BACKSPACE=Rewind, C=Centroid, E=Toggle UI, 0=UI Reset, H=Render Mode, V=Render Scale",
+                         "Camera: F=Follow, 1/2/3=Track Ball, TAB=Next Target, WASD=Move, HOME=Reset",
+                         "Debug: F3=Profiler, F4=Export Frame CSV, F5=cProfile, F6=Tracemalloc, F7=Alloc/Step, F8=Record"
                      ]
 
     def draw(self, screen, font):
@@ -324,3 +323,133 @@ class InfoText(UIComponent):
             except Exception as e:
                 pygame.draw.rect(screen, CONFIG['colors']['white'],
                                  (self.x, self.y + i * self.line_height, 300, 20), 1)
+
+
+class ProfilerOverlay(UIComponent):
+    """帧性能分析面板，显示各阶段耗时百分位与帧耗时直方图"""
+
+    def __init__(self, x, y, width, line_height=18, histogram_height=60):
+        super().__init__(x, y, width, 0)
+        self.line_height = line_height
+        self.histogram_height = histogram_height
+        self.visible = False  # 默认隐藏，按键切换
+        self.texts = []
+        self.histogram = []
+
+    def update(self, profiler, allocation_stats=None, quality_lines=None):
+        """从帧分析器（以及可选的分配统计与渲染质量设置）刷新显示内容"""
+        summary = profiler.get_summary()
+        self.texts = [f"FPS: {profiler.get_fps():.1f}  Frames: {profiler.frame_count}",
+                      f"{'phase':<8}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for phase in profiler.PHASES + ('frame',):
+            p50, p95, p99 = summary[phase]
+            self.texts.append(f"{phase:<8}{p50:>8.2f}{p95:>8.2f}{p99:>8.2f}")
+        p50, p95, p99 = summary['steps']
+        self.texts.append(f"{'steps':<8}{p50:>8}{p95:>8}{p99:>8}")
+        if allocation_stats is not None:
+            self.texts.append(f"alloc/step: {allocation_stats.peak_bytes / 1024:.1f}KB peak "
+                              f"{allocation_stats.net_blocks:+.1f} blocks @ {allocation_stats.step_time:.3f}ms")
+            for name, count in sorted(allocation_stats.by_type.items()):
+                self.texts.append(f"  {name}: {count:.1f}/step")
+        if quality_lines:
+            self.texts.extend(quality_lines)
+        self.histogram = profiler.histogram()
+
+    def draw(self, screen, font):
+        """绘制性能面板"""
+        if not self.visible:
+            return
+
+        text_height = len(self.texts) * self.line_height
+        height = text_height + self.histogram_height + 20
+        self.rect = pygame.Rect(self.x, self.y, self.rect.width, height)
+        pygame.draw.rect(screen, CONFIG['energy_graph_bg_color'], self.rect)
+        pygame.draw.rect(screen, CONFIG['energy_graph_border_color'], self.rect, 1)
+
+        for i, text in enumerate(self.texts):
+            try:
+                text_surface = font.render(text, True, CONFIG['colors']['white'])
+                screen.blit(text_surface, (self.x + 5, self.y + 5 + i * self.line_height))
+            except Exception:
+                pass
+
+        # 绘制帧耗时直方图
+        if self.histogram:
+            peak = max(self.histogram) or 1
+            bar_width = (self.rect.width - 10) / len(self.histogram)
+            base_y = self.y + text_height + 10 + self.histogram_height
+            for i, count in enumerate(self.histogram):
+                bar_height = int(self.histogram_height * count / peak)
+                if bar_height > 0:
+                    bar_rect = pygame.Rect(int(self.x + 5 + i * bar_width), base_y - bar_height,
+                                           max(1, int(bar_width) - 1), bar_height)
+                    pygame.draw.rect(screen, CONFIG['colors']['light_blue'], bar_rect)
+
+
+class CaptureSummary(UIComponent):
+    """性能采集摘要显示组件"""
+
+    def __init__(self, x, y, line_height=18):
+        super().__init__(x, y, 0, 0)
+        self.line_height = line_height
+        self.texts = []
+
+    def update(self, lines):
+        """更新摘要内容"""
+        self.texts = lines
+
+    def draw(self, screen, font):
+        """绘制摘要"""
+        if not self.visible or not self.texts:
+            return
+
+        for i, text in enumerate(self.texts):
+            try:
+                text_surface = font.render(text, True, CONFIG['colors']['yellow'])
+                screen.blit(text_surface, (self.x, self.y + i * self.line_height))
+            except Exception:
+                pass
+
+
+class Timeline(Slider):
+    """回放时间轴：显示当前帧在录制中的位置，点击或拖动时跳转"""
+
+    def __init__(self, x, y, width, height, on_seek):
+        """
+        Args:
+            on_seek: 跳转回调，接收时间轴上的相对位置（0-1）
+        """
+        super().__init__(x, y, width, height, 0.0, 1.0, 0.0, "Replay")
+        self.on_seek = on_seek
+        self.text = ""
+
+    def handle_event(self, event):
+        """在轨道上任意位置按下即跳转，按住拖动时连续跳转"""
+        if not self.visible:
+            return
+
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.rect.inflate(0, self.handle_height).collidepoint(event.pos):
+                self.dragging = True
+                self._seek(event.pos[0])
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self._seek(event.pos[0])
+
+    def _seek(self, mouse_x):
+        self.val = max(0.0, min((mouse_x - self.rect.x) / self.rect.width, 1.0))
+        self.on_seek(self.val)
+
+    def update(self, progress, text):
+        """更新进度（0-1）与状态文本"""
+        self.val = progress
+        self.text = text
+
+    def draw_label(self, screen, font):
+        """在时间轴上方显示回放状态"""
+        try:
+            text_surface = font.render(self.text, True, CONFIG['colors']['white'])
+            screen.blit(text_surface, (self.rect.x, self.rect.y - CONFIG.get('label_y_offset', 25)))
+        except Exception:
+            pass